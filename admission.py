@@ -0,0 +1,112 @@
+"""
+Contrôle d'admission devant l'étage LLaMA
+Concurrence bornée, file d'attente prioritaire (questions courtes d'abord)
+et délai d'attente maximal : au-delà, la demande est rejetée tout de suite
+plutôt que de ralentir toutes les autres
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+# Poids de la dernière durée dans la moyenne glissante du temps de service
+LISSAGE = 0.2
+
+
+class AdmissionControl:
+    """Sémaphore à file prioritaire avec estimation de l'attente et délestage"""
+
+    def __init__(self, max_concurrence=2, attente_max=2.0, file_max=16, horloge=time.monotonic):
+        self.max_concurrence = max_concurrence
+        self.attente_max = attente_max
+        self.file_max = file_max
+        self.horloge = horloge
+        self.actifs = 0
+        self.admis = 0
+        self.rejets = {"file_pleine": 0, "attente_estimee": 0, "delai": 0}
+        self.duree_moyenne = None
+        self._file = []
+        self._ordre = itertools.count()
+        self._cond = threading.Condition()
+
+    def attente_estimee(self, position):
+        """Attente prévisible (s) pour la position donnée dans la file"""
+        if self.duree_moyenne is None:
+            return 0.0
+        return position / self.max_concurrence * self.duree_moyenne
+
+    def _rejeter(self, motif):
+        self.rejets[motif] += 1
+        return False
+
+    def acquerir(self, priorite=0):
+        """
+        Réserve un créneau (priorité faible = servie d'abord)
+        Retourne False sans attendre si la file est pleine ou si l'attente
+        prévisible dépasse attente_max, ou après attente_max sans créneau libre
+        """
+        with self._cond:
+            if self.actifs < self.max_concurrence and not self._file:
+                self.actifs += 1
+                self.admis += 1
+                return True
+
+            if len(self._file) >= self.file_max:
+                return self._rejeter("file_pleine")
+            if self.attente_estimee(len(self._file) + 1) > self.attente_max:
+                return self._rejeter("attente_estimee")
+
+            ticket = (priorite, next(self._ordre))
+            heapq.heappush(self._file, ticket)
+            limite = self.horloge() + self.attente_max
+
+            while True:
+                if self._file[0] is ticket and self.actifs < self.max_concurrence:
+                    heapq.heappop(self._file)
+                    self.actifs += 1
+                    self.admis += 1
+                    self._cond.notify_all()
+                    return True
+
+                reste = limite - self.horloge()
+                if reste <= 0:
+                    self._file.remove(ticket)
+                    heapq.heapify(self._file)
+                    self._cond.notify_all()
+                    return self._rejeter("delai")
+                self._cond.wait(reste)
+
+    def liberer(self, duree=None):
+        """Libère un créneau ; duree (s) met à jour la moyenne du temps de service"""
+        with self._cond:
+            self.actifs -= 1
+            if duree is not None:
+                self.duree_moyenne = duree if self.duree_moyenne is None else (
+                    (1 - LISSAGE) * self.duree_moyenne + LISSAGE * duree
+                )
+            self._cond.notify_all()
+
+    @contextmanager
+    def creneau(self, priorite=0):
+        """with admission.creneau(p) as admis: ... (admis vaut False si rejeté)"""
+        admis = self.acquerir(priorite)
+        debut = self.horloge()
+        try:
+            yield admis
+        finally:
+            if admis:
+                self.liberer(self.horloge() - debut)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "actifs": self.actifs,
+                "file": len(self._file),
+                "max_concurrence": self.max_concurrence,
+                "attente_max": self.attente_max,
+                "duree_moyenne": round(self.duree_moyenne or 0.0, 3),
+                "admis": self.admis,
+                "rejets": dict(self.rejets),
+            }
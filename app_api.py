@@ -1,13 +1,54 @@
-from fastapi import FastAPI
+import asyncio
+import json
+import os
+import threading
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from chatbot_can import ask_bot
+from bundles import BUNDLES_DIR, MANIFEST
+from backend import normalize_team_name
+from chatbot_can import prefetch, repondre_avec_cache
+from core import data_version, parse_score
+from llama_router import admission
+from player_index import load_player_index
+from profiling import MODES, MOTEURS, profileur
+from push import diffuseur, sujets
+from qualification import load_qualification
+from response_cache import ResponseCache
+from sessions import SessionStore
+
+# Préchargement des données en arrière-plan au démarrage (CAN_PREFETCH=0 pour désactiver)
+PREFETCH = os.environ.get("CAN_PREFETCH", "1") != "0"
+
+# Jeton des endpoints d'administration (en-tête X-Admin-Token) ; sans jeton, ils sont fermés
+ADMIN_TOKEN = os.environ.get("CAN_ADMIN_TOKEN")
+
+# Journal JSONL des questions reçues, rejouable avec benchmarks/replay.py (désactivé par défaut)
+JOURNAL_QUESTIONS = os.environ.get("CAN_JOURNAL_QUESTIONS")
+_verrou_journal = threading.Lock()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Le serveur est prêt immédiatement : rien n'est chargé avant la première requête
+    if PREFETCH:
+        prefetch()
+    yield
+
 
 app = FastAPI(
     title="CAN 2025 Chatbot API",
     description="API FastAPI pour l’assistant intelligent CAN 2025",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Autoriser le frontend HTML
@@ -22,16 +63,223 @@ app.add_middleware(
 # --------- MODELE DE DONNEES ---------
 class ChatRequest(BaseModel):
     message: str
+    session_id: Optional[str] = None
+
+class ProfilRequest(BaseModel):
+    mode: str = "prochaines"
+    n: int = 10
+    seuil_ms: float = 0.0
+    moteur: str = "cprofile"
+
+class ScoreRequest(BaseModel):
+    equipe1: str
+    equipe2: str
+    score: str
 
 class ChatResponse(BaseModel):
     response: str
+    session_id: str
+    # Étage du routage qui a produit la réponse (salutation, regles, llm, degrade, defaut)
+    etage: Optional[str] = None
+
+
+# Contexte de conversation par session (borné, expiré après inactivité)
+sessions = SessionStore()
+
+# Réponses déterministes déjà calculées (question normalisée + version des données)
+reponses = ResponseCache()
+
+
+def repondre(message, contexte):
+    """Réponse depuis le cache si possible, sinon via le chatbot (puis mise en cache)"""
+    return repondre_avec_cache(reponses, message, contexte)[0]
+
+
+def journaliser(message, session_id, answer):
+    """Ajoute la question et l'étage qui y a répondu au journal (si CAN_JOURNAL_QUESTIONS)"""
+    ligne = json.dumps({
+        "question": message,
+        "session": session_id,
+        # Réponse servie (non étiquetée : "intention" reste réservée aux étiquettes attendues)
+        "servi": {"etage": getattr(answer, "etage", None), "intention": getattr(answer, "intention", None)},
+    }, ensure_ascii=False)
+    with _verrou_journal, open(JOURNAL_QUESTIONS, "a", encoding="utf-8") as f:
+        f.write(ligne + "\n")
 
 
 # --------- ENDPOINT ---------
 @app.post("/chat", response_model=ChatResponse)
 def chat(req: ChatRequest):
-    answer = ask_bot(req.message)
-    return {"response": answer}
+    # Sans identifiant, une nouvelle session est ouverte : le client renvoie celui reçu
+    session_id = req.session_id or uuid.uuid4().hex
+    contexte = sessions.get(session_id)
+    if profileur.actif:
+        answer = profileur.executer("chat", repondre, req.message, contexte)
+    else:
+        answer = repondre(req.message, contexte)
+    if JOURNAL_QUESTIONS:
+        journaliser(req.message, session_id, answer)
+    return {"response": answer, "session_id": session_id, "etage": getattr(answer, "etage", None)}
+
+
+# --------- CACHE ---------
+@app.get("/cache")
+def cache_stats():
+    """Taille et taux de succès du cache de réponses"""
+    return reponses.stats()
+
+
+# --------- ÉTAGE LLaMA ---------
+@app.get("/llm")
+def llm_stats():
+    """Contrôle d'admission LLaMA : créneaux actifs, file d'attente, délestages"""
+    return admission.stats()
+
+
+# --------- SCORES EN DIRECT ---------
+async def _recevoir_abonnements(websocket, file):
+    """Lit les demandes d'abonnement du client et les acquitte"""
+    while True:
+        try:
+            demande = await websocket.receive_json()
+        except ValueError:
+            demande = None
+        if not isinstance(demande, dict):
+            await file.put({"type": "erreur", "erreurs": ["demande JSON attendue"]})
+            continue
+        nouveaux, erreurs = sujets(demande)
+        abonnements = diffuseur.abonner(file, nouveaux)
+        await file.put({"type": "abonne", "sujets": abonnements, "erreurs": erreurs})
+
+
+@app.websocket("/ws")
+async def scores_en_direct(websocket: WebSocket):
+    """
+    Abonnement aux changements de scores : le client envoie {"equipe": "Maroc"},
+    {"groupe": "A"} ou {"match": ["Maroc", "Comores"]} et reçoit les résultats
+    modifiés et les lignes de classement qui ont bougé
+    """
+    await websocket.accept()
+    file = diffuseur.connecter()
+    lecture = asyncio.create_task(_recevoir_abonnements(websocket, file))
+    try:
+        while True:
+            envoi = asyncio.create_task(file.get())
+            fini, _ = await asyncio.wait({envoi, lecture}, return_when=asyncio.FIRST_COMPLETED)
+            if lecture in fini:
+                envoi.cancel()
+                lecture.result()
+            await websocket.send_json(envoi.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        lecture.cancel()
+        diffuseur.deconnecter(file)
+
+
+# --------- PAQUETS STATIQUES ---------
+@app.get("/bundles/{fichier}")
+def bundle(fichier: str, request: Request):
+    """
+    Paquets JSON des pages (bundles.py) : nommés d'après leur contenu, donc
+    immuables ; version .gz précompressée servie si le client l'accepte
+    """
+    chemin = BUNDLES_DIR / fichier
+    if chemin.parent != BUNDLES_DIR or chemin.suffix != ".json" or not chemin.is_file():
+        raise HTTPException(status_code=404, detail="Paquet introuvable")
+
+    if fichier == MANIFEST:
+        entetes = {"Cache-Control": "no-cache"}
+    else:
+        entetes = {"Cache-Control": "public, max-age=31536000, immutable"}
+    entetes["Vary"] = "Accept-Encoding"
+
+    compresse = chemin.with_name(fichier + ".gz")
+    if "gzip" in request.headers.get("accept-encoding", "") and compresse.is_file():
+        entetes["Content-Encoding"] = "gzip"
+        return FileResponse(compresse, media_type="application/json", headers=entetes)
+    return FileResponse(chemin, media_type="application/json", headers=entetes)
+
+
+# --------- PAGES DU SITE ---------
+# Pages servies à la même origine que l'API : paquets (/bundles/) et scores en direct (/ws)
+app.mount("/site", StaticFiles(directory=Path(__file__).with_name("template"), html=True), name="site")
+
+
+# --------- ADMINISTRATION : PROFILAGE ---------
+def verifier_admin(jeton):
+    if not ADMIN_TOKEN or jeton != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Administration fermée ou jeton invalide")
+
+
+@app.get("/admin/profil")
+def profil_etat(x_admin_token: Optional[str] = Header(None)):
+    """État du profilage et derniers profils enregistrés"""
+    verifier_admin(x_admin_token)
+    return profileur.etat()
+
+
+@app.post("/admin/profil")
+def profil_demarrer(req: ProfilRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Profile les n prochaines requêtes /chat (mode "prochaines") ou jusqu'à n
+    requêtes plus lentes que seuil_ms (mode "lentes") ; moteur cprofile ou echantillonnage
+    """
+    verifier_admin(x_admin_token)
+    if req.mode not in MODES or req.moteur not in MOTEURS or req.n < 1:
+        raise HTTPException(status_code=422, detail=f"mode parmi {MODES}, moteur parmi {MOTEURS}, n ≥ 1")
+    profileur.demarrer(req.mode, req.n, req.seuil_ms, req.moteur)
+    return profileur.etat()
+
+
+@app.delete("/admin/profil")
+def profil_arreter(x_admin_token: Optional[str] = Header(None)):
+    verifier_admin(x_admin_token)
+    profileur.arreter()
+    return profileur.etat()
+
+
+# --------- ADMINISTRATION : SAISIE DES SCORES ---------
+@app.post("/admin/score")
+def score_saisir(req: ScoreRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Enregistre le score d'un match (data_manager.update_score) : instantané ou base,
+    tableau final, statistiques, caches de réponses et abonnés /ws sont mis à jour
+    """
+    verifier_admin(x_admin_token)
+    if parse_score(req.score) is None:
+        raise HTTPException(status_code=422, detail="Score attendu au format '2-1'")
+
+    # pandas n'est importé qu'à la première saisie
+    import data_manager as dm
+    change = dm.update_score(req.equipe1, req.equipe2, req.score)
+    if change is None:
+        raise HTTPException(status_code=404, detail=f"Match introuvable: {req.equipe1} - {req.equipe2}")
+    return {**change, "ancien_score": change["ancien_score"] if isinstance(change["ancien_score"], str) else None,
+            "version": data_version()}
+
+
+# --------- AUTOCOMPLÉTION ---------
+@app.get("/search")
+def search(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    """Suggestions de joueurs et de clubs (index inversé, recherche par préfixe)"""
+    return {"query": q, "results": load_player_index().rechercher(q, limit)}
+
+
+# --------- QUALIFICATION ---------
+@app.get("/qualification")
+def qualification(equipe: Optional[str] = None):
+    """
+    Chances de qualification (scénarios des matchs de poule restants, recalculés
+    à chaque changement de données) : toutes les équipes, ou une seule
+    """
+    simulation = load_qualification()
+    if equipe is None:
+        return simulation
+    nom = normalize_team_name(equipe)
+    if nom not in simulation["equipes"]:
+        raise HTTPException(status_code=404, detail=f"Équipe inconnue: {equipe}")
+    return {"equipe": nom, **simulation["equipes"][nom], "matchs_restants": simulation["matchs_restants"]}
 
 
 # --------- TEST ---------
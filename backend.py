@@ -0,0 +1,55 @@
+"""
+Stockage interrogé par les handlers du chatbot, choisi par configuration
+CAN_BACKEND=memoire (défaut) : instantané en mémoire construit des DataFrames (snapshot.py)
+CAN_BACKEND=sqlite           : base SQLite embarquée indexée (sqlite_backend.py)
+Les deux modules exposent les mêmes requêtes (REQUETES), aux mêmes signatures
+"""
+
+import importlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = {"memoire": "snapshot", "sqlite": "sqlite_backend"}
+
+REQUETES = (
+    "load_registre_equipes", "team_id", "team_name", "normalize_team_name",
+    "nombre_matchs", "matchs_de", "affiche", "liste_groupes", "equipes_groupe", "groupe_de",
+    "get_classement_groupe", "get_classement_equipe",
+    "prochains_matchs", "derniers_matchs", "matchs_entre", "load_stades",
+    "top_buteurs", "top_attaques", "top_defenses", "bilan_buts", "repartition_effectifs",
+    "precharger",
+)
+
+
+def module_backend(nom):
+    """Module qui implémente un stockage ('memoire' ou 'sqlite')"""
+    if nom not in BACKENDS:
+        raise ValueError(f"Stockage inconnu: {nom} ({', '.join(BACKENDS)})")
+    return importlib.import_module(BACKENDS[nom])
+
+
+BACKEND = os.environ.get("CAN_BACKEND", "memoire")
+if BACKEND not in BACKENDS:
+    logger.error(f"CAN_BACKEND invalide ({BACKEND}): stockage en mémoire")
+    BACKEND = "memoire"
+
+if BACKEND == "sqlite":
+    from sqlite_backend import (  # noqa: F401
+        load_registre_equipes, team_id, team_name, normalize_team_name,
+        nombre_matchs, matchs_de, affiche, liste_groupes, equipes_groupe, groupe_de,
+        get_classement_groupe, get_classement_equipe,
+        prochains_matchs, derniers_matchs, matchs_entre, load_stades,
+        top_buteurs, top_attaques, top_defenses, bilan_buts, repartition_effectifs,
+        precharger,
+    )
+else:
+    from snapshot import (  # noqa: F401
+        load_registre_equipes, team_id, team_name, normalize_team_name,
+        nombre_matchs, matchs_de, affiche, liste_groupes, equipes_groupe, groupe_de,
+        get_classement_groupe, get_classement_equipe,
+        prochains_matchs, derniers_matchs, matchs_entre, load_stades,
+        top_buteurs, top_attaques, top_defenses, bilan_buts, repartition_effectifs,
+        precharger,
+    )
@@ -0,0 +1,239 @@
+"""
+Benchmark des stockages des handlers : instantané en mémoire contre SQLite
+Chaque requête de backend.REQUETES est mesurée sur les deux stockages, sur les
+données actuelles puis sur un jeu agrandi synthétiquement (--editions tournois :
+poules, phases finales, classements et effectifs recopiés, scores tirés au hasard).
+
+Usage :
+    python benchmarks/bench_backends.py                  # actuel + 50 éditions
+    python benchmarks/bench_backends.py --editions 10 -k matchs
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import snapshot  # noqa: E402
+import sqlite_backend  # noqa: E402
+from bench_suite import mesurer, resume  # noqa: E402
+from core import UNKNOWN_TEAM_ID, appliquer_score, classer_stats  # noqa: E402
+from snapshot import Tournoi  # noqa: E402
+
+EDITIONS = 50
+REPETITIONS = 300
+INSTANT = datetime(2026, 1, 10, 12)
+
+
+def cas(groupe):
+    """(nom, requête, arguments) mesurés ; groupe : un groupe existant du jeu de données"""
+    maroc, comores = snapshot.team_id("Maroc"), snapshot.team_id("Comores")
+    return [
+        ("matchs_de", "matchs_de", (maroc,)),
+        ("affiche", "affiche", (comores, maroc)),
+        ("equipes_groupe", "equipes_groupe", (groupe,)),
+        ("groupe_de", "groupe_de", (maroc,)),
+        ("classement_groupe", "get_classement_groupe", (groupe,)),
+        ("classement_equipe", "get_classement_equipe", ("Maroc",)),
+        ("prochains_matchs", "prochains_matchs", (INSTANT, None, 3)),
+        ("prochains_matchs.equipe", "prochains_matchs", (INSTANT, "Maroc")),
+        ("derniers_matchs.equipe", "derniers_matchs", (INSTANT, "Maroc")),
+        ("matchs_entre", "matchs_entre", (INSTANT, INSTANT + timedelta(days=3))),
+        ("stades", "load_stades", ()),
+        ("buteurs", "top_buteurs", ()),
+        ("buteurs.equipe", "top_buteurs", ("Maroc",)),
+        ("attaques", "top_attaques", ()),
+        ("defenses", "top_defenses", ()),
+        ("bilan_buts", "bilan_buts", ()),
+        ("effectifs", "repartition_effectifs", ()),
+    ]
+
+
+# ==========================================================
+# JEU DE DONNÉES AGRANDI
+# ==========================================================
+
+def _copie(record, **changements):
+    valeurs = {c: getattr(record, c) for c in record.__slots__}
+    valeurs.update(changements)
+    return type(record)(**valeurs)
+
+
+def _score(hasard):
+    return f"{hasard.randint(0, 4)}-{hasard.randint(0, 3)}"
+
+
+def agrandir(tournoi, stades, joueurs, editions, graine=0):
+    """
+    Parties {'tournoi', 'stades', 'joueurs', 'stats'} de editions tournois : l'édition 0
+    est le tournoi actuel, les autres le recopient (groupes renommés 'A1'…, matchs
+    décalés d'un an par édition, scores et buts tirés au hasard)
+    """
+    hasard = random.Random(graine)
+    poules, finales, tous_joueurs = [], [], []
+    groupes, classement = {}, {}
+    for k in range(editions):
+        suffixe = str(k) if k else ""
+        decalage = timedelta(days=365 * k)
+        for m in tournoi.poules:
+            poules.append(_copie(m, groupe=f"{m.groupe}{suffixe}", score=m.score if not k else _score(hasard)))
+        for m in tournoi.finales:
+            finales.append(_copie(
+                m, instant=m.instant - decalage if m.instant else None,
+                score=m.score if not k else _score(hasard),
+            ))
+        for groupe, equipes in tournoi.groupes.items():
+            groupes[f"{groupe}{suffixe}"] = list(equipes)
+        for groupe, lignes in tournoi.classement.items():
+            classement[f"{groupe}{suffixe}"] = [_copie(l, groupe=f"{groupe}{suffixe}") for l in lignes]
+        for j in joueurs:
+            tous_joueurs.append(j if not k else _copie(
+                j, joueur=f"{j.joueur} ({k})", buts=hasard.randint(0, j.buts or 1),
+            ))
+
+    affiches, groupe_equipe = {}, {}
+    for m in poules + finales:
+        if UNKNOWN_TEAM_ID not in (m.equipe1_id, m.equipe2_id):
+            affiches.setdefault((m.equipe1_id, m.equipe2_id), m)
+    for groupe, equipes in groupes.items():
+        for equipe in equipes:
+            groupe_equipe.setdefault(snapshot.team_id(equipe), groupe)
+
+    dates = sorted((m for m in finales if m.instant), key=lambda m: m.instant)
+    par_equipe = {}
+    for m in dates:
+        for tid in (m.equipe1_id, m.equipe2_id):
+            if tid == UNKNOWN_TEAM_ID:
+                continue
+            instants, liste = par_equipe.setdefault(tid, ([], []))
+            instants.append(m.instant)
+            liste.append(m)
+
+    agrandi = Tournoi(
+        poules=poules, finales=finales, groupes=groupes, groupe_equipe=groupe_equipe,
+        affiches=affiches, classement=classement,
+        calendrier={'instants': [m.instant for m in dates], 'matchs': dates, 'equipes': par_equipe},
+    )
+    return {
+        'tournoi': agrandi, 'stades': stades, 'joueurs': tous_joueurs,
+        'stats': stats_de(agrandi, tous_joueurs),
+    }
+
+
+def stats_de(tournoi, joueurs, top=10):
+    """Agrégats de la partie 'stats' calculés sans pandas (même forme que data_manager.load_stats)"""
+    stats = {'matchs_joues': 0, 'buts_total': 0, 'buts_phase': {}, 'equipes': {}}
+    for m in tournoi.poules + tournoi.finales:
+        appliquer_score(stats, {'phase': m.phase, 'equipe1': m.equipe1, 'equipe2': m.equipe2}, m.score, 1)
+
+    buteurs = sorted(((j.joueur, j.equipe, j.buts, j.equipe_id) for j in joueurs if j.buts),
+                     key=lambda b: (-b[2], b[0]))
+    par_equipe = {}
+    for joueur, equipe, buts, tid in buteurs:
+        par_equipe.setdefault(tid, []).append((joueur, equipe, buts))
+
+    def comptes(valeurs):
+        return dict(sorted(Counter(v for v in valeurs if v).items(), key=lambda c: (-c[1], c[0])))
+
+    stats.update(
+        buteurs=[b[:3] for b in buteurs[:top]],
+        buteurs_equipe={tid: liste[:top] for tid, liste in par_equipe.items()},
+        joueurs_club=comptes(j.club for j in joueurs),
+        joueurs_poste=comptes(j.poste for j in joueurs),
+    )
+    classer_stats(stats)
+    return stats
+
+
+# ==========================================================
+# MESURE
+# ==========================================================
+
+def installer(parties, base):
+    """Sert parties depuis les deux stockages : instantané en mémoire et base SQLite base"""
+    snapshot.clear_cache()
+    snapshot._parties.update(registre=snapshot.lire_partie('registre')[0], **parties)
+    debut = time.perf_counter()
+    sqlite_backend.build_base(base, parties)
+    construction = time.perf_counter() - debut
+    sqlite_backend.clear_cache()
+    sqlite_backend.ouvrir(base, reconstruire=False)
+    return construction
+
+
+def mesurer_jeu(libelle, parties, base, filtre=None, repetitions=REPETITIONS):
+    construction = installer(parties, base)
+    groupe = next(iter(parties['tournoi'].groupes))
+    resultats = {}
+    for nom, requete, arguments in cas(groupe):
+        if filtre and filtre not in nom:
+            continue
+        ligne = {}
+        for stockage, module in (("memoire", snapshot), ("sqlite", sqlite_backend)):
+            fonction = getattr(module, requete)
+            ligne[stockage] = resume(mesurer(lambda: fonction(*arguments), repetitions))["p50"]
+        resultats[nom] = ligne
+    return {
+        "jeu": libelle,
+        "matchs": len(parties['tournoi'].poules) + len(parties['tournoi'].finales),
+        "joueurs": len(parties['joueurs']),
+        "construction_sqlite_ms": round(construction * 1e3, 1),
+        "taille_sqlite_ko": round(base.stat().st_size / 1024, 1),
+        "cas": resultats,
+    }
+
+
+def afficher(resultat):
+    print("=" * 72)
+    print(f"{resultat['jeu']} : {resultat['matchs']} matchs, {resultat['joueurs']} joueurs — "
+          f"base SQLite {resultat['taille_sqlite_ko']} Ko construite en {resultat['construction_sqlite_ms']} ms")
+    print("-" * 72)
+    print(f"{'requête':28} {'mémoire µs':>12} {'sqlite µs':>12} {'sqlite/mémoire':>16}")
+    for nom, s in resultat["cas"].items():
+        rapport = s["sqlite"] / s["memoire"] if s["memoire"] else float("inf")
+        print(f"{nom:28} {s['memoire']:12.1f} {s['sqlite']:12.1f} {rapport:15.1f}×")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark des stockages mémoire et SQLite (p50 en µs)")
+    parser.add_argument("--editions", type=int, default=EDITIONS, help="tournois du jeu agrandi (0 : aucun)")
+    parser.add_argument("--repetitions", type=int, default=REPETITIONS)
+    parser.add_argument("-k", dest="filtre", help="seulement les requêtes dont le nom contient ce texte")
+    parser.add_argument("--json", type=Path, help="enregistre les résultats dans ce fichier")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    actuel = {nom: snapshot.lire_partie(nom)[0] for nom in ('tournoi', 'stades', 'joueurs', 'stats')}
+    jeux = [("Tournoi actuel", actuel)]
+    if args.editions > 1:
+        agrandi = agrandir(actuel['tournoi'], actuel['stades'], actuel['joueurs'], args.editions)
+        jeux.append((f"{args.editions} tournois (synthétique)", agrandi))
+
+    resultats = []
+    with tempfile.TemporaryDirectory() as dossier:
+        try:
+            for i, (libelle, parties) in enumerate(jeux):
+                resultat = mesurer_jeu(libelle, parties, Path(dossier) / f"jeu{i}.sqlite",
+                                       args.filtre, args.repetitions)
+                afficher(resultat)
+                resultats.append(resultat)
+        finally:
+            snapshot.clear_cache()
+            sqlite_backend.clear_cache()
+    print("=" * 72)
+
+    if args.json:
+        args.json.write_text(json.dumps(resultats, indent=1, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
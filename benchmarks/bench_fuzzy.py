@@ -0,0 +1,101 @@
+"""
+Benchmark de la résolution approximative (fautes de frappe)
+Compte les appels LLaMA évités sur un corpus de questions mal orthographiées
+Code de sortie 1 si des questions du corpus atteignent encore LLaMA avec la résolution
+
+Usage : python benchmarks/bench_fuzzy.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chatbot_can  # noqa: E402
+from bench_suite import vider_caches_questions  # noqa: E402
+
+CORPUS_FAUTES = [
+    "matchs du senegall",
+    "quand joue le marok",
+    "joueurs cote divoire",
+    "effectif de l'algeri",
+    "classement du camerron",
+    "classement du nigéria",
+    "matchs de la tunisi",
+    "effectif tanzanei",
+    "joueurs du zimbabew",
+    "quand joue l'egypt",
+    "matchs du burkina fasso",
+    "joueurs de la guinee equatorial",
+    "classement de l'angolla",
+    "où joue hakimy",
+    "club de mohamed salha",
+    "où joue sadio mane",
+    "capacité du stade adarar",
+    "stade ibn batuta",
+    "matchs de l'ouganda",
+    "effectif du gabonn",
+]
+
+
+def run(corpus, fuzzy):
+    """Passe le corpus dans chatbot() avec LLaMA remplacé par un compteur"""
+    appels = []
+
+    def llama_stub(question):
+        appels.append(question)
+        return {"intent": "inconnu", "team": None, "groupe": None, "phase": None}
+
+    original = chatbot_can.llama_intent_router
+    chatbot_can.llama_intent_router = llama_stub
+    chatbot_can.FUZZY_ENABLED = fuzzy
+    # Chaque passage part de questions jamais vues, quel que soit l'ordre des passages
+    vider_caches_questions()
+    try:
+        debut = time.perf_counter()
+        for question in corpus:
+            chatbot_can.chatbot(question)
+        duree = time.perf_counter() - debut
+    finally:
+        chatbot_can.llama_intent_router = original
+        chatbot_can.FUZZY_ENABLED = True
+
+    return appels, duree
+
+
+def cout_resolution(corpus, repetitions=20):
+    """Temps moyen d'une résolution approximative (équipes + joueurs + stades), sans cache"""
+    resolveurs = (chatbot_can.resolveur_equipes(), chatbot_can.resolveur_joueurs(),
+                  chatbot_can.resolveur_stades())
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        for question in corpus:
+            for resolveur in resolveurs:
+                resolveur.resoudre(question)
+    return (time.perf_counter() - debut) / (repetitions * len(corpus))
+
+
+if __name__ == "__main__":
+    sans, duree_sans = run(CORPUS_FAUTES, fuzzy=False)
+    avec, duree_avec = run(CORPUS_FAUTES, fuzzy=True)
+
+    print("=" * 60)
+    print(f"Corpus : {len(CORPUS_FAUTES)} questions avec fautes")
+    print("-" * 60)
+    print(f"Sans résolution approximative : {len(sans):3d} appels LLaMA "
+          f"({duree_sans / len(CORPUS_FAUTES) * 1e3:.3f} ms/question, LLaMA simulé)")
+    print(f"Avec résolution approximative : {len(avec):3d} appels LLaMA "
+          f"({duree_avec / len(CORPUS_FAUTES) * 1e3:.3f} ms/question, LLaMA simulé)")
+    print(f"Coût d'une résolution         : {cout_resolution(CORPUS_FAUTES) * 1e3:.3f} ms "
+          f"(3 index de trigrammes)")
+    print(f"Appels LLaMA évités           : {len(sans) - len(avec):3d} "
+          f"({(len(sans) - len(avec)) / max(len(sans), 1):.0%})")
+    if avec:
+        print("\nEncore routées vers LLaMA :")
+        for question in avec:
+            print(f"   • {question}")
+    # Contrôle : la résolution doit éviter tous les appels LLaMA du corpus
+    print(f"\n{'✓' if not avec else '✗'} Appels évités : {len(sans) - len(avec)} attendus {len(sans)}")
+    print("=" * 60)
+    sys.exit(1 if avec or not sans else 0)
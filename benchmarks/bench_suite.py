@@ -0,0 +1,300 @@
+"""
+Suite de benchmarks du chatbot (remplace test_optimizations.py)
+- micro : normalize_text, analyse des questions, find_team, chaque handler d'INTENT_HANDLERS
+- chargements : parties de l'instantané et loaders CSV, cache froid et chaud
+- bout en bout : chatbot() sur le corpus fixe, LLaMA simulé (aucun appel à ollama),
+  questions déjà vues (chaud) et jamais vues (froid : caches par question vidés)
+
+Chaque mesure donne min / moyenne / p50 / p90 / p99 (µs), meilleure de MANCHES
+séries. La référence est enregistrée en JSON avec --save ; sans --save, les
+mesures sont comparées à la référence et le code de sortie vaut 1 si une
+médiane a régressé (régression confirmée par de nouvelles mesures).
+
+Usage :
+    python benchmarks/bench_suite.py --save            # enregistre la référence
+    python benchmarks/bench_suite.py                   # compare à la référence
+    python benchmarks/bench_suite.py -k handler.       # seulement les handlers
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chatbot_can  # noqa: E402
+import data_manager as dm  # noqa: E402
+import snapshot  # noqa: E402
+from corpus import CORPUS, REGLES, routeur_simule  # noqa: E402
+
+# Référence propre à la machine (non versionnée)
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Régression : médiane plus lente de TOLERANCE et d'au moins PLANCHER_US (bruit de mesure)
+TOLERANCE = 0.30
+PLANCHER_US = 5.0
+
+# Chaque cas est mesuré en MANCHES séries : la série de médiane la plus basse est retenue
+# (une série perturbée par la machine ne suffit pas à signaler une régression)
+MANCHES = 3
+
+# Une régression n'est signalée que si elle se confirme à CONFIRMATIONS nouvelles mesures
+CONFIRMATIONS = 2
+
+# Argument(s) de chaque handler : un handler ajouté sans entrée ici fait échouer la suite
+ARGUMENTS = {
+    "matchs_equipe": ("Maroc",),
+    "score": ("score Maroc Comores",),
+    "joueurs": ("Sénégal",),
+    "classement": ("Maroc",),
+    "equipes_groupe": ("A",),
+    "groupe": ("Mali",),
+    "stades": (None,),
+    "phase": ("Quart",),
+    "buteurs": (None,),
+    "attaque": (None,),
+    "defense": (None,),
+    "moyenne_buts": (None,),
+    "effectifs": (None,),
+    "prochain_match": ("Maroc",),
+    "matchs_jour": (None,),
+    "matchs_weekend": (None,),
+    "parcours": ("Maroc",),
+    "adversaire_vainqueur": ("Sénégal",),
+    "adversaire_potentiel": ("Maroc", "Finale"),
+    "club_joueur": ("ou joue hakimi",),
+    "joueurs_club": ("joueurs du PSG",),
+    "joueurs_poste": ("Sénégal", "GK"),
+    "stade": ("stade adrar",),
+    "confrontations": ("historique Maroc contre Égypte",),
+    "qualification": ("Mali",),
+    "matchs_ville": ("matchs à Rabat",),
+    "lieu_phase": ("demi",),
+    "capacite_phase": ("demi",),
+}
+
+# Loaders CSV de data_manager (construction de l'instantané)
+LOADERS_CSV = [
+    dm.load_registre_equipes, dm.load_poules, dm.load_finales, dm.load_joueurs,
+    dm.load_classement, dm.load_groupes, dm.load_stades, dm.load_equipes,
+]
+
+
+# ==========================================================
+# MESURE ET STATISTIQUES
+# ==========================================================
+
+def mesurer(fonction, repetitions, preparer=None, echauffement=3):
+    """
+    Durées (s) de repetitions appels à fonction(), ramasse-miettes suspendu
+    preparer() est appelé avant chaque appel, hors chronométrage
+    """
+    for _ in range(echauffement):
+        if preparer:
+            preparer()
+        fonction()
+
+    durees = []
+    gc_actif = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repetitions):
+            if preparer:
+                preparer()
+            debut = time.perf_counter()
+            fonction()
+            durees.append(time.perf_counter() - debut)
+    finally:
+        if gc_actif:
+            gc.enable()
+    return durees
+
+
+def percentile(valeurs_triees, p):
+    """Percentile p (0-100) par interpolation linéaire"""
+    if len(valeurs_triees) == 1:
+        return valeurs_triees[0]
+    rang = (len(valeurs_triees) - 1) * p / 100
+    bas = int(rang)
+    haut = min(bas + 1, len(valeurs_triees) - 1)
+    return valeurs_triees[bas] + (valeurs_triees[haut] - valeurs_triees[bas]) * (rang - bas)
+
+
+def resume(durees):
+    """Statistiques en microsecondes d'une série de durées en secondes"""
+    triees = sorted(d * 1e6 for d in durees)
+    return {
+        "n": len(triees),
+        "min": round(triees[0], 2),
+        "moyenne": round(sum(triees) / len(triees), 2),
+        "p50": round(percentile(triees, 50), 2),
+        "p90": round(percentile(triees, 90), 2),
+        "p99": round(percentile(triees, 99), 2),
+    }
+
+
+# ==========================================================
+# CAS MESURÉS
+# ==========================================================
+
+def _sur_corpus(fonction, questions):
+    return lambda: [fonction(q) for q in questions]
+
+
+def vider_caches_questions():
+    """Oublie tout ce qui est mémorisé par texte de question (questions jamais vues)"""
+    for nom in ("_analyser", "find_team_id", "_equipe_approchee"):
+        cache = getattr(chatbot_can, nom, None)
+        if cache is not None:
+            cache.cache_clear()
+
+
+def cas_micro():
+    yield "micro.normalize_text", _sur_corpus(chatbot_can.normalize_text, CORPUS), 500, None
+    yield ("micro.analyser.froid", _sur_corpus(chatbot_can.analyser, CORPUS), 300,
+           chatbot_can._analyser.cache_clear)
+    yield "micro.analyser.chaud", _sur_corpus(chatbot_can.analyser, CORPUS), 500, None
+    yield "micro.find_team.chaud", _sur_corpus(chatbot_can.find_team, REGLES), 500, None
+    yield ("micro.find_team.froid", _sur_corpus(chatbot_can.find_team, REGLES), 100,
+           chatbot_can.find_team_id.cache_clear)
+
+    manquants = set(chatbot_can.INTENT_HANDLERS) - set(ARGUMENTS)
+    if manquants:
+        raise SystemExit(f"Handlers sans arguments de benchmark : {', '.join(sorted(manquants))}")
+    for intention, handler in chatbot_can.INTENT_HANDLERS.items():
+        arguments = ARGUMENTS[intention]
+        yield f"handler.{intention}", (lambda h=handler, a=arguments: h(*a)), 300, None
+
+
+def cas_chargements():
+    # Instantané construit dans un dossier temporaire : data/snapshot/ (servi par l'API) reste intact
+    with tempfile.TemporaryDirectory(prefix="can-bench-") as temporaire:
+        dossier = Path(temporaire)
+        snapshot.build_snapshot(dossier)
+        for nom in snapshot.PARTIES:
+            yield (f"charge.instantane.{nom}.froid",
+                   lambda n=nom: snapshot.partie_enregistree(n, dossier_snapshot=dossier), 30, None)
+            # Partie gardée en mémoire, lue depuis le même dossier (load_partie n'écrit rien)
+            snapshot._parties.setdefault(nom, snapshot.partie_enregistree(nom, dossier_snapshot=dossier))
+            yield f"charge.instantane.{nom}.chaud", lambda n=nom: snapshot.load_partie(n), 1000, None
+
+    for loader in LOADERS_CSV:
+        nom = loader.__name__.removeprefix("load_")
+        yield f"charge.csv.{nom}.froid", loader, 20, loader.cache_clear
+        yield f"charge.csv.{nom}.chaud", loader, 1000, None
+
+
+def cas_bout_en_bout():
+    yield "chatbot.corpus", _sur_corpus(chatbot_can.chatbot, CORPUS), 30, None
+    yield "chatbot.corpus.froid", _sur_corpus(chatbot_can.chatbot, CORPUS), 30, vider_caches_questions
+
+
+GROUPES = (cas_micro, cas_chargements, cas_bout_en_bout)
+
+
+def executer(filtre=None, noms=None):
+    """Mesure les cas dont le nom contient filtre (ou figure dans noms) : {nom: statistiques}"""
+    resultats = {}
+    routeur = chatbot_can.llama_intent_router
+    chatbot_can.llama_intent_router = routeur_simule()
+    try:
+        for groupe in GROUPES:
+            for nom, fonction, repetitions, preparer in groupe():
+                if (filtre and filtre not in nom) or (noms is not None and nom not in noms):
+                    continue
+                series = [mesurer(fonction, repetitions, preparer) for _ in range(MANCHES)]
+                resultats[nom] = min((resume(d) for d in series), key=lambda r: r["p50"])
+                if nom == "chatbot.corpus":
+                    resultats[nom]["questions_par_s"] = round(
+                        len(CORPUS) / (resultats[nom]["p50"] / 1e6), 1
+                    )
+    finally:
+        chatbot_can.llama_intent_router = routeur
+    return resultats
+
+
+# ==========================================================
+# RÉFÉRENCE ET RAPPORT
+# ==========================================================
+
+def regressions(resultats, reference, tolerance=TOLERANCE):
+    """Cas dont la médiane dépasse celle de la référence : [(nom, avant, après)]"""
+    lentes = []
+    for nom, stats in resultats.items():
+        avant = reference.get(nom)
+        if avant is None:
+            continue
+        if (stats["p50"] > avant["p50"] * (1 + tolerance)
+                and stats["p50"] - avant["p50"] > PLANCHER_US):
+            lentes.append((nom, avant["p50"], stats["p50"]))
+    return lentes
+
+
+def afficher(resultats, reference):
+    print(f"{'cas':44} {'p50':>10} {'p90':>10} {'p99':>10} {'réf. p50':>10}")
+    print("-" * 88)
+    for nom, s in resultats.items():
+        ref = reference.get(nom, {}).get("p50")
+        print(f"{nom:44} {s['p50']:10.1f} {s['p90']:10.1f} {s['p99']:10.1f} "
+              f"{ref if ref is not None else '-':>10}")
+    if "chatbot.corpus" in resultats:
+        print(f"\nDébit chatbot() : {resultats['chatbot.corpus']['questions_par_s']} questions/s "
+              f"({len(CORPUS)} questions, LLaMA simulé)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks du chatbot CAN 2025 (durées en µs)")
+    parser.add_argument("--save", action="store_true", help="enregistre les mesures comme référence")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="fichier JSON de référence")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="ralentissement de la médiane toléré (0.30 = +30 %%)")
+    parser.add_argument("-k", dest="filtre", help="seulement les cas dont le nom contient ce texte")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    resultats = executer(args.filtre)
+
+    reference = {}
+    if args.baseline.exists():
+        reference = json.loads(args.baseline.read_text(encoding="utf-8"))["cas"]
+
+    afficher(resultats, {} if args.save else reference)
+
+    if args.save:
+        # Référence existante conservée pour les cas non mesurés (-k)
+        reference.update(resultats)
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cas": reference,
+        }, indent=1, ensure_ascii=False), encoding="utf-8")
+        print(f"\n✓ Référence enregistrée : {args.baseline}")
+        return 0
+
+    if not reference:
+        print(f"\nAucune référence ({args.baseline}) : relancer avec --save")
+        return 0
+
+    lentes = regressions(resultats, reference, args.tolerance)
+    for _ in range(CONFIRMATIONS):
+        if not lentes:
+            break
+        remesures = executer(noms={nom for nom, _, _ in lentes})
+        lentes = regressions(remesures, reference, args.tolerance)
+    if lentes:
+        print(f"\n❌ {len(lentes)} régression(s) (médiane > +{args.tolerance:.0%}) :")
+        for nom, avant, apres in lentes:
+            print(f"   • {nom}: {avant:.1f} → {apres:.1f} µs")
+        return 1
+    print("\n✅ Aucune régression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
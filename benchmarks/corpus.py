@@ -0,0 +1,85 @@
+"""
+Corpus de questions fixe des benchmarks, rangé par étage du routage attendu,
+et routeur LLaMA simulé (réponses figées, aucun appel à ollama)
+"""
+
+import time
+
+SALUTATIONS = [
+    "bonjour",
+    "salut !",
+    "merci beaucoup",
+    "hello",
+    "aide moi",
+]
+
+REGLES = [
+    "classement groupe A",
+    "classement groupe F",
+    "classement du Maroc",
+    "classement de la cote d'ivoire",
+    "matchs du Maroc",
+    "matchs du Sénégal",
+    "quand joue le mali",
+    "score Maroc Comores",
+    "score Sénégal Égypte",
+    "resultat mali tunisie",
+    "joueurs du Sénégal",
+    "effectif de la RDC",
+    "liste des joueurs du soudan",
+    "meilleurs buteurs",
+    "meilleurs buteurs du Maroc",
+    "meilleure attaque",
+    "meilleure défense",
+    "moyenne de buts",
+    "clubs les plus représentés",
+    "stades",
+    "stade de Fès",
+    "capacité du stade adrar",
+    "parcours du Maroc",
+    "parcours de l'Algérie",
+    "adversaire du vainqueur du Sénégal",
+    "adversaire potentiel du Maroc en finale",
+    "huitièmes de finale",
+    "quarts de finale",
+    "demi finale",
+    "gardiens du Sénégal",
+    "attaquants du Maroc",
+    "ou joue hakimi",
+    "club de salah",
+    "joueurs du PSG",
+    "joueurs de manchester city",
+    "matchs du senegall",
+    "classement du marok",
+    "équipes du groupe B",
+]
+
+# Question → analyse renvoyée par le routeur simulé
+LLM = {
+    "parle moi de l'algerie": {"intent": "matchs_equipe", "team": "Algérie"},
+    "le maroc est-il favori ?": {"intent": "classement", "team": "Maroc"},
+    "tu penses quoi du senegal": {"intent": "joueurs", "team": "Sénégal"},
+    "infos sur le groupe B": {"intent": "equipes_groupe", "groupe": "B"},
+    "bilan du nigeria": {"intent": "matchs_equipe", "team": "Nigeria"},
+    "où ont lieu les matchs ?": {"intent": "stades"},
+    "c'est quoi la CAN": {"intent": "conversation"},
+    "qui va gagner la CAN ?": {"intent": "inconnu"},
+}
+
+CORPUS = SALUTATIONS + REGLES + list(LLM)
+
+
+def analyse_simulee(question):
+    """Analyse figée d'une question du corpus (intention inconnue sinon)"""
+    analyse = {"intent": "inconnu", "team": None, "groupe": None, "phase": None}
+    analyse.update(LLM.get(question, {}))
+    return analyse
+
+
+def routeur_simule(latence=0.0):
+    """Remplaçant de llama_intent_router : latence fixe (s) puis analyse figée"""
+    def llama_intent_router(question):
+        if latence:
+            time.sleep(latence)
+        return analyse_simulee(question)
+    return llama_intent_router
@@ -0,0 +1,289 @@
+"""
+Test de charge HTTP de POST /chat (app_api) avec un faux serveur de modèle
+Rejoue un mélange pondéré de questions (salutations, règles, LLaMA) à une
+concurrence donnée ; le faux serveur imite l'API ollama (/api/generate) avec
+une latence et un taux d'échec réglables. Rapport : débit, percentiles de
+latence par étage, taux d'erreurs, délestages de l'étage LLaMA.
+Dans le processus, le cache de réponses est désactivé par défaut : une question
+LLaMA répétée servie par le cache fausserait les percentiles de l'étage LLaMA
+(--avec-cache pour mesurer le service tel qu'en production).
+
+Usage :
+    # dans le processus (aucun serveur à lancer)
+    python benchmarks/load_test.py --requetes 500 --concurrence 8 --latence 0.4
+
+    # contre une API lancée à part, branchée sur le faux modèle
+    python benchmarks/load_test.py --modele-seul --port-modele 11435
+    OLLAMA_URL=http://127.0.0.1:11435 uvicorn app_api:app
+    python benchmarks/load_test.py --url http://127.0.0.1:8000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_suite import percentile  # noqa: E402
+from corpus import LLM, REGLES, SALUTATIONS, analyse_simulee  # noqa: E402
+from llama_router import SYSTEM_PROMPT  # noqa: E402
+
+QUESTIONS = {"salutation": SALUTATIONS, "regles": REGLES, "llm": list(LLM)}
+MELANGE = "salutation=1,regles=6,llm=3"
+
+
+# ==========================================================
+# FAUX SERVEUR DE MODÈLE (API OLLAMA)
+# ==========================================================
+
+class ServeurModele(ThreadingHTTPServer):
+    """POST /api/generate : analyse figée du corpus après latence ± gigue, échecs aléatoires"""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latence=0.3, gigue=0.1, taux_echec=0.0, graine=0):
+        super().__init__(("127.0.0.1", port), _GestionnaireModele)
+        self.latence = latence
+        self.gigue = gigue
+        self.taux_echec = taux_echec
+        self.hasard = random.Random(graine)
+        self.appels = 0
+        self.echecs = 0
+        self._verrou = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def tirer(self):
+        """(latence, échec) de l'appel suivant"""
+        with self._verrou:
+            self.appels += 1
+            latence = max(0.0, self.hasard.uniform(self.latence - self.gigue, self.latence + self.gigue))
+            echec = self.hasard.random() < self.taux_echec
+            self.echecs += echec
+            return latence, echec
+
+    def demarrer(self):
+        threading.Thread(target=self.serve_forever, name="faux-modele", daemon=True).start()
+        return self
+
+
+class _GestionnaireModele(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self.send_error(404)
+            return
+        corps = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        question = corps.get("prompt", "").removeprefix(SYSTEM_PROMPT)
+
+        latence, echec = self.server.tirer()
+        time.sleep(latence)
+        if echec:
+            self.send_error(500, "échec simulé")
+            return
+
+        contenu = json.dumps({
+            "model": corps.get("model"),
+            "response": json.dumps(analyse_simulee(question), ensure_ascii=False),
+            "done": True,
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(contenu)))
+        self.end_headers()
+        self.wfile.write(contenu)
+
+    def log_message(self, *args):
+        pass
+
+
+# ==========================================================
+# CLIENTS (DANS LE PROCESSUS OU HTTP)
+# ==========================================================
+
+def client_local(avec_cache=False):
+    """POST /chat sur l'application dans le processus (TestClient)"""
+    os.environ.setdefault("CAN_PREFETCH", "0")
+    from fastapi.testclient import TestClient
+    import app_api
+    import learned_rules
+    from response_cache import ResponseCache
+
+    # Analyses du faux modèle : jamais dans le journal des règles apprises
+    learned_rules.JOURNAL_ROUTES = None
+
+    if not avec_cache:
+        app_api.reponses = ResponseCache(capacite=0)
+    client = TestClient(app_api.app)
+
+    def envoyer(message):
+        r = client.post("/chat", json={"message": message})
+        return r.status_code, r.json() if r.status_code == 200 else None
+    return envoyer
+
+
+def client_http(url):
+    """POST /chat sur une API lancée à part"""
+    def envoyer(message):
+        requete = urllib.request.Request(
+            f"{url.rstrip('/')}/chat",
+            data=json.dumps({"message": message}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(requete, timeout=60) as r:
+                return r.status, json.loads(r.read())
+        except urllib.error.HTTPError as e:
+            return e.code, None
+    return envoyer
+
+
+# ==========================================================
+# CHARGE ET RAPPORT
+# ==========================================================
+
+def lire_melange(texte):
+    """'salutation=1,regles=6,llm=3' → {'salutation': 1.0, 'regles': 6.0, 'llm': 3.0}"""
+    poids = {}
+    for element in texte.split(","):
+        etage, _, valeur = element.partition("=")
+        if etage.strip() not in QUESTIONS:
+            raise SystemExit(f"Étage inconnu dans le mélange : {etage} ({', '.join(QUESTIONS)})")
+        poids[etage.strip()] = float(valeur or 1)
+    return poids
+
+
+def plan(requetes, melange, graine=0):
+    """Liste fixe (étage prévu, question) tirée selon les poids du mélange"""
+    hasard = random.Random(graine)
+    etages = hasard.choices(list(melange), weights=list(melange.values()), k=requetes)
+    return [(etage, hasard.choice(QUESTIONS[etage])) for etage in etages]
+
+
+def charger(envoyer, questions, concurrence):
+    """Envoie les questions avec concurrence threads : (durée totale, mesures)"""
+    def une(element):
+        etage, question = element
+        debut = time.perf_counter()
+        try:
+            statut, corps = envoyer(question)
+        except Exception as e:
+            statut, corps = type(e).__name__, None
+        return {
+            "prevu": etage,
+            "etage": (corps or {}).get("etage"),
+            "statut": statut,
+            "duree": time.perf_counter() - debut,
+        }
+
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrence) as pool:
+        mesures = list(pool.map(une, questions))
+    return time.perf_counter() - debut, mesures
+
+
+def rapport(duree, mesures):
+    """Débit, erreurs, percentiles (ms) et étages obtenus par étage prévu"""
+    erreurs = sum(m["statut"] != 200 for m in mesures)
+    par_etage = defaultdict(list)
+    for m in mesures:
+        par_etage[m["prevu"]].append(m)
+
+    etages = {}
+    for etage, liste in par_etage.items():
+        durees = sorted(m["duree"] * 1e3 for m in liste)
+        etages[etage] = {
+            "n": len(liste),
+            "p50": round(percentile(durees, 50), 2),
+            "p90": round(percentile(durees, 90), 2),
+            "p99": round(percentile(durees, 99), 2),
+            "max": round(durees[-1], 2),
+            "erreurs": sum(m["statut"] != 200 for m in liste),
+            "obtenus": dict(Counter(m["etage"] for m in liste if m["statut"] == 200)),
+        }
+    return {
+        "requetes": len(mesures),
+        "duree_s": round(duree, 3),
+        "debit": round(len(mesures) / duree, 1),
+        "taux_erreur": round(erreurs / len(mesures), 4),
+        "etages": etages,
+    }
+
+
+def afficher(resultat, modele=None):
+    print("=" * 78)
+    print(f"{resultat['requetes']} requêtes en {resultat['duree_s']} s → {resultat['debit']} req/s, "
+          f"erreurs HTTP {resultat['taux_erreur']:.2%}")
+    print("-" * 78)
+    print(f"{'étage prévu':12} {'n':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}  obtenus")
+    for etage, s in sorted(resultat["etages"].items()):
+        obtenus = ", ".join(f"{k}={v}" for k, v in sorted(s["obtenus"].items(), key=str))
+        print(f"{etage:12} {s['n']:5d} {s['p50']:9.1f} {s['p90']:9.1f} {s['p99']:9.1f} "
+              f"{s['max']:9.1f}  {obtenus}")
+    if modele is not None:
+        print("-" * 78)
+        print(f"Faux modèle : {modele.appels} appels, {modele.echecs} échecs simulés")
+    print("=" * 78)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge de POST /chat")
+    parser.add_argument("--url", help="API lancée à part (sinon : application dans le processus)")
+    parser.add_argument("--requetes", type=int, default=300)
+    parser.add_argument("--concurrence", type=int, default=8)
+    parser.add_argument("--melange", default=MELANGE, help=f"poids par étage (défaut {MELANGE})")
+    parser.add_argument("--latence", type=float, default=0.3, help="latence du faux modèle (s)")
+    parser.add_argument("--gigue", type=float, default=0.1, help="variation de la latence (± s)")
+    parser.add_argument("--echecs", type=float, default=0.0, help="taux d'échec du faux modèle (0-1)")
+    parser.add_argument("--port-modele", type=int, default=0, help="port du faux modèle (0 = libre)")
+    parser.add_argument("--modele-seul", action="store_true", help="lance seulement le faux modèle")
+    parser.add_argument("--avec-cache", action="store_true",
+                        help="garde le cache de réponses (dans le processus ; désactivé par défaut)")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="enregistre le rapport dans ce fichier")
+    args = parser.parse_args(argv)
+
+    modele = ServeurModele(args.port_modele, args.latence, args.gigue, args.echecs, args.graine)
+    modele.demarrer()
+
+    if args.modele_seul:
+        print(f"Faux modèle sur {modele.url} (OLLAMA_URL) — Ctrl+C pour arrêter")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            return 0
+
+    if args.url:
+        envoyer = client_http(args.url)
+    else:
+        logging.disable(logging.ERROR)
+        import llama_router
+        llama_router.OLLAMA_URL = modele.url
+        envoyer = client_local(args.avec_cache)
+
+    questions = plan(args.requetes, lire_melange(args.melange), args.graine)
+    duree, mesures = charger(envoyer, questions, args.concurrence)
+    resultat = rapport(duree, mesures)
+    afficher(resultat, None if args.url else modele)
+
+    if args.json:
+        args.json.write_text(json.dumps(resultat, indent=1, ensure_ascii=False), encoding="utf-8")
+    modele.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
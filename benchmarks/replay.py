@@ -0,0 +1,219 @@
+"""
+Rejeu d'un journal de questions (JSONL) dans chatbot(), hors ligne
+Mesure la part de questions prise par chaque étage du routage (salutations,
+règles, LLaMA, réponse par défaut), sa latence, les écarts avec les
+étiquettes attendues et les questions non résolues les plus fréquentes.
+
+Une ligne du journal :
+    {"question": "effectif des pharaons", "intention": "joueurs", "equipe": "Égypte",
+     "groupe": null, "phase": null, "session": "s1"}
+Seule "question" est obligatoire ; "session" regroupe les relances d'une conversation.
+Le journal de l'API (CAN_JOURNAL_QUESTIONS) a ce format, sans étiquettes.
+
+LLaMA (--llm) :
+    inconnu   ne répond jamais (défaut : ce que couvrent les règles seules)
+    corpus    analyses figées du corpus des benchmarks
+    reel      vrai routeur (ollama) ; --enregistrer FICHIER garde ses analyses
+              (seul mode dont les routes vont au journal CAN_JOURNAL_LLM)
+    FICHIER   analyses enregistrées (rejeu déterministe d'un passage réel)
+
+Usage :
+    python benchmarks/replay.py benchmarks/questions.jsonl --llm corpus
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import chatbot_can  # noqa: E402
+import learned_rules  # noqa: E402
+from bench_suite import percentile  # noqa: E402
+from core import normalize  # noqa: E402
+from corpus import analyse_simulee  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from sessions import Contexte, SessionStore  # noqa: E402
+
+ETAGES = (chatbot_can.SALUTATION, chatbot_can.REGLES, chatbot_can.LLM,
+          chatbot_can.DEGRADE, chatbot_can.DEFAUT)
+ENTITES = ("equipe", "groupe", "phase")
+INCONNU = {"intent": "inconnu", "team": None, "groupe": None, "phase": None}
+
+
+def lire_journal(chemin):
+    with open(chemin, encoding="utf-8") as f:
+        return [json.loads(ligne) for ligne in f if ligne.strip()]
+
+
+def routeur(mode):
+    """Remplaçant de llama_intent_router selon --llm, et analyses à enregistrer"""
+    analyses = {}
+    if mode == "inconnu":
+        def interroger(question):
+            return dict(INCONNU)
+    elif mode == "corpus":
+        interroger = analyse_simulee
+    elif mode == "reel":
+        reel = chatbot_can.llama_intent_router
+
+        def interroger(question):
+            analyses[question] = reel(question)
+            return analyses[question]
+    else:
+        enregistrees = {e["question"]: e["analyse"] for e in lire_journal(mode)}
+
+        def interroger(question):
+            return dict(enregistrees.get(question, INCONNU))
+    return interroger, analyses
+
+
+def rejouer(lignes, interroger, cache=True, journaliser=False):
+    """
+    Passe chaque question dans chatbot() (même cache de réponses que l'API) : résultats par ligne
+    Les routes LLaMA ne sont journalisées (CAN_JOURNAL_LLM) qu'avec journaliser (vrai routeur)
+    """
+    original, journal = chatbot_can.llama_intent_router, learned_rules.JOURNAL_ROUTES
+    chatbot_can.llama_intent_router = interroger
+    if not journaliser:
+        learned_rules.JOURNAL_ROUTES = None
+    reponses = ResponseCache(capacite=ResponseCache().capacite if cache else 0)
+    sessions = SessionStore()
+    resultats = []
+    try:
+        for ligne in lignes:
+            question = ligne["question"]
+            contexte = sessions.get(ligne["session"]) if ligne.get("session") else Contexte()
+
+            debut = time.perf_counter()
+            reponse, en_cache = chatbot_can.repondre_avec_cache(reponses, question, contexte)
+            duree = time.perf_counter() - debut
+
+            resultats.append({
+                "ligne": ligne,
+                "etage": reponse.etage,
+                "intention": reponse.intention,
+                # Entités effectivement utilisées : celles retenues par le contexte
+                "entites": {"equipe": contexte.equipe, "groupe": contexte.groupe,
+                            "phase": contexte.phase},
+                "cache": en_cache,
+                "duree": duree,
+            })
+    finally:
+        chatbot_can.llama_intent_router = original
+        learned_rules.JOURNAL_ROUTES = journal
+    return resultats, reponses
+
+
+def ecarts(resultat):
+    """Champs étiquetés dont la valeur obtenue diffère : [(champ, attendu, obtenu)]"""
+    ligne = resultat["ligne"]
+    differences = []
+    if "intention" in ligne and ligne["intention"] != resultat["intention"]:
+        differences.append(("intention", ligne["intention"], resultat["intention"]))
+    for champ in ENTITES:
+        attendu = ligne.get(champ)
+        obtenu = resultat["entites"][champ]
+        if attendu and normalize(str(attendu)) != normalize(str(obtenu or "")):
+            differences.append((champ, attendu, obtenu))
+    return differences
+
+
+def rapport(resultats, reponses, top=10):
+    total = len(resultats)
+    par_etage = defaultdict(list)
+    for r in resultats:
+        par_etage[r["etage"]].append(r)
+
+    etages = {}
+    for etage in ETAGES:
+        liste = par_etage.get(etage, [])
+        if not liste:
+            continue
+        durees = sorted(r["duree"] * 1e3 for r in liste)
+        etiquetes = [r for r in liste if "intention" in r["ligne"]]
+        justes = [r for r in etiquetes if not ecarts(r)]
+        etages[etage] = {
+            "n": len(liste),
+            "part": round(len(liste) / total, 4),
+            "p50_ms": round(percentile(durees, 50), 3),
+            "p99_ms": round(percentile(durees, 99), 3),
+            "etiquetees": len(etiquetes),
+            "exactitude": round(len(justes) / len(etiquetes), 4) if etiquetes else None,
+        }
+
+    non_resolues = Counter(
+        chatbot_can.normalize_text(r["ligne"]["question"])
+        for r in resultats if r["etage"] in (chatbot_can.DEFAUT, chatbot_can.DEGRADE)
+    )
+    return {
+        "questions": total,
+        "etages": etages,
+        "cache": reponses.stats(),
+        "ecarts": [
+            {"question": r["ligne"]["question"], "etage": r["etage"],
+             "ecarts": [list(e) for e in ecarts(r)]}
+            for r in resultats if ecarts(r)
+        ],
+        "non_resolues": non_resolues.most_common(top),
+    }
+
+
+def afficher(resultat, top=10):
+    print("=" * 78)
+    print(f"{resultat['questions']} questions rejouées")
+    print("-" * 78)
+    print(f"{'étage':12} {'n':>5} {'part':>7} {'p50 ms':>9} {'p99 ms':>9} {'étiq.':>6} {'exactitude':>11}")
+    for etage, s in resultat["etages"].items():
+        exactitude = f"{s['exactitude']:.0%}" if s["exactitude"] is not None else "-"
+        print(f"{etage:12} {s['n']:5d} {s['part']:7.1%} {s['p50_ms']:9.3f} {s['p99_ms']:9.3f} "
+              f"{s['etiquetees']:6d} {exactitude:>11}")
+    c = resultat["cache"]
+    print(f"\nCache de réponses : {c['hits']} succès / {c['hits'] + c['misses']} "
+          f"({c['taille']} réponses gardées)")
+
+    if resultat["ecarts"]:
+        print(f"\nÉcarts avec les étiquettes ({len(resultat['ecarts'])}) :")
+        for e in resultat["ecarts"][:top * 2]:
+            details = "; ".join(f"{champ} attendu {a!r}, obtenu {o!r}" for champ, a, o in e["ecarts"])
+            print(f"   • [{e['etage']}] {e['question']} — {details}")
+
+    if resultat["non_resolues"]:
+        print("\nNon résolues les plus fréquentes (candidates à une règle) :")
+        for question, n in resultat["non_resolues"]:
+            print(f"   {n:4d} × {question}")
+    print("=" * 78)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rejeu d'un journal de questions dans chatbot()")
+    parser.add_argument("journal", type=Path, help="fichier JSONL (une question par ligne)")
+    parser.add_argument("--llm", default="inconnu", help="inconnu | corpus | reel | FICHIER enregistré")
+    parser.add_argument("--enregistrer", type=Path, help="avec --llm reel : analyses LLaMA obtenues")
+    parser.add_argument("--sans-cache", action="store_true", help="sans cache de réponses")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", type=Path, help="enregistre le rapport dans ce fichier")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    interroger, analyses = routeur(args.llm)
+    resultats, reponses = rejouer(lire_journal(args.journal), interroger, not args.sans_cache,
+                                  journaliser=args.llm == "reel")
+    resultat = rapport(resultats, reponses, args.top)
+    afficher(resultat, args.top)
+
+    if args.enregistrer and analyses:
+        with open(args.enregistrer, "w", encoding="utf-8") as f:
+            for question, analyse in analyses.items():
+                f.write(json.dumps({"question": question, "analyse": analyse}, ensure_ascii=False) + "\n")
+    if args.json:
+        args.json.write_text(json.dumps(resultat, indent=1, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
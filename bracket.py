@@ -0,0 +1,243 @@
+"""
+Tableau des phases finales de la CAN 2025
+Arbre à élimination directe : chaque nœud est un match, relié au match
+du tour suivant où se qualifie son vainqueur
+"""
+
+import logging
+from functools import lru_cache
+
+from core import UNKNOWN_TEAM_ID, parse_score, subscribe
+from snapshot import load_tournoi
+
+logger = logging.getLogger(__name__)
+
+TOURS = ["Huitièmes de finale", "Quarts de finale", "Demi-finale", "Finale"]
+
+# Préfixe normalisé → tour ("Demi" / "demi-finales" / "Huitième" ...)
+PREFIXES_TOURS = [("huit", 0), ("quart", 1), ("demi", 2), ("final", 3)]
+
+
+def resolve_phase(phase):
+    """Nom canonique d'un tour à partir d'un libellé libre ('Demi' → 'Demi-finale')"""
+    if not phase:
+        return None
+    texte = str(phase).lower().replace("è", "e").strip()
+    for prefixe, i in PREFIXES_TOURS:
+        if texte.startswith(prefixe):
+            return TOURS[i]
+    return None
+
+
+class MatchNode:
+    """Un match du tableau final (les équipes peuvent être encore inconnues)"""
+
+    def __init__(self, phase, equipe1=None, equipe2=None, score=None,
+                 date="", heure="", stade="", ligne=None):
+        self.phase = phase
+        self.ligne = ligne              # position dans finales, None si tour pas encore tiré
+        self.equipes = [equipe1 or None, equipe2 or None]
+        self.score = score
+        self.date = date
+        self.heure = heure
+        self.stade = stade
+        self.precedents = [None, None]  # match d'où vient chaque équipe
+        self.suivant = None             # match où va le vainqueur
+        self.place_suivant = None       # 0 ou 1 dans le match suivant
+
+    def __repr__(self):
+        return f"MatchNode({self.phase!r}, {self.libelle(0)!r}, {self.libelle(1)!r})"
+
+    @property
+    def joue(self):
+        return parse_score(self.score) is not None
+
+    @property
+    def vainqueur(self):
+        """Vainqueur d'après le score, ou d'après le tour suivant (tirs au but)"""
+        buts = parse_score(self.score)
+        if buts is not None and buts[0] != buts[1] and all(self.equipes):
+            return self.equipes[0] if buts[0] > buts[1] else self.equipes[1]
+        if self.suivant is not None:
+            qualifie = self.suivant.equipes[self.place_suivant]
+            if qualifie in self.equipes:
+                return qualifie
+        return None
+
+    def libelle(self, place):
+        """Nom de l'équipe à une place, ou 'Vainqueur X/Y' si pas encore connue"""
+        if self.equipes[place]:
+            return self.equipes[place]
+        precedent = self.precedents[place]
+        if precedent is None:
+            return "À déterminer"
+        return f"Vainqueur {precedent.libelle(0)}/{precedent.libelle(1)}"
+
+    def candidats(self, place):
+        """Équipes pouvant encore occuper une place de ce match"""
+        if self.equipes[place]:
+            return {self.equipes[place]}
+        if self.precedents[place] is None:
+            return set()
+        return self.precedents[place].qualifiables()
+
+    def qualifiables(self):
+        """Équipes pouvant encore sortir vainqueurs de ce match"""
+        vainqueur = self.vainqueur
+        if vainqueur:
+            return {vainqueur}
+        return self.candidats(0) | self.candidats(1)
+
+
+class Bracket:
+    """Tableau complet : tours ordonnés et index des matchs par position et par affiche"""
+
+    def __init__(self, tours):
+        self.tours = tours
+        self.par_ligne = {}
+        self.par_affiche = {}
+        for noeuds in tours.values():
+            for noeud in noeuds:
+                if noeud.ligne is not None:
+                    self.par_ligne[noeud.ligne] = noeud
+                if all(noeud.equipes):
+                    self.par_affiche[tuple(noeud.equipes)] = noeud
+
+    @property
+    def finale(self):
+        derniers = self.tours[TOURS[-1]] if TOURS[-1] in self.tours else []
+        return derniers[0] if derniers else None
+
+    def matchs_tour(self, phase):
+        """Matchs d'un tour (libellé libre accepté)"""
+        return self.tours.get(resolve_phase(phase), [])
+
+    def premier_match(self, equipe):
+        """Premier match de l'équipe dans le tableau"""
+        for phase in TOURS:
+            for noeud in self.tours.get(phase, []):
+                if equipe in noeud.equipes:
+                    return noeud
+        return None
+
+    def parcours(self, equipe):
+        """Matchs joués ou à jouer par l'équipe en remontant l'arbre"""
+        noeud = self.premier_match(equipe)
+        chemin = []
+        while noeud is not None and equipe in noeud.equipes:
+            chemin.append(noeud)
+            noeud = noeud.suivant
+        return chemin
+
+    def match_courant(self, equipe):
+        """Dernier match de l'équipe (le plus avancé dans le tableau)"""
+        chemin = self.parcours(equipe)
+        return chemin[-1] if chemin else None
+
+    def adversaires_potentiels(self, equipe, phase=None):
+        """
+        Adversaires possibles de l'équipe dans un tour (par défaut son prochain match)
+        Retourne (match, adversaires), ou (None, set()) si l'équipe ne peut pas y arriver
+        """
+        cible = resolve_phase(phase)
+        noeud = self.premier_match(equipe)
+        place = noeud.equipes.index(equipe) if noeud else None
+
+        while noeud is not None:
+            if noeud.phase == cible or (cible is None and not noeud.joue):
+                return noeud, noeud.candidats(1 - place)
+            if noeud.joue and noeud.vainqueur not in (None, equipe):
+                break
+            noeud, place = noeud.suivant, noeud.place_suivant
+
+        return None, set()
+
+    def appliquer_score(self, equipe1, equipe2, score, ligne=None):
+        """
+        Met à jour un seul nœud et propage son vainqueur au tour suivant
+        Le nœud est désigné par sa position dans finales si elle est connue, sinon par l'affiche
+        """
+        if ligne is not None:
+            noeud = self.par_ligne.get(ligne)
+        else:
+            noeud = self.par_affiche.get((equipe1, equipe2))
+        if noeud is None:
+            return None
+        noeud.score = score
+        vainqueur = noeud.vainqueur
+        suivant = noeud.suivant
+        if vainqueur and suivant is not None and suivant.equipes[noeud.place_suivant] is None:
+            suivant.equipes[noeud.place_suivant] = vainqueur
+            if all(suivant.equipes):
+                self.par_affiche[tuple(suivant.equipes)] = suivant
+        return noeud
+
+
+def _relier(noeud, place, precedent):
+    noeud.precedents[place] = precedent
+    precedent.suivant = noeud
+    precedent.place_suivant = place
+
+
+def build_bracket(finales):
+    """
+    Construit l'arbre à partir des matchs de phases finales (enregistrements Match)
+    Les tours connus sont reliés par les équipes qualifiées ; les tours
+    pas encore tirés sont créés en appariant les matchs dans l'ordre
+    """
+    tours = {}
+    for ligne, r in enumerate(finales):
+        phase = resolve_phase(r.phase)
+        if phase is None:
+            continue
+        # Équipe hors registre (« Vainqueur … ») : place encore à déterminer
+        equipe1 = r.equipe1 if r.equipe1_id != UNKNOWN_TEAM_ID else None
+        equipe2 = r.equipe2 if r.equipe2_id != UNKNOWN_TEAM_ID else None
+        tours.setdefault(phase, []).append(MatchNode(
+            phase, equipe1, equipe2, r.score, r.date or '', r.heure or '', r.stade or '', ligne
+        ))
+
+    presents = [p for p in TOURS if p in tours]
+    if not presents:
+        return Bracket({})
+
+    for i in range(TOURS.index(presents[0]), len(TOURS) - 1):
+        courant, suivant = TOURS[i], TOURS[i + 1]
+        precedents = tours.get(courant, [])
+
+        if suivant not in tours:
+            tours[suivant] = [MatchNode(suivant) for _ in range((len(precedents) + 1) // 2)]
+
+        libres = list(precedents)
+        # 1. liaison par équipe qualifiée
+        for noeud in tours[suivant]:
+            for place, equipe in enumerate(noeud.equipes):
+                precedent = next((p for p in libres if equipe and equipe in p.equipes), None)
+                if precedent is not None:
+                    _relier(noeud, place, precedent)
+                    libres.remove(precedent)
+        # 2. places restantes dans l'ordre du tableau
+        for noeud in tours[suivant]:
+            for place in (0, 1):
+                if noeud.precedents[place] is None and libres:
+                    _relier(noeud, place, libres.pop(0))
+
+    bracket = Bracket({p: tours[p] for p in TOURS if p in tours})
+    logger.info(f"✓ Tableau final construit: {sum(len(n) for n in bracket.tours.values())} matchs")
+    return bracket
+
+
+@lru_cache(maxsize=1)
+def load_bracket():
+    """Tableau final construit une seule fois, tenu à jour via subscribe"""
+    return build_bracket(load_tournoi().finales)
+
+
+def _maj_bracket(change):
+    """Reporte un nouveau score de phase finale dans le nœud concerné"""
+    if change.get('dataset') != 'finales' or load_bracket.cache_info().currsize == 0:
+        return
+    load_bracket().appliquer_score(change['equipe1'], change['equipe2'], change['score'], change['ligne'])
+
+
+subscribe(_maj_bracket)
@@ -0,0 +1,109 @@
+"""
+Paquets JSON statiques pour les pages du site (construits après chaque rafraîchissement)
+Minifiés, précompressés (.gz) et nommés d'après leur contenu (about.3f9c2a1b0d.json) :
+ils peuvent être mis en cache indéfiniment, manifest.json indique la version courante.
+Servis par l'API (GET /bundles/{fichier}) aux pages du site, servies elles aussi par l'API (/site/)
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+from datetime import datetime
+
+from core import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+BUNDLES_DIR = DATA_DIR / "bundles"
+MANIFEST = "manifest.json"
+
+# Âges calculés au match d'ouverture (contenu stable d'un rafraîchissement à l'autre)
+DEBUT_TOURNOI = datetime(2025, 12, 21)
+
+
+def _age_moyen(dates):
+    ages = ((DEBUT_TOURNOI - dates.dropna()).dt.days // 365.25)
+    return int(round(ages.mean())) if len(ages) else None
+
+
+def bundle_about(dm):
+    """Chiffres de la page À propos : totaux, joueurs par équipe, stades"""
+    joueurs = dm.load_joueurs()
+    stades = dm.load_stades()
+
+    equipes = {}
+    for tid, lignes in joueurs.groupby('equipe_id', observed=True, sort=False):
+        nom = dm.team_name(int(tid)) or str(lignes['equipe'].iloc[0])
+        equipes[nom] = {
+            'joueurs': [[j, p if isinstance(p, str) else None]
+                        for j, p in zip(lignes['joueur'], lignes['poste'])],
+            'postes': int(lignes['poste'].nunique()),
+            'age_moyen': _age_moyen(lignes['date_naissance']),
+        }
+
+    capacites = [int(c) for c in stades['capacite']]
+    return {
+        'totaux': {
+            'joueurs': len(joueurs),
+            'equipes': len(equipes),
+            'stades': len(stades),
+            'capacite': sum(capacites),
+        },
+        'equipes': dict(sorted(equipes.items())),
+        'stades': [[s, v, c] for s, v, c in zip(stades['stade'], stades['ville'], capacites)],
+    }
+
+
+def bundle_classement(dm):
+    """Classement calculé de chaque groupe"""
+    return {
+        groupe: [[int(r['rang']), r['equipe'], int(r['pts']), int(r['joues']), int(r['gagnes']),
+                  int(r['nuls']), int(r['perdus']), int(r['bp']), int(r['bc']), int(r['diff'])]
+                 for r in lignes.to_dict('records')]
+        for groupe, lignes in sorted(dm.load_classement_calcule().items())
+    }
+
+
+# Paquet → construction, un par page qui le charge (colonnes des lignes de classement : voir la page)
+BUNDLES = {
+    'about': bundle_about,
+    'classement': bundle_classement,
+}
+
+
+def _ecrire(chemin, contenu):
+    """Écriture atomique (les pages ne lisent jamais un fichier à moitié écrit)"""
+    temporaire = chemin.with_suffix(chemin.suffix + ".tmp")
+    temporaire.write_bytes(contenu)
+    temporaire.replace(chemin)
+
+
+def build_bundles(dossier=BUNDLES_DIR):
+    """Construit tous les paquets et le manifeste, retire les versions périmées"""
+    # Seul chemin qui importe pandas : l'API ne lit que les fichiers produits
+    import data_manager as dm
+
+    dossier.mkdir(parents=True, exist_ok=True)
+    manifeste = {}
+    for nom, construire in BUNDLES.items():
+        contenu = json.dumps(construire(dm), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        fichier = f"{nom}.{hashlib.sha256(contenu).hexdigest()[:10]}.json"
+        if not (dossier / fichier).exists():
+            _ecrire(dossier / fichier, contenu)
+            _ecrire(dossier / f"{fichier}.gz", gzip.compress(contenu, 9, mtime=0))
+        manifeste[nom] = fichier
+        logger.info(f"✓ Paquet {fichier}: {len(contenu) / 1024:.1f} Ko")
+
+    _ecrire(dossier / MANIFEST, json.dumps(manifeste, indent=1).encode("utf-8"))
+
+    courants = set(manifeste.values())
+    for chemin in dossier.glob("*.json*"):
+        if chemin.name != MANIFEST and chemin.name.removesuffix(".gz") not in courants:
+            chemin.unlink()
+    return manifeste
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_bundles()
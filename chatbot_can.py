@@ -1,32 +1,52 @@
-import pandas as pd
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 import random
 import logging
+import threading
+import time
 from functools import lru_cache
-from data_manager import (
-    load_poules, load_finales, load_joueurs,
-    load_classement, load_groupes, load_stades, load_equipes
+from core import normalize, parse_score, data_version, EDITION_COURANTE, TOKEN_PATTERN
+import backend
+from backend import (
+    load_stades, get_classement_groupe, get_classement_equipe,
+    prochains_matchs, derniers_matchs, matchs_entre,
+    load_registre_equipes, team_id, team_name, normalize_team_name,
+    nombre_matchs, matchs_de, affiche, liste_groupes, equipes_groupe, groupe_de,
+    top_buteurs, top_attaques, top_defenses, bilan_buts, repartition_effectifs, precharger
 )
+from bracket import load_bracket, resolve_phase
+from player_index import load_player_index, trouver_poste
+from venue_index import VenueIndex, load_venue_index
+from fuzzy_match import FuzzyIndex
+from sessions import Contexte
 from llama_router import llama_intent_router
+from learned_rules import load_regles_apprises, journaliser_route, motif
+from qualification import load_qualification, QUALIFIES_PAR_GROUPE
+from editions import edition as edition_passee, editions_disponibles, find_edition, EditionIndisponible
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Chargement des données avec cache (via data_manager)
-poules = load_poules()
-finales = load_finales()
-joueurs = load_joueurs()
-classement = load_classement()
-groupes = load_groupes()
-stades = load_stades()
-equipes = load_equipes()
+# Les données sont chargées à la demande, au premier usage (voir snapshot.py) :
+# une salutation n'en charge aucune, une question sur les stades uniquement les stades
+# Requêtes des handlers : stockage choisi par CAN_BACKEND (voir backend.py) ;
+# éditions passées ("CAN 2023") : parties chargées à la demande (voir editions.py)
+
+
+def stockage(edition=None):
+    """Requêtes d'une édition : la courante (backend) par défaut, une édition passée sinon"""
+    return backend if edition is None else edition_passee(edition)
+
+
+def _en(edition):
+    """Précision ajoutée aux titres des réponses sur une édition passée"""
+    return f" (CAN {edition})" if edition else ""
 
 
 def talk(user_message):
     """Gère les conversations générales (salutations, aide, etc.)"""
-    msg_lower = user_message.lower().strip()
+    msg_lower = analyser(user_message).minuscule
 
     greetings = {
         'bonjour': ['Bonjour ! 😊', 'Salut ! 👋', 'Hello !'],
@@ -78,268 +98,403 @@ def talk(user_message):
     ])
 
 
+@lru_cache(maxsize=8)
+def alias_equipes(edition=None):
+    """Orthographes connues du registre, les plus longues d'abord ("afrique du sud" avant "sud")"""
+    registre = stockage(edition).load_registre_equipes()
+    return sorted(registre['alias'].items(), key=lambda a: len(a[0]), reverse=True)
+
+
 @lru_cache(maxsize=128)
-def find_team(text):
+def find_team_id(text, exclure=None, edition=None):
+    """Identifiant de la première équipe citée dans le texte (hors exclure), None sinon"""
+    text_norm = normalize_mots(text)
+    for alias, tid in alias_equipes(edition):
+        if tid != exclure and alias in text_norm:
+            return tid
+    return None
+
+
+def find_team(text, edition=None):
     """
-    Détecte une équipe dans le texte
+    Détecte une équipe dans le texte (nom canonique du registre de l'édition)
     Optimisé avec cache et recherche directe
     """
-    text_lower = text.lower()
-
-    team_aliases = {
-        "maroc": "Maroc", "morocco": "Maroc",
-        "mali": "Mali",
-        "sénégal": "Sénégal", "senegal": "Sénégal",
-        "algérie": "Algérie", "algerie": "Algérie", "algeria": "Algérie",
-        "egypte": "Égypte", "égypte": "Égypte", "egypt": "Égypte",
-        "cameroun": "Cameroun", "cameroon": "Cameroun",
-        "côte d'ivoire": "Côte D'Ivoire", "cote d'ivoire": "Côte D'Ivoire", "ivoire": "Côte D'Ivoire",
-        "nigeria": "Nigeria",
-        "afrique du sud": "Afrique Du Sud", "south africa": "Afrique Du Sud",
-        "rd congo": "Rd Congo", "rdc": "Rd Congo", "congo": "Rd Congo",
-        "benin": "Bénin", "bénin": "Bénin",
-        "tunisie": "Tunisie", "tunisia": "Tunisie",
-        "burkina faso": "Burkina Faso", "burkina": "Burkina Faso",
-        "zambie": "Zambie", "zambia": "Zambie",
-        "zimbabwe": "Zimbabwe",
-        "tanzanie": "Tanzanie", "tanzania": "Tanzanie",
-        "comores": "Comores", "comoros": "Comores",
-        "guinée équatoriale": "Guinée Équatoriale", "guinee equatoriale": "Guinée Équatoriale",
-        "soudan": "Soudan", "sudan": "Soudan",
-        "mozambique": "Mozambique",
-        "gabon": "Gabon",
-        "ouganda": "Ouganda", "uganda": "Ouganda",
-        "ghana": "Ghana",
-        "angola": "Angola",
-        "botswana": "Botswana"
-    }
+    return stockage(edition).team_name(find_team_id(text, edition=edition))
+
+
+# ==========================================================
+# RÉSOLUTION APPROXIMATIVE (FAUTES DE FRAPPE), AVANT LLaMA
+# ==========================================================
+
+FUZZY_ENABLED = True
+
+# Mots des règles à ne jamais corriger en nom d'entité
+MOTS_CLES = [
+    "match", "matchs", "joue", "joueur", "joueurs", "effectif", "selection",
+    "liste", "score", "resultat", "classement", "groupe", "stade", "stades",
+    "demi", "quart", "quarts", "finale", "finales", "huitieme", "buteur", "buteurs",
+    "moyenne", "prochain", "parcours", "vainqueur", "adversaire", "contre",
+    "quand", "club", "clubs", "gardien", "gardiens", "equipe", "equipes",
+    "offensive", "defense", "aujourd", "demain", "weekend", "capacite",
+    "quelle", "quel", "donne", "bonjour", "merci", "salut", "historique", "confrontation",
+    "qualifie", "qualifiee", "qualification"
+]
+
+
+def _entrees_joueurs():
+    """Nom complet de chaque joueur, et chaque mot du nom qui n'appartient qu'à lui"""
+    index_joueurs = load_player_index()
+    entrees = [(j[0], j) for j in index_joueurs.joueurs]
+    for token, ids in index_joueurs.noms.items():
+        if len(ids) == 1:
+            entrees.append((token, index_joueurs.joueurs[next(iter(ids))]))
+    return entrees
+
+
+def _entrees_stades():
+    """Nom de chaque stade, avec et sans le préfixe 'Stade'"""
+    entrees = []
+    for r in load_stades():
+        nom = r.stade
+        entrees.append((nom, r))
+        court = re.sub(r'^(stade|complexe sportif)\s+(de\s+|d\'|du\s+)?', '', nom, flags=re.I)
+        entrees.append((court, r))
+    return entrees
+
+
+@lru_cache(maxsize=1)
+def resolveur_equipes():
+    return FuzzyIndex(
+        [(alias, team_name(tid)) for alias, tid in alias_equipes()], ignores=MOTS_CLES
+    )
+
+
+@lru_cache(maxsize=1)
+def resolveur_joueurs():
+    return FuzzyIndex(_entrees_joueurs(), ignores=MOTS_CLES)
+
+
+@lru_cache(maxsize=1)
+def resolveur_stades():
+    return FuzzyIndex(_entrees_stades(), ignores=MOTS_CLES)
+
+
+@lru_cache(maxsize=256)
+def _equipe_approchee(text):
+    trouve = resolveur_equipes().resoudre(text)
+    return trouve[0] if trouve else None
+
 
-    # Recherche dans les aliases
-    for alias, real_name in team_aliases.items():
-        if alias in text_lower:
-            return real_name
+def find_team_approx(text):
+    """Équipe la plus proche malgré les fautes ('senegall', 'marok'), None sinon"""
+    # FUZZY_ENABLED lu à chaque appel, hors du cache : il peut changer après coup
+    return _equipe_approchee(text) if FUZZY_ENABLED else None
 
-    # Recherche directe dans la liste des équipes
-    for equipe in equipes:
-        if equipe.lower() in text_lower:
-            return equipe
 
+def find_joueur(text):
+    """Joueur cité dans le texte (ou l'analyse) : index exact, puis résolution approximative"""
+    a = analyser(text)
+    joueur = load_player_index().trouver_joueur(a.texte, a.tokens)
+    if joueur is None and FUZZY_ENABLED:
+        trouve = resolveur_joueurs().resoudre(a.texte)
+        joueur = trouve[0] if trouve else None
+    return joueur
+
+
+def find_stade(text):
+    """Stade cité dans le texte (tolère les fautes), None sinon"""
+    trouve = resolveur_stades().resoudre(text)
+    if trouve and (trouve[1] == 0 or FUZZY_ENABLED):
+        return trouve[0]
     return None
 
 
+GROUPE_PATTERN = re.compile(r'\bgroupe\s*([a-f])\b')
+
+
 def find_groupe(text):
     """Détecte un groupe (A-F) dans le texte"""
-    match = re.search(r'\bgroupe\s*([a-f])\b', text.lower())
+    match = GROUPE_PATTERN.search(text.lower())
     if match:
         return match.group(1).upper()
     return None
 
 
-# Regex compilée pour normalisation (3-5x plus rapide)
-ACCENT_PATTERN = re.compile(r'[àáâ]')
-ACCENT_E_PATTERN = re.compile(r'[èéê]')
-ACCENT_I_PATTERN = re.compile(r'[ìíî]')
-ACCENT_O_PATTERN = re.compile(r'[òóô]')
-ACCENT_U_PATTERN = re.compile(r'[ùúû]')
-WHITESPACE_PATTERN = re.compile(r'\s+')
+# Mot du texte normalisé → phase (ordre important : "quart de finale" avant "finale")
+PHASES = [("huitieme", "Huitième"), ("quart", "Quart"), ("demi", "Demi"), ("finale", "Finale")]
+
+
+def find_phase(q_norm):
+    """Détecte une phase finale dans le texte normalisé"""
+    return next((phase for mot, phase in PHASES if mot in q_norm), None)
+
+
+# Relance qui renvoie à la question précédente ("et ses joueurs ?", "quand joue-t-il ?")
+RELANCE_PATTERN = re.compile(
+    r"^(et|puis|sinon|alors)\b|\b(son|sa|ses|leur|leurs|il|elle|ils|elles|lui|eux)\b"
+)
+
+
+def est_relance(q_norm):
+    return bool(RELANCE_PATTERN.search(q_norm))
+
+
+def entites(query):
+    """Équipe, groupe et phase cités dans une question (texte ou analyse)"""
+    a = analyser(query)
+    return a.equipe, a.groupe, a.phase
+
+
+# Accents retirés en une seule passe (table de traduction)
+SANS_ACCENTS = str.maketrans("àáâèéêìíîòóôùúûç", "aaaeeeiiiooouuuc")
 
 
 def normalize_text(text):
-    """Normalise le texte (supprime accents et espaces multiples) - Optimisé"""
-    text = text.lower()
-    text = ACCENT_PATTERN.sub('a', text)
-    text = ACCENT_E_PATTERN.sub('e', text)
-    text = ACCENT_I_PATTERN.sub('i', text)
-    text = ACCENT_O_PATTERN.sub('o', text)
-    text = ACCENT_U_PATTERN.sub('u', text)
-    text = text.replace('ç', 'c')
-    text = WHITESPACE_PATTERN.sub(' ', text)
-    return text.strip()
-
-
-def matchs_equipe(team):
+    """Normalise le texte (supprime accents et espaces multiples) - une seule passe"""
+    return " ".join(text.lower().translate(SANS_ACCENTS).split())
+
+
+def normalize_mots(text, q_norm=None):
+    """
+    Même résultat que core.normalize (mots sans ponctuation) ; depuis le texte déjà
+    passé par normalize_text quand il ne reste aucun caractère accentué
+    """
+    q_norm = normalize_text(text) if q_norm is None else q_norm
+    return " ".join(TOKEN_PATTERN.findall(q_norm)) if q_norm.isascii() else normalize(text)
+
+
+# ==========================================================
+# ANALYSE D'UNE QUESTION (UNE SEULE FOIS)
+# ==========================================================
+
+class _Paresseux:
+    """Attribut calculé au premier accès puis gardé dans l'instance (calcul idempotent, sans verrou)"""
+
+    def __init__(self, calcul):
+        self.calcul = calcul
+        self.nom = calcul.__name__
+        self.__doc__ = calcul.__doc__
+
+    def __get__(self, analyse, cls=None):
+        if analyse is None:
+            return self
+        valeur = analyse.__dict__[self.nom] = self.calcul(analyse)
+        return valeur
+
+
+class QueryAnalysis:
+    """
+    Question analysée une fois : formes normalisées, mots et mots-clés de routage
+    cités ; les entités (qui chargent des données) sont résolues au premier accès,
+    une salutation n'en charge donc aucune
+    """
+
+    def __init__(self, texte):
+        self.texte = texte
+        self.minuscule = texte.lower().strip()
+        self.q_norm = normalize_text(texte)
+        self.cles = frozenset(k for k in MOTS_ROUTAGE if k in self.q_norm)
+
+    def __repr__(self):
+        return f"QueryAnalysis({self.texte!r})"
+
+    def cite(self, *mots):
+        """Vrai si l'un des mots-clés de routage est dans la question"""
+        return not self.cles.isdisjoint(mots)
+
+    @_Paresseux
+    def norm(self):
+        """Forme de core.normalize (mots sans ponctuation)"""
+        return normalize_mots(self.texte, self.q_norm)
+
+    @_Paresseux
+    def tokens(self):
+        return self.norm.split()
+
+    @_Paresseux
+    def mots(self):
+        return frozenset(self.tokens)
+
+    @property
+    def edition(self):
+        """Édition passée citée (recalculée : les éditions disponibles peuvent changer)"""
+        return find_edition(self.q_norm)
+
+    @_Paresseux
+    def equipe_exacte(self):
+        return find_team(self.texte)
+
+    @property
+    def equipe(self):
+        """
+        Équipe de l'édition courante : registre, puis résolution approximative
+        (non mémorisée dans l'analyse : elle dépend de FUZZY_ENABLED au moment de l'accès)
+        """
+        return self.equipe_exacte or find_team_approx(self.texte)
+
+    @_Paresseux
+    def groupe(self):
+        return find_groupe(self.minuscule)
+
+    @_Paresseux
+    def phase(self):
+        return find_phase(self.q_norm)
+
+    @_Paresseux
+    def poste(self):
+        return trouver_poste(self.texte, self.tokens)
+
+    @_Paresseux
+    def relance(self):
+        return est_relance(self.q_norm)
+
+
+@lru_cache(maxsize=1024)
+def _analyser(texte):
+    return QueryAnalysis(texte)
+
+
+def analyser(question):
+    """Analyse d'une question, mémorisée par texte ; une analyse est rendue telle quelle"""
+    return question if isinstance(question, QueryAnalysis) else _analyser(question)
+
+
+def matchs_equipe(team, edition=None):
     """
     Retourne tous les matchs d'une équipe
-    Optimisé : utilise .isin() au lieu de .iterrows()
+    Optimisé : recherche par identifiant entier d'équipe
     """
-    if poules.empty and finales.empty:
-        return f"Aucune donnée de match disponible pour {team}."
-
-    matchs = []
-
-    # Recherche optimisée avec isin() au lieu de iterrows()
-    if not poules.empty:
-        mask = poules['equipe1'].eq(team) | poules['equipe2'].eq(team)
-        matches_poules = poules[mask]
-
-        for idx, match in matches_poules.iterrows():
-            matchs.append({
-                'eq1': match['equipe1'],
-                'eq2': match['equipe2'],
-                'score': match.get('score', 'À venir'),
-                'date': match.get('date', ''),
-                'heure': match.get('heure', ''),
-                'phase': 'Phase de poules'
-            })
-
-    if not finales.empty:
-        mask = finales['equipe1'].eq(team) | finales['equipe2'].eq(team)
-        matches_finales = finales[mask]
-
-        for idx, match in matches_finales.iterrows():
-            matchs.append({
-                'eq1': match['equipe1'],
-                'eq2': match['equipe2'],
-                'score': match.get('score', 'À venir'),
-                'date': match.get('date', ''),
-                'heure': match.get('heure', ''),
-                'phase': match.get('phase', 'Phase finale')
-            })
+    q = stockage(edition)
+    if not q.nombre_matchs():
+        return f"Aucune donnée de match disponible pour {team}{_en(edition)}."
+
+    tid = q.team_id(team)
+    if tid is None:
+        return f"Équipe {team} inconnue{_en(edition)}."
+    team = q.team_name(tid)
+
+    matchs = q.matchs_de(tid)
 
     if not matchs:
-        return f"Aucun match trouvé pour {team}."
+        return f"Aucun match trouvé pour {team}{_en(edition)}."
 
-    result = f"⚽ Matchs de {team} :\n\n"
+    result = f"⚽ Matchs de {team}{_en(edition)} :\n\n"
     for m in matchs:
-        adversaire = m['eq2'] if m['eq1'] == team else m['eq1']
+        adversaire = m.equipe2 if m.equipe1 == team else m.equipe1
         result += f"{team} vs {adversaire}\n"
-        if m['score'] != 'À venir':
-            result += f"   Score : {m['score']}\n"
-        if m['date']:
-            result += f"   📆 {m['date']} à {m['heure']}\n"
-        result += f"   🏆 {m['phase']}\n\n"
+        if m.score:
+            result += f"   Score : {m.score}\n"
+        if m.date:
+            result += f"   📆 {m.date} à {m.heure}\n"
+        result += f"   🏆 {m.phase}\n\n"
 
     return result.strip()
 
 
-def score_match(query):
-    q = normalize_text(query)
-
-    team1 = find_team(query)
-    if not team1:
+def score_match(query, edition=None):
+    q = stockage(edition)
+    id1 = find_team_id(query, edition=edition)
+    if id1 is None:
         return "Je n'ai pas reconnu les équipes du match."
 
     # Cherche une 2e équipe différente
-    team2 = None
-    for eq in equipes:
-        if eq != team1 and normalize_text(eq) in q:
-            team2 = eq
-            break
+    id2 = find_team_id(query, exclure=id1, edition=edition)
 
-    if not team2:
+    if id2 is None:
         return "Je n'ai pas reconnu les deux équipes du match."
 
-    # Recherche dans poules
-    if not poules.empty:
-        m = poules[
-            ((poules['equipe1'] == team1) & (poules['equipe2'] == team2)) |
-            ((poules['equipe1'] == team2) & (poules['equipe2'] == team1))
-        ]
-        if not m.empty:
-            r = m.iloc[0]
-            return f"⚽ {r['equipe1']} {r['score']} {r['equipe2']}"
+    team1, team2 = q.team_name(id1), q.team_name(id2)
 
-    # Recherche dans finales
-    if not finales.empty:
-        m = finales[
-            ((finales['equipe1'] == team1) & (finales['equipe2'] == team2)) |
-            ((finales['equipe1'] == team2) & (finales['equipe2'] == team1))
-        ]
-        if not m.empty:
-            r = m.iloc[0]
-            score = r['score'] if r['score'] else "Match à venir"
-            return f"⚽ {r['equipe1']} {score} {r['equipe2']}"
+    # Recherche directe par affiche, dans les deux sens
+    m = q.affiche(id1, id2)
+    if m is not None:
+        score = m.score if m.score else "Match à venir"
+        return f"⚽ {m.equipe1} {score} {m.equipe2}{_en(edition)}"
 
-    return f"Aucun match trouvé entre {team1} et {team2}."
+    return f"Aucun match trouvé entre {team1} et {team2}{_en(edition)}."
 
 
 
-def equipes_du_groupe(groupe_lettre):
+def equipes_du_groupe(groupe_lettre, edition=None):
     """Liste les équipes d'un groupe"""
-    if groupes.empty:
-        return f"Données de groupes non disponibles."
+    q = stockage(edition)
+    if not q.liste_groupes():
+        return f"Données de groupes non disponibles{_en(edition)}."
 
-    equipes_groupe = groupes[groupes["groupe"] == groupe_lettre]["equipe"].tolist()
+    equipes = q.equipes_groupe(groupe_lettre)
 
-    if not equipes_groupe:
-        return f"Groupe {groupe_lettre} non trouvé."
+    if not equipes:
+        return f"Groupe {groupe_lettre} non trouvé{_en(edition)}."
 
-    return f"📋 Groupe {groupe_lettre} :\n   • " + "\n   • ".join(equipes_groupe)
+    return f"📋 Groupe {groupe_lettre}{_en(edition)} :\n   • " + "\n   • ".join(equipes)
 
 
-def classement_complet_groupe(groupe_lettre):
-    """Affiche le classement complet d'un groupe"""
-    if classement.empty:
-        return f"Classement du groupe {groupe_lettre} non disponible."
+def classement_complet_groupe(groupe_lettre, edition=None):
+    """Affiche le classement complet d'un groupe (calculé depuis les résultats)"""
+    rows = stockage(edition).get_classement_groupe(groupe_lettre)
 
-    rows = classement[classement["groupe"] == groupe_lettre].sort_values('rang')
+    if not rows:
+        return f"Classement du groupe {groupe_lettre} non disponible{_en(edition)}."
 
-    if rows.empty:
-        return f"Classement du groupe {groupe_lettre} non disponible."
-
-    result = f"🏆 Classement Groupe {groupe_lettre} :\n\n"
-    for idx, r in rows.iterrows():
-        emoji = ["🥇", "🥈", "🥉", "4️⃣"][min(r['rang']-1, 3)]
-        result += f"{emoji} {r['equipe']} — {r['pts']} pts (diff: {r['diff']:+d})\n"
+    result = f"🏆 Classement Groupe {groupe_lettre}{_en(edition)} :\n\n"
+    for r in rows:
+        emoji = ["🥇", "🥈", "🥉", "4️⃣"][min(r.rang-1, 3)]
+        result += f"{emoji} {r.equipe} — {r.pts} pts (diff: {r.diff:+d})\n"
 
     return result
 
 
-def group_of_team(team):
+def group_of_team(team, edition=None):
     """Trouve le groupe d'une équipe"""
-    if groupes.empty:
-        return f"Données de groupes non disponibles."
-
-    groupe_info = groupes[groupes["equipe"] == team]
-
-    if groupe_info.empty:
-        return f"Groupe de {team} non trouvé."
+    q = stockage(edition)
+    if not q.liste_groupes():
+        return f"Données de groupes non disponibles{_en(edition)}."
 
-    groupe = groupe_info.iloc[0]['groupe']
-    autres = groupes[groupes["groupe"] == groupe]["equipe"].tolist()
+    tid = q.team_id(team)
+    groupe = q.groupe_de(tid)
 
-    if team in autres:
-        autres.remove(team)
+    if groupe is None:
+        return f"Groupe de {team} non trouvé{_en(edition)}."
 
-    return f"📋 {team} est dans le Groupe {groupe}\n👥 Avec : {', '.join(autres)}"
+    team = q.team_name(tid)
+    autres = [e for e in q.equipes_groupe(groupe) if e != team]
 
+    return f"📋 {team} est dans le Groupe {groupe}{_en(edition)}\n👥 Avec : {', '.join(autres)}"
 
-def classement_groupe(team):
-    """Affiche le classement d'une équipe dans son groupe"""
-    if classement.empty:
-        return f"Classement de {team} non disponible."
 
-    row = classement[classement["equipe"] == team]
+def classement_groupe(team, edition=None):
+    """Affiche le classement d'une équipe dans son groupe (calculé depuis les résultats)"""
+    r = stockage(edition).get_classement_equipe(team)
 
-    if row.empty:
-        return f"Classement de {team} non disponible."
+    if r is None:
+        return f"Classement de {team} non disponible{_en(edition)}."
 
-    r = row.iloc[0]
-    emoji = ["🥇", "🥈", "🥉", "4️⃣"][min(r['rang']-1, 3)]
+    emoji = ["🥇", "🥈", "🥉", "4️⃣"][min(r.rang-1, 3)]
 
     return (
-        f"📊 Classement de {team}\n"
-        f"{emoji} Position : {r['rang']}ème (Groupe {r['groupe']})\n"
-        f"⭐ Points : {r['pts']}\n"
-        f"⚖️ Différence : {r['diff']:+d}"
+        f"📊 Classement de {team}{_en(edition)}\n"
+        f"{emoji} Position : {r.rang}ème (Groupe {r.groupe})\n"
+        f"⭐ Points : {r.pts}\n"
+        f"⚖️ Différence : {r.diff:+d}"
     )
 
 
 def joueurs_equipe(team):
     """Liste les joueurs d'une équipe - Affiche TOUS les joueurs"""
-    if joueurs.empty:
+    index_joueurs = load_player_index()
+    if not len(index_joueurs):
         return f"Données de joueurs non disponibles."
 
-    j = joueurs[joueurs["equipe"].str.lower() == team.lower()]
+    tid = team_id(team)
+    ids = index_joueurs.equipes.get(tid)
 
-    if j.empty:
-        j = joueurs[joueurs["equipe"].str.lower().str.contains(team.lower(), na=False)]
-
-    if j.empty:
+    if not ids:
         return f"Joueurs de {team} non trouvés."
 
-    total = len(j)
-    liste = j["joueur"].tolist()  # TOUS les joueurs maintenant
+    team = team_name(tid)
+    total = len(ids)
+    liste = [index_joueurs.joueurs[i][0] for i in sorted(ids)]  # TOUS les joueurs, ordre de la liste
 
     result = f"👥 Effectif de {team} ({total} joueurs)\n\n"
     result += "\n".join([f"   • {joueur}" for joueur in liste])
@@ -348,50 +503,517 @@ def joueurs_equipe(team):
 
 
 def matchs_phase(phase):
-    """Liste les matchs d'une phase finale"""
-    if finales.empty:
-        return f"Aucun match de phase finale disponible."
-
-    matchs = finales[finales["phase"].str.contains(phase, case=False, na=False)]
+    """Liste les matchs d'une phase finale (depuis le tableau)"""
+    tour = resolve_phase(phase)
+    matchs = load_bracket().matchs_tour(tour)
 
-    if matchs.empty:
+    if not matchs:
         return f"Aucun match trouvé pour {phase}."
 
-    result = f"🏆 {phase.title()} :\n\n"
-    for idx, m in matchs.iterrows():
-        result += f"   ⚽ {m['equipe1']} vs {m['equipe2']}\n"
-        result += f"   📅 {m['date']} à {m['heure']}\n\n"
+    result = f"🏆 {tour} :\n\n"
+    for m in matchs:
+        result += f"   ⚽ {m.libelle(0)} vs {m.libelle(1)}\n"
+        if m.joue:
+            result += f"   Score : {m.score}\n"
+        if m.date:
+            result += f"   📅 {m.date} à {m.heure}\n"
+        result += "\n"
+
+    return result.strip()
+
+
+def parcours_equipe(team):
+    """Parcours d'une équipe dans le tableau final"""
+    team = normalize_team_name(team)
+    chemin = load_bracket().parcours(team)
+
+    if not chemin:
+        return f"{team} n'a pas atteint les phases finales."
+
+    result = f"🛤️ Parcours de {team} :\n\n"
+    for m in chemin:
+        adversaire = m.libelle(1 - m.equipes.index(team))
+        if m.joue:
+            result += f"   🏆 {m.phase} : {m.libelle(0)} {m.score} {m.libelle(1)}\n"
+        else:
+            result += f"   🏆 {m.phase} : {team} vs {adversaire} (à venir)\n"
+
+    dernier = chemin[-1]
+    if dernier.joue and dernier.vainqueur and dernier.vainqueur != team:
+        result += f"\n❌ Éliminé en {dernier.phase.lower()}"
+    elif dernier.joue and dernier.vainqueur == team and dernier.suivant is None:
+        result += "\n🏆 Champion d'Afrique !"
 
     return result.strip()
 
 
-def liste_stades():
-    """Liste tous les stades de la CAN 2025"""
-    if stades.empty:
-        return "Données de stades non disponibles."
+def adversaire_vainqueur(team):
+    """Qui affronte le vainqueur du match en cours de l'équipe"""
+    team = normalize_team_name(team)
+    match = load_bracket().match_courant(team)
+
+    if match is None:
+        return f"{team} n'a pas atteint les phases finales."
 
-    stades_ville = {}
+    suivant = match.suivant
+    if suivant is None:
+        return f"Le vainqueur de {match.libelle(0)} - {match.libelle(1)} sera champion d'Afrique ! 🏆"
 
-    for idx, row in stades.iterrows():
-        ville = row['ville']
-        if ville not in stades_ville:
-            stades_ville[ville] = []
+    adversaires = suivant.candidats(1 - match.place_suivant)
+    return (
+        f"🆚 Le vainqueur de {match.libelle(0)} - {match.libelle(1)} affrontera "
+        f"{' ou '.join(sorted(adversaires)) or 'un adversaire à déterminer'} "
+        f"({suivant.phase.lower()})"
+    )
 
-        stades_ville[ville].append({
-            'nom': row['stade'],
-            'capacite': row['capacite']
-        })
 
-    result = "🏟️ Stades de la CAN 2025 :\n\n"
-    for ville, liste in stades_ville.items():
-        result += f"📍 {ville}\n"
-        for s in liste:
-            result += f"   • {s['nom']} — {s['capacite']:,} places\n".replace(',', ' ')
+def adversaire_potentiel(team, phase=None):
+    """Adversaires possibles d'une équipe dans un tour donné (prochain match par défaut)"""
+    team = normalize_team_name(team)
+    match, adversaires = load_bracket().adversaires_potentiels(team, phase)
+    tour = resolve_phase(phase) or "prochain match"
+
+    if match is None:
+        return f"{team} ne peut plus jouer en {tour.lower()}."
+
+    return (
+        f"🆚 Adversaire{'s' if len(adversaires) > 1 else ''} potentiel"
+        f"{'s' if len(adversaires) > 1 else ''} de {team} en {match.phase.lower()} : "
+        f"{', '.join(sorted(adversaires)) or 'à déterminer'}"
+    )
+
+
+def _pourcent(p):
+    return f"{p * 100:.0f} %" if 0.005 <= p <= 0.995 or p in (0, 1) else f"{p * 100:.1f} %"
+
+
+def qualification(team=None):
+    """Chances de qualification d'une équipe (scénarios des matchs de poule restants)"""
+    simulation = load_qualification()
+    if not simulation['equipes']:
+        return "Données de groupes non disponibles."
+
+    if team is None:
+        statuts = {}
+        for equipe, c in simulation['equipes'].items():
+            statuts.setdefault(c['statut'], []).append(equipe)
+        result = f"🎯 Qualification — {simulation['matchs_restants']} match(s) de poule restant(s)\n\n"
+        for statut, emoji, libelle in (("qualifiee", "✅", "Qualifiées"), ("en course", "⏳", "En course"),
+                                       ("eliminee", "❌", "Éliminées")):
+            if statut in statuts:
+                result += f"{emoji} {libelle} : {', '.join(statuts[statut])}\n"
+        return result.strip()
+
+    team = normalize_team_name(team)
+    c = simulation['equipes'].get(team)
+    if c is None:
+        return f"{team} ne fait pas partie des groupes."
+
+    rang = next((r for r, p in enumerate(c['rangs'], 1) if p == 1), None)
+    detail = f"{rang}{'er' if rang == 1 else 'e'} du groupe {c['groupe']}" if rang else f"groupe {c['groupe']}"
+    if c['statut'] == "qualifiee":
+        return f"✅ {team} : qualification assurée ({detail})"
+    if c['statut'] == "eliminee":
+        return f"❌ {team} : éliminé(e) ({detail})"
+
+    result = f"🎯 {team} : {_pourcent(c['qualification'])} de chances de qualification\n\n"
+    for r, p in enumerate(c['rangs'], 1):
+        if not p:
+            continue
+        result += f"   • {r}{'er' if r == 1 else 'e'} du groupe {c['groupe']} : {_pourcent(p)}"
+        if r == QUALIFIES_PAR_GROUPE + 1 and c['troisieme_qualifie']:
+            result += f" (qualifié parmi les meilleurs troisièmes : {_pourcent(c['troisieme_qualifie'])})"
+        result += "\n"
+    if c['restants']:
+        result += f"\n⚽ Reste à jouer : {', '.join(c['restants'])}"
+    return result.strip()
+
+
+def liste_stades(edition=None):
+    """Liste tous les stades de la CAN 2025 (ou d'une édition passée)"""
+    index = load_venue_index() if edition is None else VenueIndex(stockage(edition).load_stades())
+    if not len(index):
+        return f"Données de stades non disponibles{_en(edition)}."
+
+    result = f"🏟️ Stades de la CAN {edition or EDITION_COURANTE} :\n\n"
+    for ville, stades in index.par_ville.items():
+        result += f"📍 {index.villes[ville]}\n"
+        for s in stades:
+            result += f"   • {s.stade} — {s.capacite:,} places\n".replace(',', ' ')
         result += "\n"
 
     return result.strip()
 
 
+# Questions sur le lieu d'une phase ("où se joue la finale")
+LIEU_KW = ["ou se joue", "ou se jouera", "ou a lieu", "ou aura lieu", "quel stade", "lieu de"]
+
+
+def _places(stade):
+    return f"{stade.capacite:,} places".replace(',', ' ')
+
+
+def matchs_ville(ville, team=None):
+    """Matchs joués dans une ville hôte (nom normalisé), éventuellement ceux d'une équipe"""
+    index = load_venue_index()
+    matchs = [(m, s) for m, s in index.matchs_ville(ville) if team in (None, m.equipe1, m.equipe2)]
+    nom = index.villes.get(ville, ville)
+
+    if not matchs:
+        return f"Aucun match {'de ' + team + ' ' if team else ''}programmé à {nom}."
+
+    result = f"📍 Matchs {'de ' + team + ' ' if team else ''}à {nom} :\n\n"
+    for m, s in matchs:
+        result += _ligne_calendrier(m) + f"   🏟️ {s.stade}\n\n"
+    return result.strip()
+
+
+def _lieux_phase(phase):
+    """[(MatchNode, Stade ou None)] des matchs d'une phase finale"""
+    index = load_venue_index()
+    return [(m, index.resoudre(m.stade)) for m in load_bracket().matchs_tour(resolve_phase(phase))]
+
+
+def lieu_phase(phase):
+    """Stade, ville et horaire des matchs d'une phase finale"""
+    tour = resolve_phase(phase)
+    lieux = _lieux_phase(phase)
+    if not lieux:
+        return f"Aucun match trouvé pour {phase}."
+
+    result = f"📍 {tour} :\n\n"
+    for m, stade in lieux:
+        result += f"   ⚽ {m.libelle(0)} vs {m.libelle(1)}\n"
+        if stade is not None:
+            result += f"   🏟️ {stade.stade} ({stade.ville}) — {_places(stade)}\n"
+        else:
+            result += f"   🏟️ {m.stade or 'Lieu pas encore communiqué'}\n"
+        if m.date:
+            result += f"   📆 {m.date} à {m.heure}\n"
+        result += "\n"
+    return result.strip()
+
+
+def capacite_phase(phase):
+    """Capacité du ou des stades d'une phase finale"""
+    tour = resolve_phase(phase)
+    lieux = [(m, stade) for m, stade in _lieux_phase(phase) if stade is not None]
+    if not lieux:
+        return f"Stade de la phase {tour or phase} pas encore communiqué."
+
+    result = f"👥 Stades — {tour} :\n\n"
+    for m, stade in lieux:
+        result += f"   • {stade.stade} ({stade.ville}) : {_places(stade)} — {m.libelle(0)} vs {m.libelle(1)}\n"
+    return result.strip()
+
+
+def _ligne_calendrier(m):
+    """Formate un match du calendrier sur deux lignes"""
+    score = m.score if m.score and m.score != '-' else None
+    ligne = f"   ⚽ {m.equipe1} {score or 'vs'} {m.equipe2} ({m.phase})\n"
+    return ligne + f"   📆 {m.date} à {m.heure}\n"
+
+
+def prochain_match(team, maintenant=None):
+    """Prochain match d'une équipe (recherche dichotomique dans le calendrier)"""
+    maintenant = maintenant or datetime.now()
+    prochains = prochains_matchs(maintenant, team)
+
+    if prochains:
+        return f"⏭️ Prochain match de {team} :\n\n" + _ligne_calendrier(prochains[0]).rstrip()
+
+    derniers = derniers_matchs(maintenant, team)
+    if derniers:
+        return (
+            f"Aucun match à venir pour {team}.\n\n"
+            f"⏮️ Dernier match :\n" + _ligne_calendrier(derniers[0]).rstrip()
+        )
+
+    return f"Aucun match daté trouvé pour {team}."
+
+
+def matchs_periode(debut, fin, libelle):
+    """Liste les matchs programmés entre deux instants"""
+    matchs = matchs_entre(debut, fin)
+
+    if not matchs:
+        return f"📆 Aucun match {libelle}."
+
+    result = f"📆 Matchs {libelle} :\n\n"
+    result += "\n".join(_ligne_calendrier(m) for m in matchs)
+
+    return result.strip()
+
+
+def matchs_du_jour(jour=None, libelle="aujourd'hui"):
+    """Matchs d'une journée (aujourd'hui par défaut)"""
+    debut = datetime.combine((jour or datetime.now()).date(), datetime.min.time())
+    return matchs_periode(debut, debut + timedelta(days=1), libelle)
+
+
+def matchs_weekend(maintenant=None):
+    """Matchs du week-end en cours ou à venir (samedi et dimanche)"""
+    aujourd_hui = datetime.combine((maintenant or datetime.now()).date(), datetime.min.time())
+    samedi = aujourd_hui + timedelta(days=5 - aujourd_hui.weekday())
+    if aujourd_hui.weekday() == 6:
+        samedi = aujourd_hui - timedelta(days=1)
+    return matchs_periode(samedi, samedi + timedelta(days=2), "ce week-end")
+
+
+POSTES = {"GK": "Gardiens", "DF": "Défenseurs", "MF": "Milieux", "FW": "Attaquants"}
+
+
+def meilleurs_buteurs(team=None, edition=None):
+    """Meilleurs buteurs (buts en sélection), globalement ou pour une équipe"""
+    buteurs = stockage(edition).top_buteurs(team)
+
+    if not buteurs:
+        return f"Aucun buteur trouvé{' pour ' + team if team else ''}{_en(edition)}."
+
+    titre = f"de {team}{_en(edition)}" if team else f"de la CAN {edition or EDITION_COURANTE}"
+    result = f"⚽ Meilleurs buteurs {titre} (buts en sélection) :\n\n"
+    for i, (joueur, equipe, buts) in enumerate(buteurs, 1):
+        result += f"   {i}. {joueur} ({equipe}) — {buts} buts\n"
+
+    return result.strip()
+
+
+def meilleure_attaque(_=None, edition=None):
+    """Équipes ayant marqué le plus de buts"""
+    attaques = stockage(edition).top_attaques()
+    if not attaques:
+        return "Aucun match joué pour le moment."
+
+    result = f"🔥 Équipes les plus offensives{_en(edition)} :\n\n"
+    for i, (equipe, bp, joues) in enumerate(attaques, 1):
+        result += f"   {i}. {equipe} — {bp} buts en {joues} matchs\n"
+
+    return result.strip()
+
+
+def meilleure_defense(_=None, edition=None):
+    """Équipes ayant encaissé le moins de buts (par match) et clean sheets"""
+    defenses = stockage(edition).top_defenses()
+    if not defenses:
+        return "Aucun match joué pour le moment."
+
+    result = f"🧱 Meilleures défenses{_en(edition)} :\n\n"
+    for i, (equipe, bc, clean_sheets) in enumerate(defenses, 1):
+        result += f"   {i}. {equipe} — {bc} buts encaissés, {clean_sheets} clean sheets\n"
+
+    return result.strip()
+
+
+def moyenne_buts(_=None, edition=None):
+    """Moyenne de buts par match, globale et par phase"""
+    stats = stockage(edition).bilan_buts()
+    if not stats['matchs_joues']:
+        return "Aucun match joué pour le moment."
+
+    result = (
+        f"📈 Moyenne de buts{_en(edition)} : {stats['moyenne_buts']:.2f} par match\n"
+        f"⚽ {stats['buts_total']} buts en {stats['matchs_joues']} matchs\n\n"
+    )
+    for phase, buts in stats['buts_phase'].items():
+        result += f"   • {phase} : {buts} buts\n"
+
+    return result.strip()
+
+
+def stats_effectifs(_=None):
+    """Répartition des joueurs par club et par poste"""
+    clubs, postes = repartition_effectifs()
+    if not clubs:
+        return "Données de joueurs non disponibles."
+
+    result = "🏟️ Clubs les plus représentés :\n\n"
+    for club, n in clubs:
+        result += f"   • {club} — {n} joueurs\n"
+
+    result += "\n👥 Joueurs par poste :\n"
+    for poste, n in postes.items():
+        result += f"   • {POSTES.get(poste, poste)} : {n}\n"
+
+    return result.strip()
+
+
+def club_joueur(joueur):
+    """Club et sélection d'un joueur (enregistrement de l'index)"""
+    nom, equipe, poste, club, buts = joueur
+    poste = POSTES.get(poste, poste).rstrip('s').lower()
+    return (
+        f"⚽ {nom} ({equipe}, {poste}) joue à {club or 'un club inconnu'}\n"
+        f"🎯 {buts} buts en sélection"
+    )
+
+
+def joueurs_club(club):
+    """Joueurs de la CAN 2025 évoluant dans un club (nom normalisé)"""
+    liste = load_player_index().par_club(club)
+
+    if not liste:
+        return "Aucun joueur de ce club à la CAN 2025."
+
+    nom_club = liste[0][3]
+    result = f"🏟️ Joueurs de {nom_club} à la CAN 2025 ({len(liste)}) :\n\n"
+    result += "\n".join(f"   • {j[0]} ({j[1]}, {j[2]})" for j in liste)
+
+    return result
+
+
+def joueurs_poste(team, poste):
+    """Joueurs d'une équipe à un poste donné (GK, DF, MF, FW)"""
+    liste = load_player_index().par_poste(poste, team)
+    libelle = POSTES.get(poste, poste)
+
+    if not liste:
+        return f"{libelle} de {team} non trouvés."
+
+    result = f"👥 {libelle} de {team} ({len(liste)}) :\n\n"
+    result += "\n".join(f"   • {j[0]} — {j[3]}" for j in liste)
+
+    return result
+
+
+def info_stade(stade):
+    """Fiche d'un stade (enregistrement ville / stade / capacite) et ses matchs"""
+    result = f"🏟️ {stade.stade} ({stade.ville})\n👥 Capacité : {_places(stade)}"
+    matchs = load_venue_index().matchs.get(stade.stade)
+    if matchs:
+        result += "\n📅 Matchs : " + ", ".join(f"{m.equipe1} vs {m.equipe2} ({m.phase})" for m in matchs)
+    return result
+
+
+# ==========================================================
+# ÉDITIONS PASSÉES ET FACE-À-FACE
+# ==========================================================
+
+CONFRONTATION_KW = ["face a face", "confrontation", "historique", "h2h"]
+
+
+def _equipes_citees(query):
+    """Noms des deux équipes citées, reconnues dans le registre courant puis ceux des éditions passées"""
+    a = analyser(query)
+    for edition in (None,) + editions_disponibles():
+        id1 = find_team_id(a.texte, edition=edition)
+        id2 = find_team_id(a.texte, exclure=id1, edition=edition) if id1 is not None else None
+        if id2 is not None:
+            q = stockage(edition)
+            equipes = q.team_name(id1), q.team_name(id2)
+            # Dans l'ordre de la question ("Maroc contre Égypte")
+            positions = [a.norm.find(normalize(e)) for e in equipes]
+            return equipes[::-1] if min(positions) >= 0 and positions[0] > positions[1] else equipes
+    return None
+
+
+def confrontations(query):
+    """Face-à-face de deux équipes (question en texte ou analysée) sur toutes les éditions disponibles"""
+    equipes = _equipes_citees(query)
+    if equipes is None:
+        return "Je n'ai pas reconnu les deux équipes du face-à-face."
+    team1, team2 = equipes
+
+    lignes, bilan = [], {team1: 0, team2: 0, None: 0}
+    for edition in (None,) + editions_disponibles():
+        q = stockage(edition)
+        id1, id2 = q.team_id(team1), q.team_id(team2)
+        if id1 is None or id2 is None:
+            continue
+        for m in q.matchs_de(id1):
+            if id2 not in (m.equipe1_id, m.equipe2_id):
+                continue
+            lignes.append(f"   🏆 CAN {edition or EDITION_COURANTE} — {m.phase} : "
+                          f"{m.equipe1} {m.score or 'vs'} {m.equipe2}")
+            buts = parse_score(m.score)
+            if buts:
+                b1, b2 = buts if m.equipe1_id == id1 else buts[::-1]
+                bilan[team1 if b1 > b2 else team2 if b2 > b1 else None] += 1
+
+    if not lignes:
+        return f"Aucune confrontation entre {team1} et {team2} dans les éditions disponibles."
+
+    return (
+        f"🆚 {team1} – {team2} : {len(lignes)} confrontation{'s' if len(lignes) > 1 else ''}\n\n"
+        + "\n".join(lignes)
+        + f"\n\n📊 Bilan : {team1} {bilan[team1]} victoire(s), {team2} {bilan[team2]}, nuls {bilan[None]}"
+    )
+
+
+def chatbot_edition(a, edition, contexte=None):
+    """Questions sur une édition passée (a : QueryAnalysis) : matchs, scores, groupes, classements, stades, statistiques"""
+    try:
+        stockage(edition)
+    except EditionIndisponible:
+        disponibles = ", ".join(map(str, editions_disponibles()))
+        return Reponse(
+            f"📚 Je n'ai pas les données de la CAN {edition}."
+            + (f" Éditions passées disponibles : {disponibles}." if disponibles else ""),
+            None, DEFAUT
+        )
+
+    team, groupe = find_team(a.texte, edition), a.groupe
+    if contexte is not None:
+        contexte.retenir(team, groupe, None)
+
+    if "buteur" in a.cles:
+        return Reponse(meilleurs_buteurs(team, edition), "buteurs", REGLES)
+    if a.cite("offensi", "meilleure attaque"):
+        return Reponse(meilleure_attaque(edition=edition), "attaque", REGLES)
+    if a.cite("defensi", "meilleure defense", "clean sheet"):
+        return Reponse(meilleure_defense(edition=edition), "defense", REGLES)
+    if "moyenne" in a.cles and "but" in a.cles:
+        return Reponse(moyenne_buts(edition=edition), "moyenne_buts", REGLES)
+    if a.cite("score", "resultat"):
+        return Reponse(score_match(a.texte, edition), "score", REGLES)
+    if "classement" in a.cles and team:
+        return Reponse(classement_groupe(team, edition), "classement", REGLES)
+    if groupe and "classement" in a.cles:
+        return Reponse(classement_complet_groupe(groupe, edition), "classement_groupe", REGLES)
+    if groupe:
+        return Reponse(equipes_du_groupe(groupe, edition), "equipes_groupe", REGLES)
+    if team and "groupe" in a.cles:
+        return Reponse(group_of_team(team, edition), "groupe", REGLES)
+    if "stade" in a.cles:
+        return Reponse(liste_stades(edition), "stades", REGLES)
+    if team:
+        return Reponse(matchs_equipe(team, edition), "matchs_equipe", REGLES)
+
+    return Reponse(
+        f"📚 CAN {edition} : je peux te donner les matchs et scores d'une équipe, "
+        "les groupes, les classements, les stades et les statistiques.", None, DEFAUT
+    )
+
+
+def reponse_degradee(team=None, groupe=None, phase=None):
+    """Réponse sans LLaMA (étage saturé) : la plus utile d'après les entités reconnues"""
+    if team:
+        return f"⏳ Je suis très sollicité, voici déjà les matchs de {team} :\n\n" + matchs_equipe(team)
+    if groupe:
+        return classement_complet_groupe(groupe)
+    if phase:
+        return matchs_phase(phase)
+    return "⏳ Beaucoup de questions en ce moment, réessaie dans quelques secondes !"
+
+
+def repondre_intention(intent, query, team=None, groupe=None, phase=None):
+    """Réponse d'une intention analysée (LLaMA ou règle apprise), None si une entité manque"""
+    if intent == "joueurs" and team:
+        return joueurs_equipe(team)
+    if intent == "matchs_equipe" and team:
+        return matchs_equipe(team)
+    if intent == "score":
+        return score_match(query)
+    if intent == "classement" and team:
+        return classement_groupe(team)
+    if intent == "equipes_groupe" and groupe:
+        return equipes_du_groupe(groupe)
+    if intent == "phase" and phase:
+        return matchs_phase(phase)
+    if intent == "stades":
+        return liste_stades()
+    return None
+
+
 INTENT_HANDLERS = {
     "matchs_equipe": matchs_equipe,
     "score": score_match,
@@ -400,100 +1022,316 @@ INTENT_HANDLERS = {
     "equipes_groupe": equipes_du_groupe,
     "groupe": group_of_team,
     "stades": lambda _: liste_stades(),
-    "phase": matchs_phase
+    "phase": matchs_phase,
+    "buteurs": meilleurs_buteurs,
+    "attaque": meilleure_attaque,
+    "defense": meilleure_defense,
+    "moyenne_buts": moyenne_buts,
+    "effectifs": stats_effectifs,
+    "prochain_match": prochain_match,
+    "matchs_jour": lambda _: matchs_du_jour(),
+    "matchs_weekend": lambda _: matchs_weekend(),
+    "parcours": parcours_equipe,
+    "adversaire_vainqueur": adversaire_vainqueur,
+    "adversaire_potentiel": adversaire_potentiel,
+    "club_joueur": lambda q: club_joueur(load_player_index().trouver_joueur(q, analyser(q).tokens)),
+    "joueurs_club": lambda q: joueurs_club(load_player_index().trouver_club(q, analyser(q).norm)),
+    "joueurs_poste": joueurs_poste,
+    "stade": lambda q: info_stade(find_stade(analyser(q).texte)),
+    "confrontations": confrontations,
+    "qualification": qualification,
+    "matchs_ville": lambda q: matchs_ville(load_venue_index().trouver_ville(q, analyser(q).norm)),
+    "lieu_phase": lieu_phase,
+    "capacite_phase": capacite_phase,
 }
 
-def chatbot(query: str) -> str:
-    if not query.strip():
-        return "💭 Pose-moi une question sur la CAN 2025 !"
+# Étages du routage : salutations, règles directes, LLaMA, LLaMA saturé, réponse par défaut
+SALUTATION, REGLES, LLM, DEGRADE, DEFAUT = "salutation", "regles", "llm", "degrade", "defaut"
+
+# Intentions dont la réponse ne dépend que des données (ni hasard, ni heure courante)
+INTENTIONS_DETERMINISTES = (
+    set(INTENT_HANDLERS) - {"prochain_match", "matchs_jour", "matchs_weekend"}
+) | {"classement_groupe"}
 
-    q_norm = normalize_text(query)
+
+class Reponse(str):
+    """
+    Texte de réponse annoté : intention traitée, étage du routage qui l'a produite
+    et relance (réponse complétée par le contexte de la session)
+    """
+
+    def __new__(cls, texte, intention=None, etage=None, relance=False):
+        reponse = super().__new__(cls, texte)
+        reponse.intention = intention
+        reponse.etage = etage
+        reponse.relance = relance
+        return reponse
+
+    @property
+    def deterministe(self):
+        """Même question, mêmes données → même réponse (donc réutilisable)"""
+        return self.intention in INTENTIONS_DETERMINISTES and not self.relance
+
+
+# Mots-clés des règles directes, repérés une fois par question (QueryAnalysis.cles)
+SALUTATIONS_KW = ["bonjour", "salut", "hello", "merci", "aide"]
+JOUEURS_KW = ["joueur", "joueurs", "effectif", "selection", "liste"]
+MATCHS_KW = ["match", "joue", "quand"]
+MOTS_ROUTAGE = frozenset(
+    SALUTATIONS_KW + JOUEURS_KW + MATCHS_KW + LIEU_KW + CONFRONTATION_KW + [
+        "ou joue", "club de", "buteur", "offensi", "meilleure attaque", "defensi",
+        "meilleure defense", "clean sheet", "moyenne", "but", "club", "prochain", "aujourd",
+        "demain", "week-end", "weekend", "parcours", "vainqueur", "adversaire", "capacite",
+        "qualifi", "score", "resultat", "classement", "equipe", "stade", "groupe",
+    ]
+)
+
+
+def chatbot(query, contexte=None) -> str:
+    """
+    Répond à une question (texte ou QueryAnalysis) ; contexte (sessions.Contexte,
+    optionnel) retient les entités citées et complète les relances qui n'en citent aucune
+    """
+    a = analyser(query)
+    if not a.minuscule:
+        return Reponse("💭 Pose-moi une question sur la CAN 2025 !", None, DEFAUT)
 
     # ======================
     # 1️⃣ SALUTATIONS
     # ======================
-    if any(w in q_norm for w in ["bonjour", "salut", "hello", "merci", "aide"]):
-        return talk(query)
+    if a.cite(*SALUTATIONS_KW):
+        return Reponse(talk(a), "conversation", SALUTATION)
 
     # ======================
     # 2️⃣ RÈGLES DIRECTES (FIABLES)
     # ======================
-    team = find_team(query)
-    groupe = find_groupe(query)
+    # Édition passée citée ("CAN 2023") : ses propres données, chargées à la demande
+    edition = a.edition
+    if edition is not None:
+        return chatbot_edition(a, edition, contexte)
+
+    team, groupe, phase = a.equipe, a.groupe, a.phase
+
+    # Relance sans aucune entité : équipe, groupe et phase de la conversation
+    relance = False
+    if contexte is not None:
+        if not (team or groupe or phase) and a.relance:
+            team, groupe, phase = contexte.equipe, contexte.groupe, contexte.phase
+            relance = True
+        contexte.retenir(team, groupe, phase)
+
+    # Recherche de joueurs (index inversé)
+    if not team and a.cite("ou joue", "club de"):
+        joueur = find_joueur(a)
+        if joueur:
+            return Reponse(club_joueur(joueur), "club_joueur", REGLES, relance)
+
+    if not team and a.cite(*JOUEURS_KW):
+        club = load_player_index().trouver_club(a.texte, a.norm)
+        if club:
+            return Reponse(joueurs_club(club), "joueurs_club", REGLES, relance)
+
+    poste = a.poste
+    if team and poste:
+        return Reponse(joueurs_poste(team, poste), "joueurs_poste", REGLES, relance)
+
+    # Statistiques du tournoi (agrégats précalculés)
+    if "buteur" in a.cles:
+        return Reponse(meilleurs_buteurs(team), "buteurs", REGLES, relance)
+
+    if a.cite("offensi", "meilleure attaque"):
+        return Reponse(meilleure_attaque(), "attaque", REGLES, relance)
+
+    if a.cite("defensi", "meilleure defense", "clean sheet"):
+        return Reponse(meilleure_defense(), "defense", REGLES, relance)
+
+    if "moyenne" in a.cles and "but" in a.cles:
+        return Reponse(moyenne_buts(), "moyenne_buts", REGLES, relance)
+
+    if not team and "club" in a.cles:
+        return Reponse(stats_effectifs(), "effectifs", REGLES, relance)
+
+    # Calendrier (index temporel)
+    if team and "prochain" in a.cles:
+        return Reponse(prochain_match(team), "prochain_match", REGLES, relance)
+
+    if "aujourd" in a.cles:
+        return Reponse(matchs_du_jour(), "matchs_jour", REGLES, relance)
+
+    if "demain" in a.cles:
+        return Reponse(
+            matchs_du_jour(datetime.now() + timedelta(days=1), "demain"), "matchs_jour", REGLES, relance
+        )
 
-    joueurs_kw = ["joueur", "joueurs", "effectif", "selection", "sélection", "liste"]
-    if team and any(k in q_norm for k in joueurs_kw):
-        return joueurs_equipe(team)
+    if a.cite("week-end", "weekend"):
+        return Reponse(matchs_weekend(), "matchs_weekend", REGLES, relance)
 
-    if team and any(k in q_norm for k in ["match", "joue", "quand"]):
-        return matchs_equipe(team)
+    # Tableau final (arbre des phases à élimination directe)
+    if team and "parcours" in a.cles:
+        return Reponse(parcours_equipe(team), "parcours", REGLES, relance)
 
-    if "score" in q_norm or "resultat" in q_norm:
-        return score_match(query)
+    if team and "vainqueur" in a.cles:
+        return Reponse(adversaire_vainqueur(team), "adversaire_vainqueur", REGLES, relance)
 
-    if "classement" in q_norm and team:
-        return classement_groupe(team)
+    if team and "adversaire" in a.cles:
+        return Reponse(adversaire_potentiel(team, phase), "adversaire_potentiel", REGLES, relance)
 
-    if groupe and "classement" in q_norm:
-        return classement_complet_groupe(groupe)
+    # Lieux (index des stades joint au calendrier)
+    if phase and "capacite" in a.cles:
+        return Reponse(capacite_phase(phase), "capacite_phase", REGLES, relance)
 
-    if "stade" in q_norm:
-        return liste_stades()
+    if phase and a.cite(*LIEU_KW):
+        return Reponse(lieu_phase(phase), "lieu_phase", REGLES, relance)
+
+    if a.cite("match", "joue"):
+        ville = load_venue_index().trouver_ville(a.texte, a.norm)
+        if ville:
+            return Reponse(matchs_ville(ville, team), "matchs_ville", REGLES, relance)
 
-    if "demi" in q_norm:
-        return matchs_phase("Demi")
-    if "quart" in q_norm:
-        return matchs_phase("Quart")
-    if "finale" in q_norm:
-        return matchs_phase("Finale")
+    if "qualifi" in a.cles:
+        return Reponse(qualification(team), "qualification", REGLES, relance)
+
+    if team and a.cite(*CONFRONTATION_KW):
+        return Reponse(confrontations(a), "confrontations", REGLES, relance)
+
+    if team and a.cite(*JOUEURS_KW):
+        return Reponse(joueurs_equipe(team), "joueurs", REGLES, relance)
+
+    if team and a.cite(*MATCHS_KW):
+        return Reponse(matchs_equipe(team), "matchs_equipe", REGLES, relance)
+
+    if a.cite("score", "resultat"):
+        return Reponse(score_match(a.texte), "score", REGLES, relance)
+
+    if "classement" in a.cles and team:
+        return Reponse(classement_groupe(team), "classement", REGLES, relance)
+
+    if groupe and "classement" in a.cles:
+        return Reponse(classement_complet_groupe(groupe), "classement_groupe", REGLES, relance)
+
+    if groupe and "equipe" in a.cles:
+        return Reponse(equipes_du_groupe(groupe), "equipes_groupe", REGLES, relance)
+
+    if "stade" in a.cles:
+        stade = find_stade(a.texte)
+        if stade:
+            return Reponse(info_stade(stade), "stade", REGLES, relance)
+        return Reponse(liste_stades(), "stades", REGLES, relance)
+
+    if phase:
+        return Reponse(matchs_phase(phase), "phase", REGLES, relance)
+
+    # Règles apprises des routes LLaMA (approuvées, voir learned_rules.py)
+    route = load_regles_apprises().trouver(a.texte, team, groupe, a.mots)
+    if route:
+        intention, team_r, groupe_r, phase_r = route
+        texte = repondre_intention(intention, a.texte, team_r, groupe_r, phase_r)
+        if texte is not None:
+            if contexte is not None:
+                contexte.retenir(team_r, groupe_r, phase_r)
+            return Reponse(texte, intention, REGLES, relance)
 
     # ======================
     # 3️⃣ LLaMA (AMBIGU)
     # ======================
-    parsed = llama_intent_router(query)
+    # Le prompt de LLaMA a besoin du texte brut ; ses entités complètent celles de l'analyse
+    parsed = llama_intent_router(a.texte)
 
     intent = parsed.get("intent")
-    team_llm = parsed.get("team")
-    groupe_llm = parsed.get("groupe")
-    phase_llm = parsed.get("phase")
+    team_llm = parsed.get("team") or team
+    groupe_llm = parsed.get("groupe") or groupe
+    phase_llm = parsed.get("phase") or phase
+
+    if contexte is not None:
+        contexte.retenir(team_llm, groupe_llm, phase_llm)
+
+    # Question délestée par le contrôle d'admission : réponse immédiate sans LLaMA
+    if intent == "sature":
+        return Reponse(reponse_degradee(team, groupe, phase), None, DEGRADE)
 
     if intent == "conversation":
-        return talk(query)
+        return Reponse(talk(a), "conversation", LLM)
 
-    if intent == "joueurs" and team_llm:
-        return joueurs_equipe(team_llm)
+    texte = repondre_intention(intent, a.texte, team_llm, groupe_llm, phase_llm)
+    if texte is not None:
+        # Route gardée pour la fouille des règles (learned_rules.py miner)
+        # (seuls les alias présents dans la question sont essayés par motif)
+        alias = [(al, tid) for al, tid in alias_equipes() if al in a.norm]
+        journaliser_route(motif(a.texte, alias, a.norm), intent, team_llm, groupe_llm, phase_llm,
+                          parsed.get("modele"))
+        return Reponse(texte, intent, LLM, relance)
 
-    if intent == "matchs_equipe" and team_llm:
-        return matchs_equipe(team_llm)
+    # ======================
+    # 4️⃣ FALLBACK FINAL
+    # ======================
+    if team:
+        return Reponse(f"🤔 Que veux-tu savoir exactement sur {team} ?", None, DEFAUT)
 
-    if intent == "score":
-        return score_match(query)
+    return Reponse("🤔 Je n’ai pas compris. Peux-tu reformuler ?", None, DEFAUT)
 
-    if intent == "classement" and team_llm:
-        return classement_groupe(team_llm)
 
-    if intent == "equipes_groupe" and groupe_llm:
-        return equipes_du_groupe(groupe_llm)
 
-    if intent == "phase" and phase_llm:
-        return matchs_phase(phase_llm)
+# ==========================================================
+# PRÉCHARGEMENT EN ARRIÈRE-PLAN (OPTIONNEL)
+# ==========================================================
 
-    if intent == "stades":
-        return liste_stades()
+# Du plus léger au plus lourd : le fichier des joueurs en dernier
+PRECHARGEMENT = [
+    alias_equipes, load_regles_apprises, resolveur_equipes, precharger,
+    load_bracket, load_stades, resolveur_stades, load_venue_index, load_player_index, resolveur_joueurs
+]
 
-    # ======================
-    # 4️⃣ FALLBACK FINAL
-    # ======================
-    if team:
-        return f"🤔 Que veux-tu savoir exactement sur {team} ?"
 
-    return "🤔 Je n’ai pas compris. Peux-tu reformuler ?"
+def prefetch(background=True):
+    """
+    Charge à l'avance toutes les données, dans un thread de fond par défaut :
+    le serveur répond pendant ce temps, la première question qui a besoin
+    d'une donnée pas encore prête la charge elle-même
+    """
+    def charger():
+        debut = time.perf_counter()
+        try:
+            for loader in PRECHARGEMENT:
+                loader()
+        except Exception as e:
+            logger.error(f"Erreur préchargement: {e}")
+            return
+        logger.info(f"✓ Préchargement terminé en {(time.perf_counter() - debut) * 1000:.0f} ms")
+
+    if not background:
+        charger()
+        return None
+
+    thread = threading.Thread(target=charger, name="prefetch-can", daemon=True)
+    thread.start()
+    return thread
 
 
+def ask_bot(question, contexte=None):
+    """Interface publique pour l'application Streamlit et l'API"""
+    return chatbot(question, contexte)
 
-def ask_bot(question):
-    """Interface publique pour l'application Streamlit"""
-    return chatbot(question)
+
+def repondre_avec_cache(reponses, question, contexte=None):
+    """
+    Réponse depuis un cache de réponses (ResponseCache) si possible, sinon via chatbot()
+    puis mise en cache si déterministe : (réponse, servie depuis le cache)
+    Clé : question normalisée + version des données (API et rejeu des journaux)
+    """
+    # Question analysée une seule fois : clé du cache, entités et routage
+    a = analyser(question)
+    cle = (a.q_norm, data_version())
+    reponse = reponses.get(cle)
+    if reponse is not None:
+        # Le chatbot n'est pas appelé : le contexte retient quand même les entités citées
+        if contexte is not None:
+            contexte.retenir(*entites(a))
+        return reponse, True
+
+    reponse = chatbot(a, contexte)
+    if getattr(reponse, "deterministe", False):
+        reponses.put(cle, reponse)
+    return reponse, False
 
 
 if __name__ == "__main__":
@@ -501,6 +1339,8 @@ if __name__ == "__main__":
     print("💬 Pose-moi des questions naturellement sur la CAN 2025 !")
     print("👉 Tape 'exit' pour quitter\n")
 
+    contexte = Contexte()
+
     while True:
         try:
             user_input = input("Toi : ").strip()
@@ -512,7 +1352,7 @@ if __name__ == "__main__":
                 print("\n👋 À bientôt ! Bonne CAN 2025 ! ⚽✨")
                 break
 
-            response = chatbot(user_input)
+            response = chatbot(user_input, contexte)
             print(f"\n🤖 Bot : {response}\n")
 
         except KeyboardInterrupt:
@@ -0,0 +1,249 @@
+"""
+Primitives sans dépendance lourde (ni pandas ni numpy)
+Partagées par data_manager (chargement, rafraîchissement) et par le runtime
+de service (snapshot) : normalisation, scores, dates, agrégats, abonnements
+"""
+
+import logging
+import os
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent
+# CSV de l'édition servie (CAN_DATA_DIR : reconstruction de l'instantané d'une édition passée)
+DATA_DIR = Path(os.environ.get("CAN_DATA_DIR") or BASE_DIR / "data")
+
+# Éditions passées : un dossier par année, mêmes fichiers CSV que DATA_DIR (voir editions.py)
+EDITION_COURANTE = 2025
+EDITIONS_DIR = BASE_DIR / "data" / "editions"
+
+FICHIERS = {
+    'poules': "poules_matchs.csv",
+    'finales': "phases_finales_matchs.csv",
+    'joueurs': "joueurs_brut.csv",
+    'classement': "classement_groupes.csv",
+    'groupes': "groupes.csv",
+    'stades': "stades.csv",
+    'equipes': "equipes.csv",
+}
+
+# Identifiant des équipes absentes du registre (affiches pas encore tirées : « Vainqueur … »)
+UNKNOWN_TEAM_ID = -1
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Minuscules sans accents ni ponctuation ('Côte d'Ivoire' → 'cote d ivoire')"""
+    if not text or not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(TOKEN_PATTERN.findall(text))
+
+
+# ==========================================================
+# SCORES
+# ==========================================================
+
+# "2-0", "1 -  2", "1 - 1ap" → (buts1, séparateur, buts2) ; "-" = match non joué
+SCORE_PATTERN = re.compile(r'(\d+)(\s*[-–]\s*)(\d+)')
+
+
+def parse_score(score):
+    """Extrait les buts (equipe1, equipe2) d'un score texte, None si non joué"""
+    if score is None:
+        return None
+    match = SCORE_PATTERN.search(str(score))
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(3))
+
+
+# ==========================================================
+# ABONNEMENTS AUX CHANGEMENTS DE DONNÉES
+# ==========================================================
+
+# Fonctions appelées à chaque changement de données (voir subscribe)
+_abonnes = []
+
+# Version des données servies : change à chaque changement publié ou rechargement
+_version = 0
+
+
+def data_version():
+    """Version courante des données (clé des caches de réponses)"""
+    return _version
+
+
+def invalider():
+    """Change la version des données (les réponses mises en cache deviennent périmées)"""
+    global _version
+    _version += 1
+
+
+def subscribe(callback):
+    """Abonne une fonction callback(change) aux changements publiés par update_score()"""
+    if callback not in _abonnes:
+        _abonnes.append(callback)
+    return callback
+
+
+def publier(change):
+    """Notifie les abonnés d'un changement de données, puis change la version"""
+    for callback in list(_abonnes):
+        try:
+            callback(change)
+        except Exception as e:
+            logger.error(f"Erreur abonné {getattr(callback, '__name__', callback)}: {e}")
+    invalider()
+
+
+# ==========================================================
+# CLASSEMENT D'UN GROUPE (RÈGLEMENT CAN, data_manager ET qualification)
+# ==========================================================
+
+def _bilan(equipes, matchs):
+    """{équipe: [points, différence, buts marqués]} sur les matchs entre ces équipes"""
+    bilan = {e: [0, 0, 0] for e in equipes}
+    for e1, e2, b1, b2 in matchs:
+        if e1 in bilan and e2 in bilan:
+            for equipe, bp, bc in ((e1, b1, b2), (e2, b2, b1)):
+                ligne = bilan[equipe]
+                ligne[0] += 3 if bp > bc else bp == bc
+                ligne[1] += bp - bc
+                ligne[2] += bp
+    return bilan
+
+
+def _departager(equipes, bilan, matchs):
+    """
+    Départage des équipes à égalité de points (règlement CAN) :
+    1. confrontations directes (points, différence, buts marqués),
+       réappliquées au sous-groupe encore à égalité
+    2. différence de buts générale, puis buts marqués
+    3. ordre alphabétique (en lieu et place du tirage au sort)
+    """
+    if len(equipes) <= 1:
+        return list(equipes)
+
+    h2h = _bilan(equipes, matchs)
+    blocs = {}
+    for equipe in equipes:
+        blocs.setdefault(tuple(h2h[equipe]), []).append(equipe)
+
+    ordre = []
+    for cle in sorted(blocs, reverse=True):
+        bloc = blocs[cle]
+        if len(bloc) == 1:
+            ordre.extend(bloc)
+        elif len(bloc) < len(equipes):
+            ordre.extend(_departager(bloc, bilan, matchs))
+        else:
+            ordre.extend(sorted(bloc, key=lambda e: (-bilan[e][1], -bilan[e][2], e)))
+    return ordre
+
+
+def classer(equipes, matchs):
+    """(ordre des équipes, bilan) d'un groupe ; matchs : [(équipe1, équipe2, buts1, buts2)] joués"""
+    bilan = _bilan(equipes, matchs)
+    ordre = []
+    for pts in sorted({b[0] for b in bilan.values()}, reverse=True):
+        ordre.extend(_departager([e for e in equipes if bilan[e][0] == pts], bilan, matchs))
+    return ordre, bilan
+
+
+# ==========================================================
+# AGRÉGATS DU TOURNOI (MISE À JOUR INCRÉMENTALE)
+# ==========================================================
+
+PHASE_POULES = "Phase de poules"
+
+
+def classer_stats(stats):
+    """Recalcule les classements dérivés (lecture en temps constant ensuite)"""
+    equipes = stats['equipes']
+    stats['attaques'] = sorted(equipes, key=lambda e: (-equipes[e]['bp'], e))
+    stats['defenses'] = sorted(
+        (e for e in equipes if equipes[e]['joues']),
+        key=lambda e: (equipes[e]['bc'] / equipes[e]['joues'], -equipes[e]['clean_sheets'], e)
+    )
+    stats['moyenne_buts'] = (
+        stats['buts_total'] / stats['matchs_joues'] if stats['matchs_joues'] else 0.0
+    )
+
+
+def appliquer_score(stats, change, score, sens):
+    """Ajoute (sens=1) ou retire (sens=-1) la contribution d'un score aux agrégats"""
+    buts = parse_score(score)
+    if buts is None:
+        return
+
+    phase = change.get('phase', PHASE_POULES)
+    total = buts[0] + buts[1]
+    stats['matchs_joues'] += sens
+    stats['buts_total'] += sens * total
+    stats['buts_phase'][phase] = stats['buts_phase'].get(phase, 0) + sens * total
+
+    for equipe, bp, bc in ((change['equipe1'], buts[0], buts[1]),
+                           (change['equipe2'], buts[1], buts[0])):
+        e = stats['equipes'].setdefault(equipe, {'joues': 0, 'bp': 0, 'bc': 0, 'clean_sheets': 0})
+        e['joues'] += sens
+        e['bp'] += sens * bp
+        e['bc'] += sens * bc
+        e['clean_sheets'] += sens * (bc == 0)
+
+
+# ==========================================================
+# DATES ET RECHERCHE DANS LE CALENDRIER
+# ==========================================================
+
+MOIS_FR = {
+    'janvier': 1, 'février': 2, 'fevrier': 2, 'mars': 3, 'avril': 4,
+    'mai': 5, 'juin': 6, 'juillet': 7, 'août': 8, 'aout': 8,
+    'septembre': 9, 'octobre': 10, 'novembre': 11, 'décembre': 12, 'decembre': 12
+}
+DATE_FR_PATTERN = re.compile(r'(\d{1,2})(?:er)?\s+([^\W\d_]+)\s+(\d{4})')
+HEURE_PATTERN = re.compile(r'(\d{1,2})\s*h\s*(\d{2})?')
+
+
+def parse_date_fr(date, heure=None):
+    """Convertit '3 janvier 2026' et '17h00' en datetime, None si non interprétable"""
+    if date is None:
+        return None
+    match = DATE_FR_PATTERN.search(str(date).lower())
+    if not match or match.group(2) not in MOIS_FR:
+        return None
+
+    h, m = 0, 0
+    if heure is not None:
+        match_heure = HEURE_PATTERN.search(str(heure))
+        if match_heure:
+            h, m = int(match_heure.group(1)), int(match_heure.group(2) or 0)
+
+    try:
+        return datetime(int(match.group(3)), MOIS_FR[match.group(2)], int(match.group(1)), h, m)
+    except ValueError:
+        return None
+
+
+def suivants(instants, matchs, apres, n=1):
+    """Les n premiers matchs strictement après l'instant (listes parallèles triées)"""
+    debut = bisect_right(instants, apres)
+    return matchs[debut:debut + n]
+
+
+def precedents(instants, matchs, avant, n=1):
+    """Les n derniers matchs jusqu'à l'instant (du plus récent au plus ancien)"""
+    fin = bisect_right(instants, avant)
+    return matchs[max(0, fin - n):fin][::-1]
+
+
+def entre(instants, matchs, debut, fin):
+    """Matchs dont l'horaire est dans [debut, fin["""
+    return matchs[bisect_left(instants, debut):bisect_left(instants, fin)]
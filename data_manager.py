@@ -1,14 +1,17 @@
 import pandas as pd
 from functools import lru_cache
-from pathlib import Path
 import logging
+import sys
+
+from core import (
+    DATA_DIR, FICHIERS, normalize, SCORE_PATTERN, parse_score,
+    subscribe, publier, PHASE_POULES, classer, classer_stats, appliquer_score,
+    parse_date_fr, suivants, precedents, entre, UNKNOWN_TEAM_ID
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-BASE_DIR = Path(__file__).parent
-DATA_DIR = BASE_DIR / "data"
-
 
 class DataLoadError(Exception):
     """Exception personnalisée pour les erreurs de chargement de données"""
@@ -27,11 +30,151 @@ def clean_number(value):
         return 0
 
 
+# ==========================================================
+# REGISTRE CANONIQUE DES ÉQUIPES (IDENTIFIANTS ENTIERS)
+# ==========================================================
+
+# Variantes et traductions → nom canonique (tel qu'écrit dans equipes.csv)
+# Les noms canoniques eux-mêmes, sans accents, sont ajoutés automatiquement
+TEAM_ALIASES = {
+    "morocco": "Maroc",
+    "senegal": "Sénégal",
+    "algeria": "Algérie",
+    "egypt": "Égypte",
+    "cameroon": "Cameroun",
+    "cote d ivoire": "Côte d'Ivoire", "ivoire": "Côte d'Ivoire", "ivory coast": "Côte d'Ivoire",
+    "south africa": "Afrique du Sud",
+    "dr congo": "RD Congo", "rdc": "RD Congo", "congo": "RD Congo",
+    "benin": "Bénin",
+    "tunisia": "Tunisie",
+    "burkina": "Burkina Faso",
+    "zambia": "Zambie",
+    "tanzania": "Tanzanie",
+    "comoros": "Comores",
+    "equatorial guinea": "Guinée équatoriale",
+    "sudan": "Soudan",
+    "uganda": "Ouganda",
+}
+
+@lru_cache(maxsize=1)
+def load_registre_equipes():
+    """
+    Registre canonique des équipes construit depuis equipes.csv
+    - noms : nom canonique par identifiant entier
+    - alias : orthographe normalisée (noms, variantes, traductions) → identifiant
+    """
+    try:
+        df = pd.read_csv(DATA_DIR / "equipes.csv")
+        noms = [str(n).strip() for n in df['equipe'].dropna()]
+    except FileNotFoundError:
+        logger.error(f"Fichier manquant: equipes.csv")
+        noms = []
+    except Exception as e:
+        logger.error(f"Erreur chargement equipes.csv: {e}")
+        raise DataLoadError(f"Erreur chargement registre équipes: {e}")
+
+    alias = {normalize(nom): tid for tid, nom in enumerate(noms)}
+    for variante, nom in TEAM_ALIASES.items():
+        if nom in noms:
+            alias.setdefault(normalize(variante), noms.index(nom))
+
+    logger.info(f"✓ Registre équipes: {len(noms)} équipes, {len(alias)} orthographes")
+    return {'noms': noms, 'alias': alias}
+
+
+@lru_cache(maxsize=512)
+def team_id(name):
+    """Identifiant entier d'une équipe quelle que soit son orthographe, None si inconnue"""
+    if not isinstance(name, str):
+        return None
+    return load_registre_equipes()['alias'].get(normalize(name))
+
+
+def team_name(tid):
+    """Nom canonique d'un identifiant d'équipe"""
+    noms = load_registre_equipes()['noms']
+    if tid is None or not 0 <= tid < len(noms):
+        return None
+    return noms[tid]
+
+
 def normalize_team_name(name):
-    """Normalise le nom d'une équipe"""
-    if pd.isna(name):
+    """Nom canonique d'une équipe (orthographe d'origine si inconnue du registre)"""
+    if not isinstance(name, str):
         return ""
-    return str(name).strip().title()
+    return team_name(team_id(name)) or name.strip()
+
+
+def _indexer_equipes(df, colonnes):
+    """
+    Ré-indexe les colonnes d'équipes sur le registre :
+    nom canonique (catégoriel) + colonne <col>_id d'identifiants entiers
+    """
+    for col in colonnes:
+        valeurs = df[col].unique()
+        ids = {v: team_id(v) for v in valeurs}
+        df[f'{col}_id'] = df[col].map(
+            lambda v: UNKNOWN_TEAM_ID if ids[v] is None else ids[v]
+        ).astype('int8')
+        df[col] = df[col].map({v: normalize_team_name(v) for v in valeurs}).astype('category')
+    return df
+
+
+# ==========================================================
+# SCHÉMAS : REPRÉSENTATION COMPACTE EN MÉMOIRE
+# ==========================================================
+
+# Type de chaque colonne par jeu de données :
+# - category : peu de valeurs distinctes (équipes, postes, clubs, phases, villes)
+# - intN     : entiers de la plus petite taille suffisante
+# - date     : date de naissance '19 July 1991 (aged 34)' → datetime64
+# - intern   : texte à valeurs uniques, chaînes internées (partagées avec les index)
+# Les scores restent du texte : ils changent pendant le tournoi (update_score)
+SCHEMAS = {
+    'poules': {'groupe': 'category', 'equipe1': 'category', 'equipe2': 'category'},
+    'finales': {
+        'phase': 'category', 'date': 'category', 'heure': 'category',
+        'equipe1': 'category', 'equipe2': 'category', 'stade': 'category',
+    },
+    'joueurs': {
+        'joueur': 'intern', 'equipe': 'category', 'poste': 'category',
+        'date_naissance': 'date', 'club': 'category', 'goals': 'int16',
+    },
+    'classement': {
+        'groupe': 'category', 'rang': 'int8', 'equipe': 'category', 'pts': 'int8',
+        'joues': 'int8', 'gagnes': 'int8', 'nuls': 'int8', 'perdus': 'int8',
+        'bp': 'int16', 'bc': 'int16', 'diff': 'int16',
+    },
+    'groupes': {'groupe': 'category', 'equipe': 'category'},
+    'stades': {'ville': 'category', 'stade': 'intern', 'capacite': 'int32'},
+}
+
+DATE_NAISSANCE_PATTERN = r'(\d{1,2} [A-Za-z]+ \d{4})'
+
+
+def parse_date_naissance(serie):
+    """'19 July 1991 (aged 34)' → datetime64 (NaT si non interprétable) - vectorisé"""
+    dates = serie.astype(str).str.extract(DATE_NAISSANCE_PATTERN)[0]
+    return pd.to_datetime(dates, format='%d %B %Y', errors='coerce')
+
+
+def _appliquer_schema(df, nom):
+    """Convertit les colonnes d'un jeu de données selon son schéma déclaré"""
+    for col, type_col in SCHEMAS.get(nom, {}).items():
+        if col not in df.columns:
+            continue
+        if type_col == 'category':
+            df[col] = df[col].astype('category')
+        elif type_col == 'date':
+            df[col] = parse_date_naissance(df[col])
+        elif type_col == 'intern':
+            df[col] = pd.Series(
+                [sys.intern(v) if isinstance(v, str) else v for v in df[col]],
+                index=df.index, dtype=object
+            )
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(type_col)
+    return df
 
 
 @lru_cache(maxsize=1)
@@ -39,8 +182,8 @@ def load_poules():
     """Charge les matchs de poules avec cache"""
     try:
         df = pd.read_csv(DATA_DIR / "poules_matchs.csv")
-        df['equipe1'] = df['equipe1'].apply(normalize_team_name)
-        df['equipe2'] = df['equipe2'].apply(normalize_team_name)
+        _indexer_equipes(df, ['equipe1', 'equipe2'])
+        _appliquer_schema(df, 'poules')
         logger.info(f"✓ Matchs de poules chargés: {len(df)} matchs")
         return df
     except FileNotFoundError:
@@ -56,8 +199,8 @@ def load_finales():
     """Charge les matchs de phases finales avec cache"""
     try:
         df = pd.read_csv(DATA_DIR / "phases_finales_matchs.csv")
-        df['equipe1'] = df['equipe1'].apply(normalize_team_name)
-        df['equipe2'] = df['equipe2'].apply(normalize_team_name)
+        _indexer_equipes(df, ['equipe1', 'equipe2'])
+        _appliquer_schema(df, 'finales')
         logger.info(f"✓ Phases finales chargées: {len(df)} matchs")
         return df
     except FileNotFoundError:
@@ -73,7 +216,8 @@ def load_joueurs():
     """Charge la liste des joueurs avec cache"""
     try:
         df = pd.read_csv(DATA_DIR / "joueurs_brut.csv")
-        df['equipe'] = df['equipe'].apply(normalize_team_name)
+        _indexer_equipes(df, ['equipe'])
+        _appliquer_schema(df, 'joueurs')
         logger.info(f"✓ Joueurs chargés: {len(df)} joueurs")
         return df
     except FileNotFoundError:
@@ -89,7 +233,8 @@ def load_classement():
     """Charge le classement des groupes avec cache"""
     try:
         df = pd.read_csv(DATA_DIR / "classement_groupes.csv")
-        df['equipe'] = df['equipe'].apply(normalize_team_name)
+        _indexer_equipes(df, ['equipe'])
+        _appliquer_schema(df, 'classement')
         logger.info(f"✓ Classements chargés: {len(df)} équipes")
         return df
     except FileNotFoundError:
@@ -105,7 +250,8 @@ def load_groupes():
     """Charge la composition des groupes avec cache"""
     try:
         df = pd.read_csv(DATA_DIR / "groupes.csv")
-        df['equipe'] = df['equipe'].apply(normalize_team_name)
+        _indexer_equipes(df, ['equipe'])
+        _appliquer_schema(df, 'groupes')
         logger.info(f"✓ Groupes chargés: {len(df)} équipes")
         return df
     except FileNotFoundError:
@@ -123,6 +269,7 @@ def load_stades():
         df = pd.read_csv(DATA_DIR / "stades.csv")
         # Normaliser les capacités
         df['capacite'] = df['capacite'].apply(clean_number)
+        _appliquer_schema(df, 'stades')
         logger.info(f"✓ Stades chargés: {len(df)} stades")
         return df
     except FileNotFoundError:
@@ -149,6 +296,358 @@ def load_equipes():
         raise DataLoadError(f"Erreur chargement équipes: {e}")
 
 
+# ==========================================================
+# CLASSEMENT CALCULÉ À PARTIR DES RÉSULTATS DE POULES
+# ==========================================================
+
+CLASSEMENT_COLUMNS = [
+    'groupe', 'rang', 'equipe', 'pts', 'joues', 'gagnes',
+    'nuls', 'perdus', 'bp', 'bc', 'diff'
+]
+STATS_COLUMNS = ['joues', 'gagnes', 'nuls', 'perdus', 'bp', 'bc']
+
+# Classement courant par groupe (rempli par load_classement_calcule)
+_classement_par_groupe = {}
+
+def _inverser_score(score):
+    """Inverse un score texte ('2-0' → '0-2') en conservant son format"""
+    return SCORE_PATTERN.sub(lambda m: f"{m.group(3)}{m.group(2)}{m.group(1)}", str(score), count=1)
+
+
+def _buts(matchs):
+    """Ajoute les colonnes buts1 / buts2 (NaN si match non joué) - vectorisé"""
+    buts = matchs['score'].astype(str).str.extract(SCORE_PATTERN).drop(columns=1)
+    buts = buts.apply(pd.to_numeric, errors='coerce')
+    return matchs.assign(buts1=buts[0].values, buts2=buts[2].values)
+
+
+def _stats_equipes(matchs, equipes):
+    """
+    Bilan (joués, victoires, nuls, défaites, buts, points) de chaque équipe
+    sur les matchs fournis (colonnes buts1 / buts2) - vectorisé
+    """
+    joues = matchs.dropna(subset=['buts1', 'buts2'])
+    lignes = pd.concat([
+        pd.DataFrame({'equipe': joues['equipe1'], 'bp': joues['buts1'], 'bc': joues['buts2']}),
+        pd.DataFrame({'equipe': joues['equipe2'], 'bp': joues['buts2'], 'bc': joues['buts1']}),
+    ], ignore_index=True)
+
+    lignes['joues'] = 1
+    lignes['gagnes'] = (lignes['bp'] > lignes['bc']).astype(int)
+    lignes['nuls'] = (lignes['bp'] == lignes['bc']).astype(int)
+    lignes['perdus'] = (lignes['bp'] < lignes['bc']).astype(int)
+
+    stats = (
+        lignes.groupby('equipe', observed=True)[STATS_COLUMNS].sum()
+        .reindex(list(equipes), fill_value=0)
+        .astype(int)
+    )
+    stats['pts'] = 3 * stats['gagnes'] + stats['nuls']
+    stats['diff'] = stats['bp'] - stats['bc']
+    return stats
+
+
+def _classement_groupe(groupe, matchs):
+    """Calcule le classement d'un groupe à partir de ses matchs"""
+    matchs = _buts(matchs)
+    equipes = pd.unique(matchs[['equipe1', 'equipe2']].values.ravel())
+    stats = _stats_equipes(matchs, equipes)
+
+    # Ordre du règlement : même départage que qualification (core.classer)
+    joues = matchs.dropna(subset=['buts1', 'buts2'])
+    ordre, _ = classer(list(equipes), [
+        (e1, e2, int(b1), int(b2))
+        for e1, e2, b1, b2 in zip(joues['equipe1'], joues['equipe2'], joues['buts1'], joues['buts2'])
+    ])
+
+    result = stats.loc[ordre].rename_axis('equipe').reset_index()
+    result['groupe'] = groupe
+    result['rang'] = range(1, len(result) + 1)
+    result['equipe_id'] = result['equipe'].map(team_id)
+    return result[CLASSEMENT_COLUMNS + ['equipe_id']]
+
+
+def compute_classement(poules):
+    """Calcule le classement complet de tous les groupes (même format que classement_groupes.csv)"""
+    if poules.empty:
+        return pd.DataFrame(columns=CLASSEMENT_COLUMNS)
+    return pd.concat(
+        [_classement_groupe(groupe, matchs) for groupe, matchs in poules.groupby('groupe', observed=True)],
+        ignore_index=True
+    )
+
+
+@lru_cache(maxsize=1)
+def load_classement_calcule():
+    """
+    Calcule le classement de chaque groupe depuis poules_matchs.csv
+    Retourne un dictionnaire {groupe: DataFrame} tenu à jour par update_score()
+    """
+    poules = load_poules()
+    _classement_par_groupe.clear()
+    if not poules.empty:
+        for groupe, matchs in poules.groupby('groupe', observed=True):
+            _classement_par_groupe[groupe] = _classement_groupe(groupe, matchs)
+    logger.info(f"✓ Classements calculés: {len(_classement_par_groupe)} groupes")
+    return _classement_par_groupe
+
+
+def get_classement_groupe(groupe):
+    """Classement calculé d'un groupe (DataFrame vide si inconnu)"""
+    return load_classement_calcule().get(groupe, pd.DataFrame(columns=CLASSEMENT_COLUMNS))
+
+
+def get_classement_equipe(equipe):
+    """Ligne de classement calculée d'une équipe, None si introuvable"""
+    tid = team_id(equipe)
+    for rows in load_classement_calcule().values():
+        row = rows[rows['equipe_id'] == tid]
+        if not row.empty:
+            return row.iloc[0]
+    return None
+
+
+def _trouver_match(df, id1, id2):
+    """Index du match entre deux identifiants d'équipes dans df et indicateur d'ordre inversé"""
+    if df.empty or id1 is None or id2 is None:
+        return None, False
+    direct = df.index[(df['equipe1_id'] == id1) & (df['equipe2_id'] == id2)]
+    if len(direct):
+        return direct[0], False
+    inverse = df.index[(df['equipe1_id'] == id2) & (df['equipe2_id'] == id1)]
+    if len(inverse):
+        return inverse[0], True
+    return None, False
+
+
+def update_score(equipe1, equipe2, score):
+    """
+    Enregistre le score d'un match (poules ou phases finales) dans les données en mémoire
+    Pour un match de poule, seul le classement du groupe concerné est recalculé
+    Retourne un dictionnaire décrivant le changement (ligne : position du match dans
+    son jeu de données), None si le match est introuvable
+    """
+    id1, id2 = team_id(equipe1), team_id(equipe2)
+
+    for dataset, df in (('poules', load_poules()), ('finales', load_finales())):
+        idx, inverse = _trouver_match(df, id1, id2)
+        if idx is None:
+            continue
+
+        nouveau = _inverser_score(score) if inverse else str(score)
+        ancien = df.at[idx, 'score']
+        df.at[idx, 'score'] = nouveau
+
+        change = {
+            'dataset': dataset,
+            'ligne': int(df.index.get_loc(idx)),
+            'equipe1': df.at[idx, 'equipe1'],
+            'equipe2': df.at[idx, 'equipe2'],
+            'equipe1_id': int(df.at[idx, 'equipe1_id']),
+            'equipe2_id': int(df.at[idx, 'equipe2_id']),
+            'ancien_score': ancien,
+            'score': nouveau,
+        }
+
+        if dataset == 'poules':
+            groupe = df.at[idx, 'groupe']
+            classements = load_classement_calcule()
+            classements[groupe] = _classement_groupe(groupe, df[df['groupe'] == groupe])
+            change['groupe'] = groupe
+        else:
+            change['phase'] = df.at[idx, 'phase']
+
+        logger.info(f"✓ Score mis à jour: {change['equipe1']} {nouveau} {change['equipe2']}")
+        publier(change)
+        return change
+
+    logger.warning(f"Match introuvable: {equipe1} - {equipe2}")
+    return None
+
+
+# ==========================================================
+# STATISTIQUES DU TOURNOI (AGRÉGATS PRÉCALCULÉS)
+# ==========================================================
+
+TOP_BUTEURS = 10
+
+# Agrégats courants (remplis par load_stats, tenus à jour via subscribe)
+_stats = {}
+
+
+def _matchs_tournoi():
+    """Tous les matchs (poules + phases finales) avec leur phase et les buts parsés"""
+    frames = []
+    poules = load_poules()
+    if not poules.empty:
+        frames.append(poules[['equipe1', 'equipe2', 'score']].assign(phase=PHASE_POULES))
+    finales = load_finales()
+    if not finales.empty:
+        frames.append(finales[['equipe1', 'equipe2', 'score', 'phase']])
+    if not frames:
+        return pd.DataFrame(columns=['equipe1', 'equipe2', 'score', 'phase', 'buts1', 'buts2'])
+    return _buts(pd.concat(frames, ignore_index=True))
+
+
+def _stats_matchs(matchs):
+    """Agrégats de buts par équipe et par phase, clean sheets - vectorisé"""
+    joues = matchs.dropna(subset=['buts1', 'buts2'])
+    lignes = pd.concat([
+        pd.DataFrame({'equipe': joues['equipe1'], 'bp': joues['buts1'], 'bc': joues['buts2']}),
+        pd.DataFrame({'equipe': joues['equipe2'], 'bp': joues['buts2'], 'bc': joues['buts1']}),
+    ], ignore_index=True)
+    lignes['joues'] = 1
+    lignes['clean_sheets'] = (lignes['bc'] == 0).astype(int)
+
+    par_equipe = lignes.groupby('equipe', observed=True)[['joues', 'bp', 'bc', 'clean_sheets']].sum().astype(int)
+    buts_phase = (joues['buts1'] + joues['buts2']).groupby(joues['phase'], sort=False).sum().astype(int)
+
+    return {
+        'matchs_joues': len(joues),
+        'buts_total': int((joues['buts1'] + joues['buts2']).sum()),
+        'buts_phase': buts_phase.to_dict(),
+        'equipes': par_equipe.to_dict('index'),
+    }
+
+
+@lru_cache(maxsize=1)
+def load_stats():
+    """
+    Précalcule les agrégats du tournoi : buteurs, buts par équipe et par phase,
+    clean sheets, effectifs par club et par poste
+    Les agrégats de matchs sont ensuite mis à jour incrémentalement par update_score()
+    """
+    _stats.clear()
+    _stats.update(_stats_matchs(_matchs_tournoi()))
+
+    joueurs = load_joueurs()
+    if joueurs.empty:
+        _stats.update(buteurs=[], buteurs_equipe={}, joueurs_club={}, joueurs_poste={})
+    else:
+        buteurs = joueurs[joueurs['goals'] > 0].sort_values(
+            ['goals', 'joueur'], ascending=[False, True], kind='mergesort'
+        )
+        lignes = list(zip(buteurs['joueur'], buteurs['equipe'], buteurs['goals'].astype(int)))
+        par_equipe = {}
+        for ligne, tid in zip(lignes, buteurs['equipe_id']):
+            par_equipe.setdefault(int(tid), []).append(ligne)
+
+        _stats['buteurs'] = lignes[:TOP_BUTEURS]
+        _stats['buteurs_equipe'] = {e: l[:TOP_BUTEURS] for e, l in par_equipe.items()}
+        _stats['joueurs_club'] = joueurs['club'].dropna().value_counts().to_dict()
+        _stats['joueurs_poste'] = joueurs['poste'].dropna().value_counts().to_dict()
+
+    classer_stats(_stats)
+    logger.info(f"✓ Statistiques calculées: {_stats['matchs_joues']} matchs, {_stats['buts_total']} buts")
+    return _stats
+
+
+def _maj_stats(change):
+    """Mise à jour incrémentale des agrégats après un nouveau score"""
+    if load_stats.cache_info().currsize == 0:
+        return
+    appliquer_score(_stats, change, change['ancien_score'], -1)
+    appliquer_score(_stats, change, change['score'], 1)
+    classer_stats(_stats)
+
+
+subscribe(_maj_stats)
+
+
+# ==========================================================
+# CALENDRIER : INDEX TEMPOREL DES MATCHS
+# ==========================================================
+
+# Index courant (rempli par load_calendrier, tenu à jour via subscribe)
+_calendrier = {}
+
+
+@lru_cache(maxsize=1)
+def load_calendrier():
+    """
+    Index temporel trié des matchs datés (phases finales : les poules n'ont pas de date)
+    - instants / matchs : listes parallèles triées, globales
+    - equipes : {identifiant d'équipe: (instants, matchs)} triés par équipe
+    - par_ligne : {position dans finales: match} pour les mises à jour de score
+    Les équipes pas encore connues (UNKNOWN_TEAM_ID) ne sont pas indexées
+    Les recherches se font par bisection, sans parcourir les DataFrames
+    """
+    matchs = []
+    finales = load_finales()
+    for ligne, r in enumerate(finales.to_dict('records')):
+        instant = parse_date_fr(r.get('date'), r.get('heure'))
+        if instant is None:
+            continue
+        matchs.append({
+            'ligne': ligne,
+            'instant': instant,
+            'date': r.get('date', ''),
+            'heure': r.get('heure', ''),
+            'equipe1': r['equipe1'],
+            'equipe2': r['equipe2'],
+            'equipe1_id': r['equipe1_id'],
+            'equipe2_id': r['equipe2_id'],
+            'score': r.get('score', ''),
+            'phase': r.get('phase', ''),
+            'stade': r.get('stade', ''),
+        })
+    matchs.sort(key=lambda m: m['instant'])
+
+    par_equipe = {}
+    for m in matchs:
+        for tid in (m['equipe1_id'], m['equipe2_id']):
+            if tid == UNKNOWN_TEAM_ID:
+                continue
+            instants, liste = par_equipe.setdefault(tid, ([], []))
+            instants.append(m['instant'])
+            liste.append(m)
+
+    _calendrier.clear()
+    _calendrier.update(
+        instants=[m['instant'] for m in matchs],
+        matchs=matchs,
+        equipes=par_equipe,
+        par_ligne={m['ligne']: m for m in matchs},
+    )
+    logger.info(f"✓ Calendrier indexé: {len(matchs)} matchs datés")
+    return _calendrier
+
+
+def _index_calendrier(equipe=None):
+    """Listes parallèles (instants, matchs) globales ou d'une équipe"""
+    calendrier = load_calendrier()
+    if equipe is None:
+        return calendrier['instants'], calendrier['matchs']
+    return calendrier['equipes'].get(team_id(equipe), ([], []))
+
+
+def prochains_matchs(apres, equipe=None, n=1):
+    """Les n premiers matchs strictement après l'instant donné"""
+    return suivants(*_index_calendrier(equipe), apres, n)
+
+
+def derniers_matchs(avant, equipe=None, n=1):
+    """Les n derniers matchs jusqu'à l'instant donné (du plus récent au plus ancien)"""
+    return precedents(*_index_calendrier(equipe), avant, n)
+
+
+def matchs_entre(debut, fin, equipe=None):
+    """Matchs dont l'horaire est dans [debut, fin["""
+    return entre(*_index_calendrier(equipe), debut, fin)
+
+
+def _maj_calendrier(change):
+    """Reporte un nouveau score de phase finale dans l'index du calendrier"""
+    if change.get('dataset') != 'finales' or load_calendrier.cache_info().currsize == 0:
+        return
+    match = _calendrier['par_ligne'].get(change['ligne'])
+    if match is not None:
+        match['score'] = change['score']
+
+
+subscribe(_maj_calendrier)
+
+
 def load_all_data():
     """
     Charge toutes les données nécessaires
@@ -165,6 +664,28 @@ def load_all_data():
     }
 
 
+def memory_report():
+    """
+    Mémoire occupée par chaque jeu de données (octets), typé selon SCHEMAS
+    comparée à un chargement brut en objets Python
+    """
+    rapport = {}
+    for nom, valeur in load_all_data().items():
+        if not isinstance(valeur, pd.DataFrame):
+            continue
+        try:
+            brut = pd.read_csv(DATA_DIR / FICHIERS[nom], dtype=object)
+            octets_brut = int(brut.memory_usage(deep=True).sum())
+        except FileNotFoundError:
+            octets_brut = 0
+        rapport[nom] = {
+            'lignes': len(valeur),
+            'brut': octets_brut,
+            'type': int(valeur.memory_usage(deep=True).sum()),
+        }
+    return rapport
+
+
 def clear_cache():
     """Vide le cache de toutes les données"""
     load_poules.cache_clear()
@@ -174,6 +695,11 @@ def clear_cache():
     load_groupes.cache_clear()
     load_stades.cache_clear()
     load_equipes.cache_clear()
+    load_registre_equipes.cache_clear()
+    team_id.cache_clear()
+    load_classement_calcule.cache_clear()
+    load_stats.cache_clear()
+    load_calendrier.cache_clear()
     logger.info("✓ Cache vidé")
 
 
@@ -186,3 +712,8 @@ if __name__ == "__main__":
             print(f"{key}: {len(value)} lignes")
         else:
             print(f"{key}: {len(value)} éléments")
+
+    print("\nMémoire par jeu de données (brut → typé) :")
+    for key, r in memory_report().items():
+        gain = 1 - r['type'] / r['brut'] if r['brut'] else 0
+        print(f"{key:12} {r['brut'] / 1024:8.1f} Ko → {r['type'] / 1024:8.1f} Ko  (-{gain:.0%})")
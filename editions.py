@@ -0,0 +1,202 @@
+"""
+Éditions passées de la CAN servies par le même processus (historique, face-à-face)
+Une édition = un dossier data/editions/<année>/ avec les mêmes CSV que data/ et
+son propre instantané (data/editions/<année>/snapshot/), construit par
+`python editions.py <année>` ou, au premier accès, dans un processus enfant.
+Chaque partie d'une édition (registre, tournoi, stades, stats, joueurs) est
+chargée au premier accès et gardée dans un magasin LRU borné en mémoire
+(CAN_BUDGET_EDITIONS_MO, poids : taille des fichiers de l'instantané) : les
+parties les moins récemment utilisées sont évincées. L'édition courante n'en
+fait pas partie (snapshot.py, ou la base SQLite) : son chemin est inchangé
+"""
+
+import argparse
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+from core import EDITION_COURANTE, EDITIONS_DIR, FICHIERS
+from snapshot import PARTIES, Requetes, partie_enregistree
+
+logger = logging.getLogger(__name__)
+
+BUDGET_MO = float(os.environ.get("CAN_BUDGET_EDITIONS_MO", 64))
+
+# "can 2023", "edition 2019" : édition citée explicitement ; sinon une année seule
+EDITION_PATTERN = re.compile(r"\b(?:can|edition)\s*(\d{4})\b")
+ANNEE_PATTERN = re.compile(r"\b((?:19|20)\d\d)\b")
+
+
+class EditionIndisponible(LookupError):
+    """Édition sans données (dossier absent ou instantané impossible à construire)"""
+
+
+def dossier_edition(annee):
+    return EDITIONS_DIR / str(annee)
+
+
+@lru_cache(maxsize=1)
+def editions_disponibles():
+    """Années des éditions passées présentes (dossier avec equipes.csv), la plus récente d'abord"""
+    try:
+        dossiers = [d for d in EDITIONS_DIR.iterdir() if d.name.isdigit() and (d / FICHIERS['equipes']).exists()]
+    except FileNotFoundError:
+        return ()
+    return tuple(sorted((int(d.name) for d in dossiers if int(d.name) != EDITION_COURANTE), reverse=True))
+
+
+def find_edition(q_norm):
+    """
+    Édition passée citée dans la question normalisée : "can 2023", "edition 2019"
+    (même indisponible), ou l'année seule d'une édition disponible ; None sinon
+    (édition courante)
+    """
+    match = EDITION_PATTERN.search(q_norm)
+    if match:
+        annee = int(match.group(1))
+        return None if annee == EDITION_COURANTE else annee
+    for annee in ANNEE_PATTERN.findall(q_norm):
+        if int(annee) in editions_disponibles():
+            return int(annee)
+    return None
+
+
+# ==========================================================
+# CONSTRUCTION ET LECTURE DES PARTIES
+# ==========================================================
+
+def construire(annee):
+    """
+    Construit l'instantané d'une édition dans un processus enfant (pandas et les
+    caches de data_manager restent hors du processus de service)
+    """
+    dossier = dossier_edition(annee)
+    debut = time.perf_counter()
+    resultat = subprocess.run(
+        [sys.executable, str(Path(__file__).with_name("snapshot.py"))],
+        env={**os.environ, "CAN_DATA_DIR": str(dossier)},
+        capture_output=True, text=True,
+    )
+    if resultat.returncode:
+        logger.error(f"Instantané de la CAN {annee} non construit: {resultat.stderr.strip()[-500:]}")
+        raise EditionIndisponible(annee)
+    logger.info(f"✓ Instantané de la CAN {annee} construit en {(time.perf_counter() - debut) * 1000:.0f} ms")
+
+
+def charger_partie(annee, nom):
+    """(données, poids en octets) d'une partie, instantané construit au besoin"""
+    dossier = dossier_edition(annee)
+    donnees = partie_enregistree(nom, dossier)
+    if donnees is None:
+        construire(annee)
+        donnees = partie_enregistree(nom, dossier)
+        if donnees is None:
+            raise EditionIndisponible(annee)
+    return donnees, (dossier / "snapshot" / f"{nom}.pkl").stat().st_size
+
+
+class MagasinEditions:
+    """Parties des éditions passées chargées, évincées (LRU) au-delà du budget"""
+
+    def __init__(self, budget_mo=BUDGET_MO):
+        self.budget = int(budget_mo * 1024 * 1024)
+        self.poids = 0
+        self.chargements = 0
+        self.evictions = 0
+        self._parties = OrderedDict()     # (année, partie) → (données, poids)
+        self._verrou = threading.Lock()
+
+    def partie(self, annee, nom):
+        cle = (annee, nom)
+        with self._verrou:
+            if cle in self._parties:
+                self._parties.move_to_end(cle)
+                return self._parties[cle][0]
+
+            debut = time.perf_counter()
+            donnees, poids = charger_partie(annee, nom)
+            self._parties[cle] = (donnees, poids)
+            self.poids += poids
+            self.chargements += 1
+            logger.info(f"✓ Partie '{nom}' de la CAN {annee} chargée en {(time.perf_counter() - debut) * 1000:.0f} ms")
+
+            # La partie demandée reste, même seule au-delà du budget
+            while self.poids > self.budget and len(self._parties) > 1:
+                (a, n), (_, p) = self._parties.popitem(last=False)
+                self.poids -= p
+                self.evictions += 1
+                logger.info(f"Partie '{n}' de la CAN {a} évincée ({p // 1024} Ko)")
+            return donnees
+
+    def vider(self):
+        with self._verrou:
+            self._parties.clear()
+            self.poids = 0
+
+    def etat(self):
+        with self._verrou:
+            return {
+                "budget_ko": self.budget // 1024,
+                "poids_ko": self.poids // 1024,
+                "parties": [f"{a}/{n}" for a, n in self._parties],
+                "chargements": self.chargements,
+                "evictions": self.evictions,
+            }
+
+
+magasin = MagasinEditions()
+
+
+class Edition(Requetes):
+    """Requêtes d'une édition passée, parties lues dans le magasin"""
+
+    def __init__(self, annee, magasin=magasin):
+        self.annee = annee
+        self.magasin = magasin
+
+    def __repr__(self):
+        return f"Edition({self.annee})"
+
+    def load_partie(self, nom):
+        return self.magasin.partie(self.annee, nom)
+
+
+_editions = {}
+
+
+def edition(annee):
+    """Requêtes d'une édition passée disponible (EditionIndisponible sinon)"""
+    if annee not in editions_disponibles():
+        raise EditionIndisponible(annee)
+    if annee not in _editions:
+        _editions[annee] = Edition(annee)
+    return _editions[annee]
+
+
+def clear_cache():
+    """Oublie les parties chargées et la liste des éditions (nouveau dossier ajouté)"""
+    magasin.vider()
+    _editions.clear()
+    editions_disponibles.cache_clear()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Éditions passées de la CAN (data/editions/<année>/)")
+    parser.add_argument("annees", type=int, nargs="*", help="éditions dont reconstruire l'instantané")
+    args = parser.parse_args()
+
+    for annee in args.annees:
+        construire(annee)
+    for annee in editions_disponibles():
+        dossier = dossier_edition(annee) / "snapshot"
+        a_jour = sum(partie_enregistree(nom, dossier_edition(annee)) is not None for nom in PARTIES)
+        taille = sum(f.stat().st_size for f in dossier.glob("*.pkl")) if dossier.exists() else 0
+        print(f"CAN {annee} : instantané {a_jour}/{len(PARTIES)} parties à jour, {taille // 1024} Ko")
@@ -0,0 +1,124 @@
+"""
+Résolution approximative d'entités (équipes, joueurs, stades)
+Index de trigrammes de caractères précalculé + distance d'édition bornée,
+pour rattraper les fautes de frappe ("senegall", "marok") sans passer par LLaMA
+"""
+
+import logging
+
+from core import normalize
+
+logger = logging.getLogger(__name__)
+
+MIN_LONGUEUR = 4       # mots plus courts : trop de faux positifs
+MAX_CANDIDATS = 8      # candidats vérifiés par distance d'édition
+MAX_MOTS = 3           # taille maximale d'une fenêtre de mots ("cote d ivoire")
+
+
+def trigrammes(mot):
+    """Trigrammes de caractères avec bornes ('mali' → {' ma', 'mal', 'ali', 'li '})"""
+    mot = f" {mot} "
+    return {mot[i:i + 3] for i in range(len(mot) - 2)}
+
+
+def distance_bornee(a, b, maximum):
+    """
+    Distance de Damerau-Levenshtein (transpositions adjacentes) entre a et b
+    Retourne maximum + 1 dès que la distance dépasse la borne
+    """
+    if abs(len(a) - len(b)) > maximum:
+        return maximum + 1
+
+    avant, ligne = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        courante = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cout = 0 if a[i - 1] == b[j - 1] else 1
+            courante[j] = min(ligne[j] + 1, courante[j - 1] + 1, ligne[j - 1] + cout)
+            if (avant is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                courante[j] = min(courante[j], avant[j - 2] + 1)
+        if min(courante) > maximum:
+            return maximum + 1
+        avant, ligne = ligne, courante
+    return ligne[-1]
+
+
+def distance_max(mot):
+    """Nombre de fautes tolérées selon la longueur du mot"""
+    return 1 if len(mot) <= 6 else 2
+
+
+class FuzzyIndex:
+    """Index de trigrammes : libellé normalisé → valeur (nom canonique, enregistrement...)"""
+
+    def __init__(self, entrees, ignores=()):
+        self.libelles = []
+        self.valeurs = []
+        self.index = {}
+        self.exacts = {}
+        self.ignores = {normalize(m) for m in ignores}
+
+        for libelle, valeur in entrees:
+            libelle = normalize(libelle)
+            if len(libelle) < MIN_LONGUEUR or libelle in self.exacts:
+                continue
+            eid = len(self.libelles)
+            self.libelles.append(libelle)
+            self.valeurs.append(valeur)
+            self.exacts[libelle] = eid
+            for tri in trigrammes(libelle):
+                self.index.setdefault(tri, []).append(eid)
+
+    def __len__(self):
+        return len(self.libelles)
+
+    def _candidats(self, fragment):
+        """Libellés partageant le plus de trigrammes avec le fragment"""
+        compte = {}
+        for tri in trigrammes(fragment):
+            for eid in self.index.get(tri, ()):
+                compte[eid] = compte.get(eid, 0) + 1
+        return sorted(compte, key=compte.get, reverse=True)[:MAX_CANDIDATS]
+
+    def chercher_mot(self, fragment):
+        """Meilleure entrée pour un fragment : (valeur, distance) ou None"""
+        if fragment in self.exacts:
+            return self.valeurs[self.exacts[fragment]], 0
+
+        maximum = distance_max(fragment)
+        meilleur, meilleure_cle = None, None
+        for eid in self._candidats(fragment):
+            libelle = self.libelles[eid]
+            if libelle[0] != fragment[0]:
+                continue
+            d = distance_bornee(fragment, libelle, maximum)
+            # à distance égale : longueur la plus proche, puis plus de trigrammes communs
+            cle = (d, abs(len(libelle) - len(fragment)))
+            if d <= maximum and (meilleure_cle is None or cle < meilleure_cle):
+                meilleur, meilleure_cle = eid, cle
+        if meilleur is None:
+            return None
+        return self.valeurs[meilleur], meilleure_cle[0]
+
+    def resoudre(self, texte):
+        """
+        Entité la plus proche citée dans une phrase libre : (valeur, distance) ou None
+        Essaie les fenêtres de 1 à MAX_MOTS mots, la plus longue d'abord à distance égale
+        """
+        mots = normalize(texte).split()
+        meilleur = None
+        for taille in range(MAX_MOTS, 0, -1):
+            for i in range(len(mots) - taille + 1):
+                fenetre = mots[i:i + taille]
+                if taille == 1 and fenetre[0] in self.ignores:
+                    continue
+                fragment = " ".join(fenetre)
+                if len(fragment) < MIN_LONGUEUR:
+                    continue
+                trouve = self.chercher_mot(fragment)
+                if trouve and (meilleur is None or trouve[1] < meilleur[1]):
+                    meilleur = trouve
+                    if trouve[1] == 0:
+                        return meilleur
+        return meilleur
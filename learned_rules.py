@@ -0,0 +1,257 @@
+"""
+Règles apprises des analyses LLaMA
+Avec CAN_JOURNAL_LLM=1, chaque question que le vrai modèle a routée est journalisée
+(motif normalisé → intention, entités, modèle) ; les routeurs simulés des benchmarks
+et des rejeux ne le sont jamais.
+`python learned_rules.py miner` regroupe le journal par mots-clés et propose des règles
+avec leur support et leur accord ; `python learned_rules.py approuver` promeut les
+propositions retenues. Les règles approuvées sont chargées au démarrage et appliquées
+juste avant LLaMA : la part des questions qui le paient diminue avec le temps
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+from core import DATA_DIR, normalize
+
+logger = logging.getLogger(__name__)
+
+# Journal des routes LLaMA, sur demande : CAN_JOURNAL_LLM=1 (fichier par défaut) ou chemin du fichier
+JOURNAL_DEFAUT = DATA_DIR / "llm_routes.jsonl"
+_journal_env = os.environ.get("CAN_JOURNAL_LLM", "0")
+JOURNAL_ROUTES = None if _journal_env in ("", "0") else JOURNAL_DEFAUT if _journal_env == "1" else Path(_journal_env)
+REGLES_PROPOSEES = DATA_DIR / "regles_proposees.json"
+REGLES_APPRISES = DATA_DIR / "regles_apprises.json"
+
+# Proposition : au moins SUPPORT_MIN questions du même groupe, ACCORD_MIN sur l'intention
+SUPPORT_MIN = 3
+ACCORD_MIN = 0.8
+
+# Marques des entités reconnues par les règles dans un motif
+EQUIPE, GROUPE = "{equipe}", "{groupe}"
+
+# Intentions que le routage sait exécuter, et l'entité dont chacune a besoin
+ENTITE_REQUISE = {
+    "joueurs": "equipe", "matchs_equipe": "equipe", "classement": "equipe",
+    "equipes_groupe": "groupe", "phase": "phase", "score": None, "stades": None,
+}
+
+MOTS_VIDES = {
+    "a", "au", "aux", "c", "ce", "ces", "d", "de", "des", "du", "en", "est", "et",
+    "il", "j", "je", "l", "la", "le", "les", "m", "me", "moi", "mon", "ma", "mes",
+    "on", "ou", "par", "pour", "qu", "que", "quel", "quelle", "quels", "quelles",
+    "qui", "s", "sa", "se", "ses", "son", "sur", "t", "te", "toi", "tu", "un", "une",
+}
+
+GROUPE_PATTERN = re.compile(r"\bgroupe ([a-f])\b")
+
+_verrou_journal = threading.Lock()
+
+
+def motif(texte, alias_equipes, norm=None):
+    """
+    Question normalisée (norm : déjà calculée) où l'équipe et le groupe cités sont remplacés
+    par des marques ('effectif du maroc' → 'effectif du {equipe}') ; alias_equipes : [(alias normalisé, id)]
+    """
+    texte = normalize(texte) if norm is None else norm
+    for alias, _ in alias_equipes:
+        remplace = re.sub(rf"\b{re.escape(alias)}\b", EQUIPE, texte, count=1)
+        if remplace != texte:
+            texte = remplace
+            break
+    return GROUPE_PATTERN.sub(f"groupe {GROUPE}", texte)
+
+
+def signature(texte_motif):
+    """Mots significatifs d'un motif, triés (clé de regroupement des questions)"""
+    return tuple(sorted(set(texte_motif.split()) - MOTS_VIDES))
+
+
+def journaliser_route(texte_motif, intention, equipe=None, groupe=None, phase=None, modele=None):
+    """
+    Ajoute une route LLaMA au journal ; ignorée si le journal est désactivé ou si
+    la route ne vient pas d'un vrai modèle (modele : nom donné par llama_router)
+    """
+    if JOURNAL_ROUTES is None or not modele:
+        return
+    ligne = json.dumps({"motif": texte_motif, "intention": intention, "equipe": equipe,
+                        "groupe": groupe, "phase": phase, "modele": modele}, ensure_ascii=False)
+    try:
+        with _verrou_journal, open(JOURNAL_ROUTES, "a", encoding="utf-8") as f:
+            f.write(ligne + "\n")
+    except OSError as e:
+        logger.warning(f"Route LLaMA non journalisée: {e}")
+
+
+# ==========================================================
+# FOUILLE DU JOURNAL
+# ==========================================================
+
+def _valeur_commune(valeurs, accord_min):
+    """Valeur partagée par au moins accord_min des routes, None sinon"""
+    valeur, nombre = Counter(valeurs).most_common(1)[0]
+    return valeur if nombre / len(valeurs) >= accord_min else None
+
+
+def miner(routes, support_min=SUPPORT_MIN, accord_min=ACCORD_MIN):
+    """
+    Regroupe les routes par signature et propose une règle par groupe assez
+    fréquent (support) et homogène (accord sur l'intention), les plus fréquentes d'abord.
+    Les routes sans modèle (routeur simulé, journal antérieur) sont ignorées
+    """
+    groupes = defaultdict(list)
+    for route in routes:
+        if not route.get("modele"):
+            continue
+        groupes[signature(route["motif"])].append(route)
+
+    propositions = []
+    for mots, liste in groupes.items():
+        if len(liste) < support_min or not set(mots) - {EQUIPE, GROUPE}:
+            continue
+        intention, accord = Counter(r["intention"] for r in liste).most_common(1)[0]
+        if intention not in ENTITE_REQUISE or accord / len(liste) < accord_min:
+            continue
+
+        memes = [r for r in liste if r["intention"] == intention]
+        regle = {"mots": list(mots), "intention": intention}
+        # Entité citée (marque) ou constante apportée par LLaMA ("pharaons" → Égypte)
+        regle["equipe"] = EQUIPE if EQUIPE in mots else _valeur_commune([r["equipe"] for r in memes], accord_min)
+        regle["groupe"] = GROUPE if GROUPE in mots else _valeur_commune([r["groupe"] for r in memes], accord_min)
+        regle["phase"] = _valeur_commune([r["phase"] for r in memes], accord_min)
+
+        requise = ENTITE_REQUISE[intention]
+        if requise and not regle[requise]:
+            continue
+        regle.update(support=len(liste), accord=accord, exemple=liste[0]["motif"])
+        propositions.append(regle)
+
+    return sorted(propositions, key=lambda r: (-r["support"], r["mots"]))
+
+
+# ==========================================================
+# RÈGLES APPROUVÉES (CHARGÉES AU DÉMARRAGE)
+# ==========================================================
+
+class RegleApprise:
+    """Mots-clés exigés → intention et entités (marque : entité reconnue dans la question)"""
+
+    __slots__ = ('mots', 'intention', 'equipe', 'groupe', 'phase')
+
+    def __init__(self, mots, intention, equipe=None, groupe=None, phase=None, **_):
+        self.mots = frozenset(mots)
+        self.intention = intention
+        self.equipe = equipe
+        self.groupe = groupe
+        self.phase = phase
+
+    def __repr__(self):
+        return f"RegleApprise({sorted(self.mots)} → {self.intention})"
+
+    def appliquer(self, mots, equipe=None, groupe=None):
+        """(intention, equipe, groupe, phase) si la question contient les mots et les entités exigés"""
+        if not self.mots - {EQUIPE, GROUPE} <= mots:
+            return None
+        if self.equipe == EQUIPE and not equipe:
+            return None
+        if self.groupe == GROUPE and not groupe:
+            return None
+        return (
+            self.intention,
+            equipe if self.equipe == EQUIPE else self.equipe,
+            groupe if self.groupe == GROUPE else self.groupe,
+            self.phase,
+        )
+
+
+class ReglesApprises:
+    """Règles approuvées, les plus spécifiques (le plus de mots) d'abord"""
+
+    def __init__(self, regles):
+        self.regles = sorted(regles, key=lambda r: -len(r.mots))
+
+    def __len__(self):
+        return len(self.regles)
+
+    def trouver(self, texte, equipe=None, groupe=None, mots=None):
+        """Première règle qui s'applique à la question (mots : déjà normalisés), None sinon"""
+        if not self.regles:
+            return None
+        mots = set(normalize(texte).split()) if mots is None else mots
+        for regle in self.regles:
+            route = regle.appliquer(mots, equipe, groupe)
+            if route:
+                return route
+        return None
+
+
+def _lire_json(chemin):
+    try:
+        with open(chemin, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+@lru_cache(maxsize=1)
+def load_regles_apprises():
+    """Règles approuvées (aucune si le fichier n'existe pas)"""
+    regles = ReglesApprises([RegleApprise(**r) for r in _lire_json(REGLES_APPRISES)])
+    if regles:
+        logger.info(f"✓ Règles apprises chargées: {len(regles)}")
+    return regles
+
+
+def _lire_routes(chemin):
+    try:
+        with open(chemin, encoding="utf-8") as f:
+            return [json.loads(ligne) for ligne in f if ligne.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def _ecrire_json(chemin, valeur):
+    Path(chemin).write_text(json.dumps(valeur, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Règles apprises des routes LLaMA")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    fouille = commandes.add_parser("miner", help="propose des règles depuis le journal des routes")
+    fouille.add_argument("--journal", type=Path, default=JOURNAL_ROUTES or JOURNAL_DEFAUT)
+    fouille.add_argument("--support", type=int, default=SUPPORT_MIN)
+    fouille.add_argument("--accord", type=float, default=ACCORD_MIN)
+
+    approbation = commandes.add_parser("approuver", help="promeut des propositions en règles")
+    approbation.add_argument("numeros", type=int, nargs="*", help="numéros des propositions (toutes si absent)")
+
+    args = parser.parse_args()
+
+    if args.commande == "miner":
+        routes = _lire_routes(args.journal)
+        propositions = miner(routes, args.support, args.accord)
+        _ecrire_json(REGLES_PROPOSEES, propositions)
+        ignorees = sum(not r.get("modele") for r in routes)
+        print(f"{len(routes) - ignorees} routes LLaMA → {len(propositions)} règles proposées "
+              f"({REGLES_PROPOSEES.name})" + (f", {ignorees} sans modèle ignorées" if ignorees else ""))
+        for numero, r in enumerate(propositions):
+            entites = ", ".join(f"{k}={r[k]}" for k in ("equipe", "groupe", "phase") if r[k])
+            print(f"  [{numero}] {' + '.join(r['mots'])} → {r['intention']}"
+                  f"{' (' + entites + ')' if entites else ''} — support {r['support']}, "
+                  f"accord {r['accord']}/{r['support']} — ex. « {r['exemple']} »")
+    else:
+        propositions = _lire_json(REGLES_PROPOSEES)
+        retenues = [propositions[n] for n in args.numeros] if args.numeros else propositions
+        approuvees = {(tuple(r["mots"]), r["intention"]): r for r in _lire_json(REGLES_APPRISES)}
+        for r in retenues:
+            approuvees[(tuple(r["mots"]), r["intention"])] = r
+        _ecrire_json(REGLES_APPRISES, list(approuvees.values()))
+        print(f"✓ {len(retenues)} règle(s) approuvée(s), {len(approuvees)} au total ({REGLES_APPRISES.name})")
@@ -1,14 +1,31 @@
 import subprocess
 import json
+import os
 import re
 import logging
+import socket
+import urllib.error
+import urllib.request
 from typing import Dict, Optional
 
+from admission import AdmissionControl
+
 logger = logging.getLogger(__name__)
 
 MODEL_NAME = "llama3"
 TIMEOUT = 20
 
+# Serveur ollama HTTP (ex. http://127.0.0.1:11434) : si défini, remplace le processus `ollama run`
+OLLAMA_URL = os.environ.get("OLLAMA_URL")
+
+# Admission : au plus MAX_CONCURRENCE processus ollama simultanés,
+# FILE_MAX questions en attente, ATTENTE_MAX secondes d'attente au plus
+MAX_CONCURRENCE = 2
+FILE_MAX = 16
+ATTENTE_MAX = 2.0
+
+admission = AdmissionControl(MAX_CONCURRENCE, ATTENTE_MAX, FILE_MAX)
+
 SYSTEM_PROMPT = """
 Tu es un classificateur d’intention pour un chatbot sur la CAN 2025.
 
@@ -74,21 +91,22 @@ def llama_intent_router(question: str) -> Dict[str, Optional[str]]:
     if not question or not question.strip():
         return _fallback()
 
+    # Questions courtes prioritaires ; rejet immédiat si le budget d'attente est dépassé
+    with admission.creneau(priorite=len(question)) as admis:
+        if not admis:
+            logger.warning("LLaMA saturé: question délestée")
+            return _fallback(intent="sature")
+        return _interroger(question)
+
+
+def _interroger(question: str) -> Dict[str, Optional[str]]:
+    """Appel du modèle (processus ollama ou serveur HTTP) et validation de sa réponse"""
     try:
-        proc = subprocess.run(
-            ["ollama", "run", MODEL_NAME],
-            input=SYSTEM_PROMPT + question.strip(),
-            text=True,
-            capture_output=True,
-            timeout=TIMEOUT
-        )
-
-        if proc.returncode != 0:
-            logger.error(f"Ollama error: {proc.stderr}")
+        prompt = SYSTEM_PROMPT + question.strip()
+        raw_output = _generer_http(prompt) if OLLAMA_URL else _generer_processus(prompt)
+        if raw_output is None:
             return _fallback()
 
-        raw_output = proc.stdout.strip()
-
         data = _safe_json_extract(raw_output)
 
         intent = data.get("intent", "inconnu")
@@ -112,10 +130,12 @@ def llama_intent_router(question: str) -> Dict[str, Optional[str]]:
             "intent": intent,
             "team": team,
             "groupe": groupe,
-            "phase": phase
+            "phase": phase,
+            # Analyse d'un vrai modèle : seule à pouvoir nourrir les règles apprises
+            "modele": MODEL_NAME
         }
 
-    except subprocess.TimeoutExpired:
+    except (subprocess.TimeoutExpired, socket.timeout):
         logger.error("LLaMA timeout")
         return _fallback()
 
@@ -124,12 +144,44 @@ def llama_intent_router(question: str) -> Dict[str, Optional[str]]:
         return _fallback()
 
 
-def _fallback() -> Dict[str, Optional[str]]:
+def _generer_processus(prompt: str) -> Optional[str]:
+    """Sortie brute de `ollama run` (None en cas d'erreur)"""
+    proc = subprocess.run(
+        ["ollama", "run", MODEL_NAME],
+        input=prompt,
+        text=True,
+        capture_output=True,
+        timeout=TIMEOUT
+    )
+
+    if proc.returncode != 0:
+        logger.error(f"Ollama error: {proc.stderr}")
+        return None
+
+    return proc.stdout.strip()
+
+
+def _generer_http(prompt: str) -> Optional[str]:
+    """Sortie brute de l'API ollama POST /api/generate (None en cas d'erreur)"""
+    requete = urllib.request.Request(
+        f"{OLLAMA_URL.rstrip('/')}/api/generate",
+        data=json.dumps({"model": MODEL_NAME, "prompt": prompt, "stream": False}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(requete, timeout=TIMEOUT) as reponse:
+            return json.loads(reponse.read())["response"].strip()
+    except urllib.error.HTTPError as e:
+        logger.error(f"Ollama error: HTTP {e.code}")
+        return None
+
+
+def _fallback(intent: str = "inconnu") -> Dict[str, Optional[str]]:
     """
-    Réponse de secours garantie
+    Réponse de secours garantie ("sature" si la question a été délestée)
     """
     return {
-        "intent": "inconnu",
+        "intent": intent,
         "team": None,
         "groupe": None,
         "phase": None
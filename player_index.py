@@ -0,0 +1,189 @@
+"""
+Index inversé des joueurs de la CAN 2025
+Construit une seule fois depuis l'instantané : tokens de noms, clubs et postes
+→ identifiants de joueurs, avec recherche par préfixe (autocomplétion)
+"""
+
+import logging
+from bisect import bisect_left
+from functools import lru_cache
+
+from core import normalize
+from snapshot import load_joueurs, team_id
+
+logger = logging.getLogger(__name__)
+
+# Surnoms courants de clubs → nom normalisé du club dans les données
+CLUB_ALIASES = {
+    "psg": "paris saint germain",
+    "om": "marseille",
+    "ol": "lyon",
+    "barca": "barcelona",
+    "real": "real madrid",
+    "man city": "manchester city",
+    "man united": "manchester united",
+    "man utd": "manchester united",
+    "inter": "inter milan",
+    "bayern": "bayern munich",
+    "leverkusen": "bayer leverkusen",
+}
+
+POSTES_ALIASES = {
+    "gardien": "GK", "portier": "GK",
+    "defenseur": "DF", "arriere": "DF",
+    "milieu": "MF",
+    "attaquant": "FW",
+}
+
+
+def tokenize(text):
+    return normalize(text).split()
+
+
+def trouver_poste(texte, tokens=None):
+    """Code de poste (GK, DF, MF, FW) cité dans le texte (sans charger l'index) ; tokens : déjà calculés"""
+    for mot in tokenize(texte) if tokens is None else tokens:
+        for alias, poste in POSTES_ALIASES.items():
+            if mot.startswith(alias):
+                return poste
+    return None
+
+
+class PlayerIndex:
+    """Index inversé : token → ensemble d'identifiants de joueurs"""
+
+    def __init__(self, joueurs):
+        # Enregistrements compacts : (joueur, equipe, poste, club, buts)
+        self.joueurs = []
+        self.noms = {}
+        self.clubs = {}
+        self.tokens_clubs = {}
+        self.postes = {}
+        self.equipes = {}
+        self.noms_clubs = {}
+
+        for r in joueurs:
+            club = r.club or ""
+            poste = r.poste or ""
+            jid = len(self.joueurs)
+            self.joueurs.append((r.joueur, r.equipe, poste, club, r.buts or 0))
+
+            for token in tokenize(r.joueur):
+                self.noms.setdefault(token, set()).add(jid)
+            if club:
+                cle = normalize(club)
+                self.clubs.setdefault(cle, set()).add(jid)
+                self.noms_clubs.setdefault(cle, club)
+                for token in cle.split():
+                    self.tokens_clubs.setdefault(token, set()).add(cle)
+            self.postes.setdefault(poste, set()).add(jid)
+            self.equipes.setdefault(r.equipe_id, set()).add(jid)
+
+        # Vocabulaire trié pour les recherches par préfixe
+        self.vocabulaire = sorted(set(self.noms) | set(self.tokens_clubs))
+
+    def __len__(self):
+        return len(self.joueurs)
+
+    def _prefixe(self, prefixe):
+        """Tokens du vocabulaire commençant par le préfixe (bisection)"""
+        debut = bisect_left(self.vocabulaire, prefixe)
+        fin = bisect_left(self.vocabulaire, prefixe + "\uffff")
+        return self.vocabulaire[debut:fin]
+
+    def _correspondances(self, tokens, index):
+        """Entrées de l'index dont les tokens commencent par chacun des préfixes"""
+        ids = None
+        for token in tokens:
+            trouves = set()
+            for t in self._prefixe(token):
+                trouves |= index.get(t, set())
+            ids = trouves if ids is None else ids & trouves
+            if not ids:
+                return set()
+        return ids or set()
+
+    def _trier(self, ids):
+        """Identifiants triés par buts décroissants puis nom"""
+        return sorted(ids, key=lambda i: (-self.joueurs[i][4], self.joueurs[i][0]))
+
+    def trouver_joueur(self, texte, tokens=None):
+        """
+        Joueur cité dans une phrase libre ('où joue Hakimi')
+        Retient le joueur qui couvre le plus de tokens du texte (tokens : déjà calculés)
+        """
+        scores = {}
+        for token in tokenize(texte) if tokens is None else tokens:
+            if len(token) < 3:
+                continue
+            for jid in self.noms.get(token, ()):
+                scores[jid] = scores.get(jid, 0) + 1
+        if not scores:
+            return None
+        meilleur = max(scores.values())
+        candidats = [j for j, s in scores.items() if s == meilleur]
+        return self.joueurs[self._trier(candidats)[0]]
+
+    def trouver_club(self, texte, norm=None):
+        """Club cité dans une phrase libre (alias 'psg' compris), nom normalisé ou None"""
+        texte = normalize(texte) if norm is None else norm
+        mots = set(texte.split())
+        for alias, club in CLUB_ALIASES.items():
+            if alias in mots or (" " in alias and alias in texte):
+                if club in self.clubs:
+                    return club
+
+        candidats = set()
+        for mot in mots:
+            candidats |= self.tokens_clubs.get(mot, set())
+        # Club dont tous les mots sont présents, le plus spécifique d'abord
+        complets = [c for c in candidats if set(c.split()) <= mots]
+        if not complets:
+            return None
+        return max(complets, key=lambda c: (len(c.split()), -len(self.clubs[c])))
+
+    def par_club(self, club):
+        """Joueurs d'un club (nom normalisé)"""
+        return [self.joueurs[i] for i in self._trier(self.clubs.get(club, set()))]
+
+    def par_poste(self, poste, equipe=None):
+        """Joueurs d'un poste, éventuellement restreints à une équipe"""
+        ids = self.postes.get(poste, set())
+        if equipe:
+            ids = ids & self.equipes.get(team_id(equipe), set())
+        return [self.joueurs[i] for i in self._trier(ids)]
+
+    def rechercher(self, texte, limite=10):
+        """
+        Autocomplétion sur les noms de joueurs et de clubs
+        Chaque token saisi doit être le préfixe d'un token du nom
+        """
+        tokens = tokenize(texte)
+        if not tokens:
+            return []
+
+        resultats = []
+        for jid in self._trier(self._correspondances(tokens, self.noms))[:limite]:
+            joueur, equipe, poste, club, buts = self.joueurs[jid]
+            resultats.append({
+                "type": "joueur", "label": joueur, "equipe": equipe,
+                "poste": poste, "club": club, "buts": buts
+            })
+
+        clubs = self._correspondances(tokens, self.tokens_clubs)
+        for cle in sorted(clubs, key=lambda c: (-len(self.clubs[c]), c)):
+            if len(resultats) >= limite:
+                break
+            resultats.append({
+                "type": "club", "label": self.noms_clubs[cle], "joueurs": len(self.clubs[cle])
+            })
+
+        return resultats
+
+
+@lru_cache(maxsize=1)
+def load_player_index():
+    """Construit l'index inversé des joueurs (une seule fois)"""
+    index = PlayerIndex(load_joueurs())
+    logger.info(f"✓ Index joueurs construit: {len(index)} joueurs, {len(index.vocabulaire)} tokens")
+    return index
@@ -0,0 +1,184 @@
+"""
+Profilage à la demande des requêtes du chatbot
+Désactivé par défaut (un seul test de booléen par requête). Activé à chaud
+(endpoint d'administration) ou au démarrage (CAN_PROFIL), il profile :
+- les N prochaines requêtes (mode "prochaines")
+- ou jusqu'à N requêtes plus lentes que seuil_ms (mode "lentes")
+Moteurs : cProfile (déterministe, fichiers .pstats) ou échantillonnage de la
+pile du thread de la requête (faible surcoût, piles repliées .collapsed pour
+flamegraph.pl / speedscope)
+"""
+
+import cProfile
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from core import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+PROFILS_DIR = DATA_DIR / "profils"
+MODES = ("prochaines", "lentes")
+MOTEURS = ("cprofile", "echantillonnage")
+INTERVALLE = 0.001     # secondes entre deux échantillons de pile
+
+
+class Echantillonneur(threading.Thread):
+    """Relève périodiquement la pile d'un thread : {pile repliée: nombre d'échantillons}"""
+
+    def __init__(self, cible, intervalle=INTERVALLE):
+        super().__init__(name="profil-echantillons", daemon=True)
+        self.cible = cible
+        self.intervalle = intervalle
+        self.piles = Counter()
+        self._arret = threading.Event()
+
+    def run(self):
+        while not self._arret.wait(self.intervalle):
+            frame = sys._current_frames().get(self.cible)
+            pile = []
+            while frame is not None:
+                code = frame.f_code
+                pile.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if pile:
+                self.piles[";".join(reversed(pile))] += 1
+
+    def arreter(self):
+        self._arret.set()
+        self.join()
+        return self.piles
+
+
+class Profileur:
+    """État du profilage (partagé par les threads de l'API)"""
+
+    def __init__(self, dossier=PROFILS_DIR):
+        self.dossier = Path(dossier)
+        self.actif = False
+        self.mode = None
+        self.moteur = None
+        self.restant = 0
+        self.seuil_ms = 0.0
+        self.fichiers = []
+        self._numeros = itertools.count(1)
+        self._verrou = threading.Lock()
+        # cProfile : une seule requête profilée à la fois (un seul profileur actif par processus)
+        self._cprofile_libre = threading.Lock()
+
+    def demarrer(self, mode="prochaines", n=10, seuil_ms=0.0, moteur="cprofile"):
+        if mode not in MODES or moteur not in MOTEURS or n < 1:
+            raise ValueError(f"mode parmi {MODES}, moteur parmi {MOTEURS}, n ≥ 1")
+        with self._verrou:
+            self.mode, self.moteur, self.restant, self.seuil_ms = mode, moteur, n, seuil_ms
+            self.actif = True
+        logger.info(f"✓ Profilage activé: {mode}, {n} requête(s), moteur {moteur}")
+
+    def arreter(self):
+        with self._verrou:
+            self.actif = False
+            self.restant = 0
+
+    def etat(self):
+        return {
+            "actif": self.actif,
+            "mode": self.mode,
+            "moteur": self.moteur,
+            "restant": self.restant,
+            "seuil_ms": self.seuil_ms,
+            "fichiers": [str(f) for f in self.fichiers[-20:]],
+        }
+
+    def _reserver(self):
+        """En mode "prochaines", décompte la requête avant de la profiler"""
+        with self._verrou:
+            if not self.actif:
+                return False
+            if self.mode == "prochaines":
+                self.restant -= 1
+                self.actif = self.restant > 0
+            return True
+
+    def _garder(self, duree_ms):
+        """En mode "lentes", garde le profil si la requête a dépassé le seuil"""
+        with self._verrou:
+            if self.mode != "lentes":
+                return True
+            if duree_ms < self.seuil_ms or self.restant <= 0:
+                return False
+            self.restant -= 1
+            self.actif = self.restant > 0
+            return True
+
+    def executer(self, libelle, fonction, *args):
+        """Appelle fonction(*args) en la profilant si le profilage est actif"""
+        if not self._reserver():
+            return fonction(*args)
+
+        if self.moteur == "cprofile":
+            if not self._cprofile_libre.acquire(blocking=False):
+                return fonction(*args)
+            profil = cProfile.Profile()
+            debut = time.perf_counter()
+            try:
+                return profil.runcall(fonction, *args)
+            finally:
+                duree_ms = (time.perf_counter() - debut) * 1e3
+                self._cprofile_libre.release()
+                if self._garder(duree_ms):
+                    self._ecrire(libelle, duree_ms, "pstats", profil.dump_stats)
+
+        echantillonneur = Echantillonneur(threading.get_ident())
+        echantillonneur.start()
+        debut = time.perf_counter()
+        try:
+            return fonction(*args)
+        finally:
+            duree_ms = (time.perf_counter() - debut) * 1e3
+            piles = echantillonneur.arreter()
+            if piles and self._garder(duree_ms):
+                self._ecrire(libelle, duree_ms, "collapsed", lambda chemin: Path(chemin).write_text(
+                    "".join(f"{pile} {n}\n" for pile, n in piles.most_common()), encoding="utf-8"
+                ))
+
+    def _ecrire(self, libelle, duree_ms, extension, ecrire):
+        try:
+            self.dossier.mkdir(parents=True, exist_ok=True)
+            chemin = self.dossier / (
+                f"{time.strftime('%Y%m%d-%H%M%S')}-{next(self._numeros):04d}-"
+                f"{libelle}-{duree_ms:.0f}ms.{extension}"
+            )
+            ecrire(chemin)
+        except OSError as e:
+            logger.warning(f"Profil non enregistré: {e}")
+            return
+        with self._verrou:
+            self.fichiers.append(chemin)
+        logger.info(f"✓ Profil enregistré: {chemin.name}")
+
+
+def depuis_env(profileur, valeur=None):
+    """
+    Active le profilage depuis CAN_PROFIL : "prochaines:20", "lentes:10:250"
+    (mode:n[:seuil_ms]) et CAN_PROFIL_MOTEUR (cprofile par défaut)
+    """
+    valeur = valeur if valeur is not None else os.environ.get("CAN_PROFIL")
+    if not valeur:
+        return
+    mode, _, reste = valeur.partition(":")
+    n, _, seuil = reste.partition(":")
+    try:
+        profileur.demarrer(mode, int(n or 10), float(seuil or 0),
+                           os.environ.get("CAN_PROFIL_MOTEUR", "cprofile"))
+    except ValueError as e:
+        logger.error(f"CAN_PROFIL invalide ({valeur}): {e}")
+
+
+profileur = Profileur()
+depuis_env(profileur)
@@ -0,0 +1,173 @@
+"""
+Diffusion des changements de scores aux clients abonnés (WebSocket)
+Un client s'abonne à des sujets (équipe, groupe, match) ; à chaque changement
+publié par data_manager (saisie POST /admin/score de l'API), seuls le résultat
+modifié et les lignes de classement qui ont bougé sont poussés, et seulement aux
+clients concernés. Classements lus dans le stockage des réponses HTTP (backend)
+"""
+
+import asyncio
+import logging
+import threading
+
+from backend import get_classement_groupe, liste_groupes, team_id, team_name
+from core import subscribe
+from snapshot import LigneClassement
+
+logger = logging.getLogger(__name__)
+
+# Messages en attente par client : au-delà, les suivants sont perdus pour ce client lent
+FILE_CLIENT = 64
+
+
+def sujet_equipe(tid):
+    return f"equipe:{tid}"
+
+
+def sujet_groupe(groupe):
+    return f"groupe:{groupe}"
+
+
+def sujet_match(id1, id2):
+    """Sujet d'une affiche, indépendant de l'ordre des équipes"""
+    return f"match:{min(id1, id2)}-{max(id1, id2)}"
+
+
+def sujets(demande):
+    """
+    Sujets d'une demande d'abonnement
+    {"equipe": "Maroc"} / {"groupe": "A"} / {"match": ["Maroc", "Comores"]}
+    Retourne (sujets, erreurs)
+    """
+    resultat, erreurs = [], []
+
+    equipe = demande.get("equipe")
+    if equipe:
+        tid = team_id(equipe)
+        if tid is None:
+            erreurs.append(f"équipe inconnue: {equipe}")
+        else:
+            resultat.append(sujet_equipe(tid))
+
+    groupe = demande.get("groupe")
+    if groupe:
+        groupe = str(groupe).strip().upper()
+        if not get_classement_groupe(groupe):
+            erreurs.append(f"groupe inconnu: {groupe}")
+        else:
+            resultat.append(sujet_groupe(groupe))
+
+    match = demande.get("match")
+    if match:
+        ids = [team_id(e) for e in match] if isinstance(match, (list, tuple)) else []
+        if len(ids) != 2 or None in ids:
+            erreurs.append(f"match inconnu: {match}")
+        else:
+            resultat.append(sujet_match(*ids))
+
+    return resultat, erreurs
+
+
+def _ligne(ligne):
+    return {champ: getattr(ligne, champ) for champ in LigneClassement.__slots__}
+
+
+class Diffuseur:
+    """Clients connectés (file asyncio + sujets) et routage des changements publiés"""
+
+    def __init__(self):
+        self._clients = {}
+        self._classements = {}
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def connecter(self):
+        """Nouvelle file de messages, alimentée depuis n'importe quel thread"""
+        file = asyncio.Queue(maxsize=FILE_CLIENT)
+        with self._verrou:
+            self._clients[file] = (asyncio.get_running_loop(), set())
+        return file
+
+    def deconnecter(self, file):
+        with self._verrou:
+            self._clients.pop(file, None)
+            if not self._clients:
+                # Plus personne à qui comparer : la référence sera reprise au prochain abonnement
+                self._classements.clear()
+
+    def abonner(self, file, nouveaux):
+        with self._verrou:
+            client = self._clients.get(file)
+            if client is None:
+                return []
+            if not self._classements:
+                for groupe in liste_groupes():
+                    self._classements[groupe] = {l.equipe_id: _ligne(l) for l in get_classement_groupe(groupe)}
+            client[1].update(nouveaux)
+            return sorted(client[1])
+
+    def _classement_change(self, groupe):
+        """Lignes du classement du groupe qui ont changé depuis la dernière diffusion"""
+        lignes = [_ligne(l) for l in get_classement_groupe(groupe)]
+        precedentes = self._classements.get(groupe)
+        self._classements[groupe] = {l["equipe_id"]: l for l in lignes}
+        if precedentes is None:
+            return lignes
+        return [l for l in lignes if precedentes.get(l["equipe_id"]) != l]
+
+    def messages(self, change):
+        """Messages (sujets destinataires, contenu) d'un changement publié"""
+        id1, id2 = change["equipe1_id"], change["equipe2_id"]
+        resultat = {
+            "type": "resultat",
+            "equipe1": team_name(id1) or change["equipe1"],
+            "equipe2": team_name(id2) or change["equipe2"],
+            "score": change["score"],
+        }
+        destinataires = {sujet_equipe(id1), sujet_equipe(id2), sujet_match(id1, id2)}
+        if "groupe" in change:
+            resultat["groupe"] = change["groupe"]
+            destinataires.add(sujet_groupe(change["groupe"]))
+        else:
+            resultat["phase"] = change.get("phase")
+        yield destinataires, resultat
+
+        if "groupe" not in change:
+            return
+        lignes = self._classement_change(change["groupe"])
+        if lignes:
+            destinataires = {sujet_groupe(change["groupe"])}
+            destinataires.update(sujet_equipe(l["equipe_id"]) for l in lignes)
+            yield destinataires, {"type": "classement", "groupe": change["groupe"], "lignes": lignes}
+
+    def diffuser(self, change):
+        """Abonné de core.publier : pousse le changement aux clients concernés"""
+        with self._verrou:
+            if not self._classements:
+                return 0
+            clients = list(self._clients.items())
+            envois = list(self.messages(change))
+
+        nombre = 0
+        for file, (boucle, abonnements) in clients:
+            for destinataires, message in envois:
+                if abonnements & destinataires:
+                    boucle.call_soon_threadsafe(self._deposer, file, message)
+                    nombre += 1
+        return nombre
+
+    @staticmethod
+    def _deposer(file, message):
+        try:
+            file.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Client trop lent : message de score perdu")
+
+
+diffuseur = Diffuseur()
+
+# Abonné après le stockage (snapshot._maj_snapshot ou sqlite_backend._maj_base, importés
+# par backend) : les classements diffusés sont déjà à jour
+subscribe(diffuseur.diffuser)
@@ -0,0 +1,176 @@
+"""
+Scénarios de qualification de la phase de poules
+Les deux premiers de chaque groupe et les meilleurs troisièmes se qualifient.
+Pour chaque groupe, toutes les issues des matchs restants sont énumérées, score
+par score (bornés à buts_max buts par équipe, pour les départages à la
+différence de buts), et pondérées par un modèle de Poisson calé sur la moyenne
+de buts du tournoi. Les groupes étant indépendants, les chances d'un troisième
+se combinent sans énumérer le produit des six groupes : pour chaque issue, la
+probabilité que chacun des autres groupes ait un meilleur troisième, puis la
+loi du nombre de troisièmes devant lui.
+Résultat calculé une fois par version des données (core.data_version)
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from itertools import accumulate, product
+from math import exp, factorial
+
+from core import classer, data_version, parse_score
+from snapshot import load_tournoi
+
+logger = logging.getLogger(__name__)
+
+QUALIFIES_PAR_GROUPE = 2
+MEILLEURS_TROISIEMES = 4
+
+# Scénarios énumérés au plus par groupe : buts_max = 3 (16 scores par match) tant que
+# possible, moins quand il reste beaucoup de matchs (début de la phase de poules)
+SCENARIOS_MAX = 10_000
+BUTS_MAX = 3
+BUTS_PAR_EQUIPE = 1.2       # moyenne par défaut, avant le premier match joué
+
+# Probabilités arrondies sous ce seuil : qualification assurée (1) ou impossible (0)
+EPSILON = 1e-9
+
+
+# ==========================================================
+# ÉNUMÉRATION DES MATCHS RESTANTS
+# ==========================================================
+
+def buts_max(restants, scenarios_max=SCENARIOS_MAX):
+    """Plus grand nombre de buts par équipe tel que les scores énumérés restent sous scenarios_max"""
+    for k in range(BUTS_MAX, 0, -1):
+        if (k + 1) ** (2 * restants) <= scenarios_max:
+            return k
+    return 0
+
+
+def lois_scores(k, moyenne):
+    """[(buts1, buts2, probabilité)] : Poisson indépendants, k buts ou plus regroupés sur k"""
+    buts = [exp(-moyenne) * moyenne ** b / factorial(b) for b in range(k)]
+    buts.append(1 - sum(buts))
+    return [(b1, b2, p1 * p2) for b1, p1 in enumerate(buts) for b2, p2 in enumerate(buts)]
+
+
+def scenarios_groupe(equipes, joues, restants, moyenne):
+    """
+    Issues d'un groupe regroupées : {(ordre, bilan du troisième): probabilité}
+    joues : [(équipe1, équipe2, buts1, buts2)], restants : [(équipe1, équipe2)]
+    """
+    k = buts_max(len(restants))
+    scores = lois_scores(k, moyenne)
+    issues = Counter()
+    for combinaison in product(scores, repeat=len(restants)):
+        proba = 1.0
+        matchs = list(joues)
+        for (e1, e2), (b1, b2, p) in zip(restants, combinaison):
+            matchs.append((e1, e2, b1, b2))
+            proba *= p
+        ordre, bilan = classer(equipes, matchs)
+        issues[(tuple(ordre), tuple(bilan[ordre[2]]) if len(ordre) > 2 else None)] += proba
+    return issues, k
+
+
+def _cle_troisieme(equipe, bilan):
+    """Clé de tri des troisièmes : points, différence, buts, puis ordre alphabétique"""
+    return (-bilan[0], -bilan[1], -bilan[2], equipe)
+
+
+def _au_plus(probas, n):
+    """Probabilité qu'au plus n des événements indépendants (probas) se produisent"""
+    loi = [1.0]
+    for p in probas:
+        suivante = [0.0] * (len(loi) + 1)
+        for i, q in enumerate(loi):
+            suivante[i] += q * (1 - p)
+            suivante[i + 1] += q * p
+        loi = suivante
+    return sum(loi[:n + 1])
+
+
+def simuler(poules, groupes, troisiemes=MEILLEURS_TROISIEMES):
+    """
+    Chances de chaque équipe : {'equipes': {équipe: {'groupe', 'rangs', 'troisieme_qualifie',
+    'qualification', 'statut'}}, 'matchs_restants', 'scenarios', 'buts_max': {groupe: k}}
+    poules : Match de poule (score None ou non joué), groupes : {groupe: [équipes]}
+    """
+    joues, restants = {g: [] for g in groupes}, {g: [] for g in groupes}
+    buts, nombre = 0, 0
+    for m in poules:
+        if m.groupe not in groupes:
+            continue
+        score = parse_score(m.score)
+        if score is None:
+            restants[m.groupe].append((m.equipe1, m.equipe2))
+        else:
+            joues[m.groupe].append((m.equipe1, m.equipe2, *score))
+            buts += sum(score)
+            nombre += 1
+    moyenne = buts / (2 * nombre) if nombre else BUTS_PAR_EQUIPE
+
+    rangs, troisiemes_groupe, bornes, total = {}, {}, {}, 0
+    for groupe, equipes in groupes.items():
+        issues, bornes[groupe] = scenarios_groupe(equipes, joues[groupe], restants[groupe], moyenne)
+        total += (bornes[groupe] + 1) ** (2 * len(restants[groupe]))
+        tiers = Counter()
+        for (ordre, bilan), proba in issues.items():
+            for rang, equipe in enumerate(ordre):
+                rangs.setdefault(equipe, [0.0] * len(equipes))[rang] += proba
+            if bilan is not None:
+                tiers[(ordre[2], bilan)] += proba
+        cles = sorted((_cle_troisieme(e, b), p) for (e, b), p in tiers.items())
+        troisiemes_groupe[groupe] = ([c for c, _ in cles], list(accumulate(p for _, p in cles)))
+
+    # Troisième qualifié : au plus (troisiemes - 1) troisièmes d'autres groupes devant lui
+    repeches = Counter()
+    for groupe, (cles, cumul) in troisiemes_groupe.items():
+        for i, cle in enumerate(cles):
+            proba = cumul[i] - (cumul[i - 1] if i else 0.0)
+            devant = []
+            for autre, (cles_autre, cumul_autre) in troisiemes_groupe.items():
+                if autre != groupe:
+                    j = bisect_left(cles_autre, cle)
+                    devant.append(cumul_autre[j - 1] if j else 0.0)
+            repeches[cle[3]] += proba * _au_plus(devant, troisiemes - 1)
+
+    resultat = {}
+    for groupe, equipes in groupes.items():
+        for equipe in equipes:
+            r = rangs.get(equipe, [0.0] * len(equipes))
+            qualification = sum(r[:QUALIFIES_PAR_GROUPE]) + repeches[equipe]
+            qualification = 1.0 if qualification > 1 - EPSILON else 0.0 if qualification < EPSILON else qualification
+            resultat[equipe] = {
+                'groupe': groupe,
+                'rangs': [round(p, 4) for p in r],
+                'troisieme_qualifie': round(repeches[equipe], 4),
+                'qualification': round(qualification, 4),
+                'statut': "qualifiee" if qualification == 1 else "eliminee" if qualification == 0 else "en course",
+                'restants': [f"{e1} vs {e2}" for e1, e2 in restants[groupe] if equipe in (e1, e2)],
+            }
+    return {
+        'equipes': resultat,
+        'matchs_restants': sum(len(r) for r in restants.values()),
+        'scenarios': total,
+        'buts_max': bornes,
+    }
+
+
+@lru_cache(maxsize=2)
+def _simulation(version):
+    debut = time.perf_counter()
+    tournoi = load_tournoi()
+    simulation = simuler(tournoi.poules, tournoi.groupes)
+    logger.info(
+        f"✓ Scénarios de qualification: {simulation['scenarios']} issues, "
+        f"{simulation['matchs_restants']} matchs restants, {(time.perf_counter() - debut) * 1000:.0f} ms"
+    )
+    return simulation
+
+
+def load_qualification():
+    """Simulation des données servies, recalculée quand leur version change"""
+    return _simulation(data_version())
@@ -0,0 +1,62 @@
+"""
+Cache des réponses du chatbot
+Clé : question normalisée + version des données ; éviction LRU au-delà de la capacité
+Seules les réponses déterministes y entrent (ni salutations aléatoires, ni calendrier
+relatif à l'heure courante, ni relances complétées par le contexte d'une session)
+"""
+
+import threading
+from collections import OrderedDict
+
+CAPACITE = 1024
+
+
+class ResponseCache:
+    """Cache LRU borné avec compteurs de succès / échecs"""
+
+    def __init__(self, capacite=CAPACITE):
+        self.capacite = capacite
+        self.hits = 0
+        self.misses = 0
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def get(self, cle):
+        """Réponse en cache (remontée en tête de LRU), None sinon"""
+        with self._verrou:
+            reponse = self._entrees.get(cle)
+            if reponse is None:
+                self.misses += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return reponse
+
+    def put(self, cle, reponse):
+        with self._verrou:
+            self._entrees[cle] = reponse
+            self._entrees.move_to_end(cle)
+            if len(self._entrees) > self.capacite:
+                self._entrees.popitem(last=False)
+
+    def clear(self):
+        with self._verrou:
+            self._entrees.clear()
+            self.hits = self.misses = 0
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "taille": len(self._entrees),
+            "capacite": self.capacite,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
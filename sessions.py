@@ -0,0 +1,71 @@
+"""
+Contexte de conversation par session
+Dernière équipe, dernier groupe et dernière phase cités, pour résoudre
+localement les relances ("et ses joueurs ?", "et son classement ?")
+Stockage borné : expiration après SESSION_TTL d'inactivité, éviction LRU au-delà de MAX_SESSIONS
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_TTL = 30 * 60      # secondes d'inactivité avant oubli du contexte
+MAX_SESSIONS = 10_000
+
+
+class Contexte:
+    """Entités retenues d'une session (None tant qu'aucune n'a été citée)"""
+
+    __slots__ = ('equipe', 'groupe', 'phase', 'vu')
+
+    def __init__(self):
+        self.equipe = None
+        self.groupe = None
+        self.phase = None
+        self.vu = 0.0
+
+    def __repr__(self):
+        return f"Contexte(equipe={self.equipe!r}, groupe={self.groupe!r}, phase={self.phase!r})"
+
+    def retenir(self, equipe=None, groupe=None, phase=None):
+        """Mémorise les entités citées dans la dernière question"""
+        if equipe:
+            self.equipe = equipe
+        if groupe:
+            self.groupe = groupe
+        if phase:
+            self.phase = phase
+
+
+class SessionStore:
+    """Contextes par identifiant de session, du moins au plus récemment utilisé"""
+
+    def __init__(self, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS, horloge=time.monotonic):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.horloge = horloge
+        self._sessions = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _purger(self, maintenant):
+        """Retire les sessions expirées (en tête : les moins récemment utilisées)"""
+        while self._sessions:
+            contexte = next(iter(self._sessions.values()))
+            if maintenant - contexte.vu < self.ttl:
+                break
+            self._sessions.popitem(last=False)
+
+    def get(self, session_id):
+        """Contexte de la session (créé s'il n'existe pas ou a expiré)"""
+        maintenant = self.horloge()
+        with self._verrou:
+            self._purger(maintenant)
+            contexte = self._sessions.pop(session_id, None) or Contexte()
+            contexte.vu = maintenant
+            self._sessions[session_id] = contexte
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return contexte
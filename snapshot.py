@@ -0,0 +1,498 @@
+"""
+Runtime de service sans pandas
+Instantané précompilé (pickle) des données déjà indexées, découpé en parties
+chargées séparément au premier accès : registre des équipes, tournoi (matchs,
+classements, calendrier), stades, statistiques, joueurs.
+Enregistrements compacts à __slots__ ; pandas n'est importé (via data_manager)
+que pour reconstruire une partie absente ou périmée : outils de rafraîchissement
+(update_all.py, python snapshot.py)
+"""
+
+import logging
+import os
+import pickle
+import threading
+import time
+from functools import lru_cache
+
+from core import DATA_DIR, FICHIERS, PHASE_POULES, UNKNOWN_TEAM_ID, normalize, subscribe, invalider
+from core import appliquer_score, classer_stats, suivants, precedents, entre
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = DATA_DIR / "snapshot"
+SNAPSHOT_VERSION = 1
+
+
+# ==========================================================
+# ENREGISTREMENTS COMPACTS
+# ==========================================================
+
+class Record:
+    """Enregistrement à attributs fixes (__slots__), sans dictionnaire par instance"""
+
+    __slots__ = ()
+
+    def __init__(self, **valeurs):
+        for champ in self.__slots__:
+            setattr(self, champ, valeurs.get(champ))
+
+    @classmethod
+    def depuis_ligne(cls, valeurs):
+        """Enregistrement depuis les valeurs de ses champs, dans l'ordre de __slots__"""
+        record = cls.__new__(cls)
+        for champ, valeur in zip(cls.__slots__, valeurs):
+            setattr(record, champ, valeur)
+        return record
+
+    def __repr__(self):
+        champs = ", ".join(f"{c}={getattr(self, c)!r}" for c in self.__slots__)
+        return f"{type(self).__name__}({champs})"
+
+
+class Match(Record):
+    """Match de poule ou de phase finale (instant None si non daté)"""
+    __slots__ = ('phase', 'groupe', 'date', 'heure', 'instant', 'equipe1', 'equipe2',
+                 'equipe1_id', 'equipe2_id', 'score', 'stade')
+
+
+class Joueur(Record):
+    __slots__ = ('joueur', 'equipe', 'equipe_id', 'poste', 'club', 'buts')
+
+
+class LigneClassement(Record):
+    __slots__ = ('groupe', 'rang', 'equipe', 'equipe_id', 'pts', 'joues', 'gagnes',
+                 'nuls', 'perdus', 'bp', 'bc', 'diff')
+
+
+class Stade(Record):
+    __slots__ = ('ville', 'stade', 'capacite')
+
+
+class Tournoi(Record):
+    """
+    Matchs indexés du tournoi
+    - poules / finales : listes de Match
+    - groupes : {groupe: [équipes]}, groupe_equipe : {identifiant: groupe}
+    - affiches : {(id1, id2): Match} des équipes connues, pour les recherches de score
+      (les mises à jour passent par la position du match dans poules / finales)
+    - classement : {groupe: [LigneClassement]}
+    - calendrier : {'instants', 'matchs', 'equipes': {identifiant: (instants, matchs)}}
+    """
+    __slots__ = ('poules', 'finales', 'groupes', 'groupe_equipe', 'affiches',
+                 'classement', 'calendrier')
+
+
+# ==========================================================
+# CONSTRUCTION (PANDAS) ET LECTURE (SANS PANDAS)
+# ==========================================================
+
+def _natif(valeur):
+    """Copie profonde en types Python natifs (aucun scalaire numpy dans le pickle)"""
+    if isinstance(valeur, dict):
+        return {_natif(k): _natif(v) for k, v in valeur.items()}
+    if isinstance(valeur, (list, tuple)):
+        return type(valeur)(_natif(v) for v in valeur)
+    if type(valeur).__module__ == 'numpy':
+        return valeur.item()
+    if valeur != valeur:  # NaN
+        return None
+    return valeur
+
+
+def enregistrements(df, classe, **renommages):
+    """Enregistrements d'une classe à partir des lignes d'un DataFrame"""
+    lignes = []
+    for r in df.to_dict('records'):
+        r = {renommages.get(k, k): _natif(v) for k, v in r.items()}
+        lignes.append(classe(**r))
+    return lignes
+
+
+def _construire_tournoi(dm):
+    poules = enregistrements(dm.load_poules(), Match)
+    for m in poules:
+        m.phase = PHASE_POULES
+    finales = enregistrements(dm.load_finales(), Match)
+
+    # Affiches pas encore tirées (équipe inconnue) : non indexées, elles partageraient la même clé
+    affiches = {}
+    for m in poules + finales:
+        if UNKNOWN_TEAM_ID not in (m.equipe1_id, m.equipe2_id):
+            affiches.setdefault((m.equipe1_id, m.equipe2_id), m)
+
+    # Le calendrier référence les mêmes enregistrements que finales (par position)
+    calendrier = dm.load_calendrier()
+    for m in calendrier['matchs']:
+        finales[m['ligne']].instant = m['instant']
+    par_equipe = {
+        int(tid): (list(instants), [finales[m['ligne']] for m in matchs])
+        for tid, (instants, matchs) in calendrier['equipes'].items()
+    }
+
+    groupes, groupe_equipe = {}, {}
+    for r in dm.load_groupes().to_dict('records'):
+        groupes.setdefault(r['groupe'], []).append(r['equipe'])
+        groupe_equipe.setdefault(int(r['equipe_id']), r['groupe'])
+
+    return Tournoi(
+        poules=poules,
+        finales=finales,
+        groupes=groupes,
+        groupe_equipe=groupe_equipe,
+        affiches=affiches,
+        classement={
+            groupe: enregistrements(lignes, LigneClassement)
+            for groupe, lignes in dm.load_classement_calcule().items()
+        },
+        calendrier={
+            'instants': list(calendrier['instants']),
+            'matchs': [finales[m['ligne']] for m in calendrier['matchs']],
+            'equipes': par_equipe,
+        },
+    )
+
+
+# Partie de l'instantané → (fichiers CSV sources, construction depuis data_manager)
+PARTIES = {
+    'registre': (('equipes',), lambda dm: _natif(dm.load_registre_equipes())),
+    'tournoi': (('poules', 'finales', 'groupes', 'equipes'), _construire_tournoi),
+    'stades': (('stades',), lambda dm: enregistrements(dm.load_stades(), Stade)),
+    'stats': (('poules', 'finales', 'joueurs', 'equipes'), lambda dm: _natif(dm.load_stats())),
+    'joueurs': (('joueurs', 'equipes'), lambda dm: enregistrements(dm.load_joueurs(), Joueur, goals='buts')),
+}
+
+# Parties chargées (une fois chacune, au premier accès)
+_parties = {}
+_verrou = threading.RLock()
+
+# Changements publiés depuis le démarrage, rejoués sur les parties lues plus tard
+_journal = []
+
+
+def sources_partie(nom, dossier=DATA_DIR):
+    """Date de modification (ns) de chaque fichier source présent d'une partie"""
+    sources = {}
+    for dataset in PARTIES[nom][0]:
+        try:
+            sources[dataset] = os.stat(dossier / FICHIERS[dataset]).st_mtime_ns
+        except FileNotFoundError:
+            pass
+    return sources
+
+
+def build_partie(nom):
+    """Construit une partie depuis les CSV (seul chemin qui importe pandas)"""
+    import data_manager as dm
+
+    sources = sources_partie(nom)
+    donnees = PARTIES[nom][1](dm)
+    logger.info(f"✓ Instantané '{nom}' construit")
+    return sources, donnees
+
+
+def save_partie(nom, sources, donnees, dossier_snapshot=SNAPSHOT_DIR):
+    """Écrit une partie de façon atomique (fichier temporaire puis remplacement)"""
+    chemin = dossier_snapshot / f"{nom}.pkl"
+    temporaire = chemin.with_suffix(".tmp")
+    try:
+        dossier_snapshot.mkdir(exist_ok=True)
+        with open(temporaire, "wb") as f:
+            pickle.dump(
+                {'version': SNAPSHOT_VERSION, 'sources': sources, 'donnees': donnees},
+                f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temporaire, chemin)
+    except OSError as e:
+        logger.warning(f"Instantané '{nom}' non enregistré: {e}")
+        return False
+    return True
+
+
+def partie_enregistree(nom, dossier=DATA_DIR, dossier_snapshot=None):
+    """
+    Partie enregistrée (dossier/snapshot/, ou dossier_snapshot) si elle est à jour
+    des CSV de dossier, None sinon
+    """
+    try:
+        with open((dossier_snapshot or dossier / "snapshot") / f"{nom}.pkl", "rb") as f:
+            contenu = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Instantané '{nom}' illisible: {e}")
+        return None
+
+    if contenu.get('version') != SNAPSHOT_VERSION or contenu.get('sources') != sources_partie(nom, dossier):
+        logger.info(f"Instantané '{nom}' périmé: reconstruction")
+        return None
+    return contenu['donnees']
+
+
+def lire_partie(nom):
+    """
+    Partie à jour, lue ou reconstruite (puis enregistrée), sans la garder en mémoire
+    (construction d'un autre stockage) : (données, reconstruite)
+    Après un score publié, la partie reconstruite n'est pas enregistrée : elle
+    porterait les dates des CSV inchangés et survivrait au redémarrage
+    """
+    donnees = partie_enregistree(nom)
+    if donnees is not None:
+        return donnees, False
+    sources, donnees = build_partie(nom)
+    if not _journal:
+        save_partie(nom, sources, donnees)
+    return donnees, True
+
+
+def load_partie(nom):
+    """
+    Partie de l'instantané chargée au premier accès : lue depuis data/snapshot/,
+    ou reconstruite (avec pandas) puis enregistrée si absente ou périmée
+    """
+    if nom in _parties:
+        return _parties[nom]
+
+    with _verrou:
+        if nom not in _parties:
+            debut = time.perf_counter()
+            donnees, reconstruite = lire_partie(nom)
+            # Reconstruite depuis data_manager : contient déjà les changements publiés
+            if not reconstruite:
+                for change in _journal:
+                    _appliquer(nom, donnees, change)
+            _parties[nom] = donnees
+            logger.info(f"✓ Instantané '{nom}' chargé en {(time.perf_counter() - debut) * 1000:.0f} ms")
+    return _parties[nom]
+
+
+def build_snapshot(dossier_snapshot=SNAPSHOT_DIR):
+    """Reconstruit et enregistre toutes les parties (après un scraping), dans data/snapshot/ par défaut"""
+    for nom in PARTIES:
+        save_partie(nom, *build_partie(nom), dossier_snapshot)
+
+
+def clear_cache():
+    """Oublie les parties chargées (relues au prochain accès)"""
+    with _verrou:
+        _parties.clear()
+        team_id.cache_clear()
+        invalider()
+
+
+# ==========================================================
+# ACCÈS DE SERVICE (MÊMES NOMS QUE data_manager)
+# ==========================================================
+
+@lru_cache(maxsize=512)
+def team_id(name):
+    """Identifiant entier d'une équipe quelle que soit son orthographe, None si inconnue"""
+    if not isinstance(name, str):
+        return None
+    return load_partie('registre')['alias'].get(normalize(name))
+
+
+class Requetes:
+    """
+    Requêtes des handlers sur les parties d'une édition, chargées par load_partie(nom)
+    (édition courante ci-dessous, éditions passées : editions.py) ; mêmes
+    signatures que sqlite_backend
+    """
+
+    def load_registre_equipes(self):
+        return self.load_partie('registre')
+
+    def load_tournoi(self):
+        return self.load_partie('tournoi')
+
+    def load_stades(self):
+        return self.load_partie('stades')
+
+    def load_stats(self):
+        return self.load_partie('stats')
+
+    def load_joueurs(self):
+        return self.load_partie('joueurs')
+
+    def team_id(self, name):
+        """Identifiant entier d'une équipe quelle que soit son orthographe, None si inconnue"""
+        if not isinstance(name, str):
+            return None
+        return self.load_registre_equipes()['alias'].get(normalize(name))
+
+    def team_name(self, tid):
+        """Nom canonique d'un identifiant d'équipe"""
+        noms = self.load_registre_equipes()['noms']
+        if tid is None or not 0 <= tid < len(noms):
+            return None
+        return noms[tid]
+
+    def normalize_team_name(self, name):
+        """Nom canonique d'une équipe (orthographe d'origine si inconnue du registre)"""
+        if not isinstance(name, str):
+            return ""
+        return self.team_name(self.team_id(name)) or name.strip()
+
+    def get_classement_groupe(self, groupe):
+        """Classement d'un groupe (liste vide si inconnu)"""
+        return self.load_tournoi().classement.get(groupe, [])
+
+    def get_classement_equipe(self, equipe):
+        """Ligne de classement d'une équipe, None si introuvable"""
+        tid = self.team_id(equipe)
+        for lignes in self.load_tournoi().classement.values():
+            for ligne in lignes:
+                if ligne.equipe_id == tid:
+                    return ligne
+        return None
+
+    def _index_calendrier(self, equipe=None):
+        """Listes parallèles (instants, matchs) globales ou d'une équipe"""
+        calendrier = self.load_tournoi().calendrier
+        if equipe is None:
+            return calendrier['instants'], calendrier['matchs']
+        return calendrier['equipes'].get(self.team_id(equipe), ([], []))
+
+    def prochains_matchs(self, apres, equipe=None, n=1):
+        """Les n premiers matchs strictement après l'instant donné"""
+        return suivants(*self._index_calendrier(equipe), apres, n)
+
+    def derniers_matchs(self, avant, equipe=None, n=1):
+        """Les n derniers matchs jusqu'à l'instant donné (du plus récent au plus ancien)"""
+        return precedents(*self._index_calendrier(equipe), avant, n)
+
+    def matchs_entre(self, debut, fin, equipe=None):
+        """Matchs dont l'horaire est dans [debut, fin["""
+        return entre(*self._index_calendrier(equipe), debut, fin)
+
+    def nombre_matchs(self):
+        tournoi = self.load_tournoi()
+        return len(tournoi.poules) + len(tournoi.finales)
+
+    def matchs_de(self, tid):
+        """Matchs d'une équipe : poules puis phases finales"""
+        tournoi = self.load_tournoi()
+        return [m for m in tournoi.poules + tournoi.finales if m.equipe1_id == tid or m.equipe2_id == tid]
+
+    def affiche(self, id1, id2):
+        """Match entre deux équipes, dans un sens ou dans l'autre, None si introuvable"""
+        affiches = self.load_tournoi().affiches
+        return affiches.get((id1, id2)) or affiches.get((id2, id1))
+
+    def liste_groupes(self):
+        return list(self.load_tournoi().groupes)
+
+    def equipes_groupe(self, groupe):
+        """Équipes d'un groupe (liste vide si inconnu)"""
+        return self.load_tournoi().groupes.get(groupe, [])
+
+    def groupe_de(self, tid):
+        """Groupe d'une équipe, None si introuvable"""
+        return self.load_tournoi().groupe_equipe.get(tid)
+
+    def top_buteurs(self, equipe=None, n=5):
+        """n meilleurs buteurs [(joueur, équipe, buts)], globalement ou d'une équipe"""
+        stats = self.load_stats()
+        if equipe:
+            return stats['buteurs_equipe'].get(self.team_id(equipe), [])[:n]
+        return stats['buteurs'][:n]
+
+    def top_attaques(self, n=5):
+        """[(équipe, buts marqués, matchs joués)] des n meilleures attaques"""
+        stats = self.load_stats()
+        return [(e, stats['equipes'][e]['bp'], stats['equipes'][e]['joues']) for e in stats['attaques'][:n]]
+
+    def top_defenses(self, n=5):
+        """[(équipe, buts encaissés, clean sheets)] des n meilleures défenses"""
+        stats = self.load_stats()
+        return [(e, stats['equipes'][e]['bc'], stats['equipes'][e]['clean_sheets']) for e in stats['defenses'][:n]]
+
+    def bilan_buts(self):
+        """Matchs joués, buts (total, moyenne, par phase)"""
+        stats = self.load_stats()
+        return {cle: stats[cle] for cle in ('matchs_joues', 'buts_total', 'moyenne_buts', 'buts_phase')}
+
+    def repartition_effectifs(self, n=5):
+        """([(club, joueurs)] des n clubs les plus représentés, {poste: joueurs})"""
+        stats = self.load_stats()
+        return list(stats['joueurs_club'].items())[:n], stats['joueurs_poste']
+
+    def precharger(self):
+        self.load_tournoi()
+        self.load_stats()
+
+
+class _EditionCourante(Requetes):
+    """Édition servie par défaut : parties de data/snapshot/, tenues à jour des scores publiés"""
+
+    load_partie = staticmethod(load_partie)
+    team_id = staticmethod(team_id)
+
+
+courante = _EditionCourante()
+
+# Accès de l'édition courante au niveau du module (utilisés par les autres modules)
+load_registre_equipes = courante.load_registre_equipes
+load_tournoi = courante.load_tournoi
+load_stades = courante.load_stades
+load_stats = courante.load_stats
+load_joueurs = courante.load_joueurs
+team_name = courante.team_name
+normalize_team_name = courante.normalize_team_name
+get_classement_groupe = courante.get_classement_groupe
+get_classement_equipe = courante.get_classement_equipe
+prochains_matchs = courante.prochains_matchs
+derniers_matchs = courante.derniers_matchs
+matchs_entre = courante.matchs_entre
+nombre_matchs = courante.nombre_matchs
+matchs_de = courante.matchs_de
+affiche = courante.affiche
+liste_groupes = courante.liste_groupes
+equipes_groupe = courante.equipes_groupe
+groupe_de = courante.groupe_de
+top_buteurs = courante.top_buteurs
+top_attaques = courante.top_attaques
+top_defenses = courante.top_defenses
+bilan_buts = courante.bilan_buts
+repartition_effectifs = courante.repartition_effectifs
+precharger = courante.precharger
+
+
+def _appliquer(nom, donnees, change):
+    """Reporte un changement de score dans une partie chargée"""
+    if nom == 'tournoi':
+        # Même position que dans le DataFrame de data_manager (poules ou finales)
+        getattr(donnees, change['dataset'])[change['ligne']].score = change['score']
+        if 'groupe' in change:
+            # Le changement vient de data_manager : déjà importé, classement déjà recalculé
+            import data_manager as dm
+            donnees.classement[change['groupe']] = enregistrements(
+                dm.get_classement_groupe(change['groupe']), LigneClassement
+            )
+    elif nom == 'stats':
+        appliquer_score(donnees, change, change['ancien_score'], -1)
+        appliquer_score(donnees, change, change['score'], 1)
+        classer_stats(donnees)
+
+
+def _maj_snapshot(change):
+    """
+    Reporte un score publié par data_manager.update_score() dans les parties
+    déjà chargées, et le journalise pour celles qui le seront plus tard
+    """
+    with _verrou:
+        _journal.append(change)
+        for nom, donnees in _parties.items():
+            _appliquer(nom, donnees, change)
+
+
+subscribe(_maj_snapshot)
+
+
+if __name__ == "__main__":
+    # Reconstruction explicite (après un scraping ou une mise à jour des CSV)
+    # via le module importé : les classes sont enregistrées sous snapshot.*, pas __main__.*
+    import snapshot
+
+    logging.basicConfig(level=logging.INFO)
+    snapshot.build_snapshot()
@@ -0,0 +1,436 @@
+"""
+Stockage SQLite embarqué (CAN_BACKEND=sqlite), alternative à l'instantané en mémoire
+Base data/can.sqlite construite depuis les parties de l'instantané (elles-mêmes
+construites des CSV par data_manager), avec un index par requête des handlers.
+Chaque requête est un texte SQL constant à paramètres : sqlite3 la prépare une
+fois par connexion (cache des requêtes préparées) puis la réexécute.
+Une connexion par thread ; les scores publiés par update_score() sont reportés
+dans la base, reconstruite au démarrage suivant (les CSV font foi)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import snapshot
+from core import DATA_DIR, PHASE_POULES, parse_score, subscribe, invalider
+from snapshot import Match, LigneClassement, Stade
+from snapshot import load_registre_equipes, team_id, team_name, normalize_team_name  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+BASE = DATA_DIR / "can.sqlite"
+BASE_VERSION = 1
+
+# Parties de l'instantané copiées dans la base (le registre des équipes reste en mémoire)
+PARTIES = ('tournoi', 'stades', 'joueurs')
+
+SCHEMA = """
+CREATE TABLE meta (cle TEXT PRIMARY KEY, valeur TEXT);
+
+CREATE TABLE matchs (
+    ordre INTEGER PRIMARY KEY,
+    phase TEXT, groupe TEXT, date TEXT, heure TEXT, instant TEXT,
+    equipe1 TEXT, equipe2 TEXT, equipe1_id INTEGER, equipe2_id INTEGER,
+    score TEXT, stade TEXT, buts1 INTEGER, buts2 INTEGER
+);
+CREATE INDEX matchs_affiche ON matchs (equipe1_id, equipe2_id);
+CREATE INDEX matchs_equipe2 ON matchs (equipe2_id);
+CREATE INDEX matchs_instant ON matchs (instant);
+
+CREATE TABLE groupes (groupe TEXT, equipe TEXT, equipe_id INTEGER);
+CREATE INDEX groupes_groupe ON groupes (groupe);
+CREATE INDEX groupes_equipe ON groupes (equipe_id);
+
+CREATE TABLE classement (
+    groupe TEXT, rang INTEGER, equipe TEXT, equipe_id INTEGER, pts INTEGER, joues INTEGER,
+    gagnes INTEGER, nuls INTEGER, perdus INTEGER, bp INTEGER, bc INTEGER, diff INTEGER
+);
+CREATE INDEX classement_groupe ON classement (groupe);
+CREATE INDEX classement_equipe ON classement (equipe_id);
+
+CREATE TABLE stades (ville TEXT, stade TEXT, capacite INTEGER);
+
+CREATE TABLE joueurs (joueur TEXT, equipe TEXT, equipe_id INTEGER, poste TEXT, club TEXT, buts INTEGER);
+CREATE INDEX joueurs_buts ON joueurs (buts, joueur);
+CREATE INDEX joueurs_equipe ON joueurs (equipe_id, buts, joueur);
+
+-- Agrégats précalculés (recalculés à chaque score publié, voir _agreger)
+CREATE TABLE stats_equipes (equipe TEXT PRIMARY KEY, joues INTEGER, bp INTEGER, bc INTEGER, clean_sheets INTEGER);
+CREATE INDEX stats_attaque ON stats_equipes (bp DESC, equipe);
+CREATE INDEX stats_defense ON stats_equipes (CAST(bc AS REAL) / joues, clean_sheets DESC, equipe);
+CREATE TABLE buts_phase (phase TEXT PRIMARY KEY, ordre INTEGER, matchs INTEGER, buts INTEGER);
+
+-- Répartition des joueurs (fixe : les effectifs ne changent pas en service)
+CREATE TABLE effectifs (critere TEXT, valeur TEXT, joueurs INTEGER);
+CREATE INDEX effectifs_rang ON effectifs (critere, joueurs DESC, valeur);
+"""
+
+# Exécutées une à une dans la transaction du score (executescript validerait avant)
+AGREGATS = (
+    "DELETE FROM stats_equipes",
+    """INSERT INTO stats_equipes
+        SELECT equipe, COUNT(*), SUM(bp), SUM(bc), SUM(bc = 0) FROM (
+            SELECT equipe1 AS equipe, buts1 AS bp, buts2 AS bc FROM matchs WHERE buts1 IS NOT NULL
+            UNION ALL
+            SELECT equipe2, buts2, buts1 FROM matchs WHERE buts1 IS NOT NULL
+        ) GROUP BY equipe""",
+    "DELETE FROM buts_phase",
+    """INSERT INTO buts_phase
+        SELECT phase, MIN(ordre), COUNT(*), SUM(buts1 + buts2) FROM matchs WHERE buts1 IS NOT NULL GROUP BY phase""",
+)
+
+EFFECTIFS = (
+    "INSERT INTO effectifs SELECT 'club', club, COUNT(*) FROM joueurs WHERE club IS NOT NULL GROUP BY club",
+    "INSERT INTO effectifs SELECT 'poste', poste, COUNT(*) FROM joueurs WHERE poste IS NOT NULL GROUP BY poste",
+)
+
+CHAMPS_MATCH = Match.__slots__
+CHAMPS_CLASSEMENT = LigneClassement.__slots__
+CHAMPS_JOUEUR = ('joueur', 'equipe', 'equipe_id', 'poste', 'club', 'buts')
+
+_MATCH = f"SELECT {', '.join(CHAMPS_MATCH)} FROM matchs"
+# Matchs d'une équipe (deux index plutôt qu'un parcours de la table pour le OR)
+_EQUIPE = "ordre IN (SELECT ordre FROM matchs WHERE equipe1_id = ? UNION ALL SELECT ordre FROM matchs WHERE equipe2_id = ?)"
+
+# Requêtes des handlers (textes constants : préparées une fois par connexion)
+SQL = {
+    'nombre_matchs': "SELECT COUNT(*) FROM matchs",
+    'matchs_de': f"{_MATCH} WHERE {_EQUIPE} ORDER BY ordre",
+    'affiche': f"{_MATCH} WHERE equipe1_id = ? AND equipe2_id = ? ORDER BY ordre LIMIT 1",
+    'liste_groupes': "SELECT groupe FROM groupes GROUP BY groupe ORDER BY MIN(rowid)",
+    'equipes_groupe': "SELECT equipe FROM groupes WHERE groupe = ? ORDER BY rowid",
+    'groupe_de': "SELECT groupe FROM groupes WHERE equipe_id = ? ORDER BY rowid LIMIT 1",
+    'classement_groupe': f"SELECT {', '.join(CHAMPS_CLASSEMENT)} FROM classement WHERE groupe = ? ORDER BY rowid",
+    'classement_equipe': f"SELECT {', '.join(CHAMPS_CLASSEMENT)} FROM classement WHERE equipe_id = ? ORDER BY rowid LIMIT 1",
+    'prochains': f"{_MATCH} WHERE instant > ? ORDER BY instant, ordre LIMIT ?",
+    'prochains_equipe': f"{_MATCH} WHERE instant > ? AND {_EQUIPE} ORDER BY instant, ordre LIMIT ?",
+    'derniers': f"{_MATCH} WHERE instant <= ? ORDER BY instant DESC, ordre DESC LIMIT ?",
+    'derniers_equipe': f"{_MATCH} WHERE instant <= ? AND {_EQUIPE} ORDER BY instant DESC, ordre DESC LIMIT ?",
+    'entre': f"{_MATCH} WHERE instant >= ? AND instant < ? ORDER BY instant, ordre",
+    'entre_equipe': f"{_MATCH} WHERE instant >= ? AND instant < ? AND {_EQUIPE} ORDER BY instant, ordre",
+    'stades': "SELECT ville, stade, capacite FROM stades ORDER BY rowid",
+    'buteurs': "SELECT joueur, equipe, buts FROM joueurs WHERE buts > 0 ORDER BY buts DESC, joueur LIMIT ?",
+    'buteurs_equipe': "SELECT joueur, equipe, buts FROM joueurs WHERE equipe_id = ? AND buts > 0 ORDER BY buts DESC, joueur LIMIT ?",
+    'attaques': "SELECT equipe, bp, joues FROM stats_equipes ORDER BY bp DESC, equipe LIMIT ?",
+    'defenses': (
+        "SELECT equipe, bc, clean_sheets FROM stats_equipes "
+        "ORDER BY CAST(bc AS REAL) / joues, clean_sheets DESC, equipe LIMIT ?"
+    ),
+    'buts_phase': "SELECT phase, matchs, buts FROM buts_phase ORDER BY ordre",
+    'effectifs': "SELECT valeur, joueurs FROM effectifs WHERE critere = ? ORDER BY joueurs DESC, valeur LIMIT ?",
+    # ordre suit poules puis finales (à partir de 1) : match désigné par sa position
+    'nb_poules': "SELECT COUNT(*) FROM matchs WHERE phase = ?",
+    'maj_score': "UPDATE matchs SET score = ?, buts1 = ?, buts2 = ? WHERE ordre = ?",
+}
+
+
+# ==========================================================
+# CONSTRUCTION
+# ==========================================================
+
+def _sources():
+    return {nom: snapshot.sources_partie(nom) for nom in PARTIES}
+
+
+def _ligne_match(m):
+    buts = parse_score(m.score) or (None, None)
+    instant = m.instant.isoformat() if m.instant else None
+    return (m.phase, m.groupe, m.date, m.heure, instant, m.equipe1, m.equipe2,
+            m.equipe1_id, m.equipe2_id, m.score, m.stade, *buts)
+
+
+def _executer(connexion, requetes):
+    for requete in requetes:
+        connexion.execute(requete)
+
+
+def _agreger(connexion):
+    """Recalcule les agrégats des matchs joués (quelques millisecondes pour 50 tournois)"""
+    _executer(connexion, AGREGATS)
+
+
+def _remplir(connexion, tournoi, stades, joueurs):
+    connexion.executescript(SCHEMA)
+    connexion.executemany(
+        f"INSERT INTO matchs ({', '.join(CHAMPS_MATCH)}, buts1, buts2) VALUES ({', '.join('?' * 13)})",
+        (_ligne_match(m) for m in tournoi.poules + tournoi.finales),
+    )
+    connexion.executemany(
+        "INSERT INTO groupes VALUES (?, ?, ?)",
+        ((groupe, equipe, team_id(equipe)) for groupe, equipes in tournoi.groupes.items() for equipe in equipes),
+    )
+    connexion.executemany(
+        f"INSERT INTO classement VALUES ({', '.join('?' * len(CHAMPS_CLASSEMENT))})",
+        (tuple(getattr(r, c) for c in CHAMPS_CLASSEMENT) for lignes in tournoi.classement.values() for r in lignes),
+    )
+    connexion.executemany("INSERT INTO stades VALUES (?, ?, ?)", ((s.ville, s.stade, s.capacite) for s in stades))
+    connexion.executemany(
+        "INSERT INTO joueurs VALUES (?, ?, ?, ?, ?, ?)",
+        (tuple(getattr(j, c) for c in CHAMPS_JOUEUR) for j in joueurs),
+    )
+    _executer(connexion, EFFECTIFS)
+    _agreger(connexion)
+
+
+def build_base(chemin=BASE, parties=None):
+    """
+    Construit la base depuis les parties de l'instantané (reconstruites avec pandas
+    si périmées) ou depuis parties={'tournoi', 'stades', 'joueurs'} fournies
+    Écriture dans un fichier temporaire puis remplacement atomique
+    """
+    sources = _sources() if parties is None else {}
+    if parties is None:
+        parties = {nom: snapshot.lire_partie(nom)[0] for nom in PARTIES}
+
+    temporaire = chemin.with_suffix(".tmp")
+    temporaire.unlink(missing_ok=True)
+    connexion = sqlite3.connect(temporaire)
+    try:
+        _remplir(connexion, parties['tournoi'], parties['stades'], parties['joueurs'])
+        connexion.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ('version', str(BASE_VERSION)), ('sources', json.dumps(sources, sort_keys=True)),
+        ])
+        connexion.commit()
+        connexion.execute("PRAGMA journal_mode=WAL")
+        connexion.execute("ANALYZE")
+    finally:
+        connexion.close()
+    os.replace(temporaire, chemin)
+    logger.info(f"✓ Base SQLite construite: {chemin.name}")
+
+
+def _a_jour(chemin):
+    """Base présente, de la bonne version, à jour de ses sources et jamais modifiée"""
+    try:
+        connexion = sqlite3.connect(f"file:{chemin}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return False
+    try:
+        meta = dict(connexion.execute("SELECT cle, valeur FROM meta"))
+    except sqlite3.Error:
+        return False
+    finally:
+        connexion.close()
+    return (
+        meta.get('version') == str(BASE_VERSION)
+        and 'modifiee' not in meta
+        and meta.get('sources') == json.dumps(_sources(), sort_keys=True)
+    )
+
+
+# ==========================================================
+# CONNEXIONS
+# ==========================================================
+
+_local = threading.local()
+_verrou = threading.RLock()
+_chemin = None      # base ouverte (None : pas encore vérifiée)
+_generation = 0     # change à chaque ouverture : les connexions des threads sont rouvertes
+
+# Changements publiés depuis le démarrage, reportés à l'ouverture de la base
+_journal = []
+
+
+def ouvrir(chemin=BASE, reconstruire=True):
+    """Vérifie la base au premier accès (reconstruite si absente ou périmée)"""
+    global _chemin, _generation
+    with _verrou:
+        if _chemin == chemin:
+            return
+        debut = time.perf_counter()
+        if reconstruire and not _a_jour(chemin):
+            build_base(chemin)
+        _chemin = chemin
+        _generation += 1
+        for change in _journal:
+            _appliquer(_connexion(), change)
+        logger.info(f"✓ Base SQLite ouverte en {(time.perf_counter() - debut) * 1000:.0f} ms")
+
+
+def _connexion():
+    """Connexion du thread courant (ouverte au premier usage)"""
+    if _chemin is None:
+        ouvrir()
+    if getattr(_local, 'generation', None) != _generation:
+        _local.connexion = sqlite3.connect(_chemin, check_same_thread=True)
+        _local.generation = _generation
+    return _local.connexion
+
+
+def _lignes(requete, *parametres):
+    return _connexion().execute(SQL[requete], parametres).fetchall()
+
+
+def clear_cache():
+    """Oublie la base ouverte (revérifiée au prochain accès)"""
+    global _chemin
+    with _verrou:
+        _chemin = None
+        invalider()
+
+
+# ==========================================================
+# REQUÊTES DES HANDLERS (MÊMES SIGNATURES QUE snapshot)
+# ==========================================================
+
+def _match(ligne):
+    m = Match.depuis_ligne(ligne)
+    if m.instant is not None:
+        m.instant = datetime.fromisoformat(m.instant)
+    return m
+
+
+_classement = LigneClassement.depuis_ligne
+
+
+def nombre_matchs():
+    return _lignes('nombre_matchs')[0][0]
+
+
+def matchs_de(tid):
+    """Matchs d'une équipe : poules puis phases finales"""
+    return [_match(l) for l in _lignes('matchs_de', tid, tid)]
+
+
+def affiche(id1, id2):
+    """Match entre deux équipes, dans un sens ou dans l'autre, None si introuvable"""
+    lignes = _lignes('affiche', id1, id2) or _lignes('affiche', id2, id1)
+    return _match(lignes[0]) if lignes else None
+
+
+def liste_groupes():
+    return [g for (g,) in _lignes('liste_groupes')]
+
+
+def equipes_groupe(groupe):
+    """Équipes d'un groupe (liste vide si inconnu)"""
+    return [e for (e,) in _lignes('equipes_groupe', groupe)]
+
+
+def groupe_de(tid):
+    """Groupe d'une équipe, None si introuvable"""
+    lignes = _lignes('groupe_de', tid)
+    return lignes[0][0] if lignes else None
+
+
+def get_classement_groupe(groupe):
+    """Classement d'un groupe (liste vide si inconnu)"""
+    return [_classement(l) for l in _lignes('classement_groupe', groupe)]
+
+
+def get_classement_equipe(equipe):
+    """Ligne de classement d'une équipe, None si introuvable"""
+    lignes = _lignes('classement_equipe', team_id(equipe))
+    return _classement(lignes[0]) if lignes else None
+
+
+def _calendrier(requete, bornes, equipe, *fin):
+    bornes = tuple(b.isoformat() for b in bornes)
+    if equipe is None:
+        return [_match(l) for l in _lignes(requete, *bornes, *fin)]
+    tid = team_id(equipe)
+    return [_match(l) for l in _lignes(f"{requete}_equipe", *bornes, tid, tid, *fin)]
+
+
+def prochains_matchs(apres, equipe=None, n=1):
+    """Les n premiers matchs strictement après l'instant donné"""
+    return _calendrier('prochains', (apres,), equipe, n)
+
+
+def derniers_matchs(avant, equipe=None, n=1):
+    """Les n derniers matchs jusqu'à l'instant donné (du plus récent au plus ancien)"""
+    return _calendrier('derniers', (avant,), equipe, n)
+
+
+def matchs_entre(debut, fin, equipe=None):
+    """Matchs dont l'horaire est dans [debut, fin["""
+    return _calendrier('entre', (debut, fin), equipe)
+
+
+def load_stades():
+    return [Stade.depuis_ligne(l) for l in _lignes('stades')]
+
+
+def top_buteurs(equipe=None, n=5):
+    """n meilleurs buteurs [(joueur, équipe, buts)], globalement ou d'une équipe"""
+    if equipe:
+        return _lignes('buteurs_equipe', team_id(equipe), n)
+    return _lignes('buteurs', n)
+
+
+def top_attaques(n=5):
+    """[(équipe, buts marqués, matchs joués)] des n meilleures attaques"""
+    return _lignes('attaques', n)
+
+
+def top_defenses(n=5):
+    """[(équipe, buts encaissés, clean sheets)] des n meilleures défenses"""
+    return _lignes('defenses', n)
+
+
+def bilan_buts():
+    """Matchs joués, buts (total, moyenne, par phase)"""
+    phases = _lignes('buts_phase')
+    joues, total = sum(p[1] for p in phases), sum(p[2] for p in phases)
+    return {
+        'matchs_joues': joues,
+        'buts_total': total,
+        'moyenne_buts': total / joues if joues else 0.0,
+        'buts_phase': {phase: buts for phase, _, buts in phases},
+    }
+
+
+def repartition_effectifs(n=5):
+    """([(club, joueurs)] des n clubs les plus représentés, {poste: joueurs})"""
+    return _lignes('effectifs', 'club', n), dict(_lignes('effectifs', 'poste', -1))
+
+
+def precharger():
+    _connexion()
+
+
+# ==========================================================
+# CHANGEMENTS PUBLIÉS
+# ==========================================================
+
+def _appliquer(connexion, change):
+    """Reporte un changement de score (et le classement recalculé du groupe) dans la base"""
+    buts = parse_score(change['score']) or (None, None)
+    ordre = change['ligne'] + 1
+    if change['dataset'] == 'finales':
+        ordre += connexion.execute(SQL['nb_poules'], (PHASE_POULES,)).fetchone()[0]
+    connexion.execute(SQL['maj_score'], (change['score'], *buts, ordre))
+    if 'groupe' in change:
+        # Le changement vient de data_manager : déjà importé, classement déjà recalculé
+        import data_manager as dm
+        lignes = snapshot.enregistrements(dm.get_classement_groupe(change['groupe']), LigneClassement)
+        connexion.execute("DELETE FROM classement WHERE groupe = ?", (change['groupe'],))
+        connexion.executemany(
+            f"INSERT INTO classement VALUES ({', '.join('?' * len(CHAMPS_CLASSEMENT))})",
+            (tuple(getattr(r, c) for c in CHAMPS_CLASSEMENT) for r in lignes),
+        )
+    _agreger(connexion)
+    # Base différente des CSV : reconstruite au prochain démarrage
+    connexion.execute("INSERT OR REPLACE INTO meta VALUES ('modifiee', '1')")
+    connexion.commit()
+
+
+def _maj_base(change):
+    """Reporte un score publié par data_manager.update_score() dans la base ouverte"""
+    with _verrou:
+        _journal.append(change)
+        if _chemin is not None:
+            _appliquer(_connexion(), change)
+
+
+subscribe(_maj_base)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_base()
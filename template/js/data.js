@@ -24,3 +24,14 @@ function cleanNumber(value) {
             .replace(",", "")
     ) || 0;
 }
+
+// Paquets JSON précalculés (python bundles.py), servis par l'API (GET /bundles/, même origine
+// que les pages servies sous /site/) : le manifeste est revalidé à chaque visite, les paquets,
+// nommés d'après leur contenu, restent en cache (immutable, .gz si accepté) tant qu'ils ne changent pas
+const BUNDLES_URL = "/bundles/";
+
+async function loadBundle(nom) {
+    const manifest = await (await fetch(BUNDLES_URL + "manifest.json", { cache: "no-cache" })).json();
+    const res = await fetch(BUNDLES_URL + manifest[nom]);
+    return res.json();
+}
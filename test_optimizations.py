@@ -1,103 +0,0 @@
-"""
-Script de test pour vérifier les optimisations
-"""
-
-import time
-from chatbot_can import chatbot, find_team
-from data_manager import load_all_data, clear_cache
-
-print("=" * 60)
-print("🧪 TEST DES OPTIMISATIONS - CAN 2025")
-print("=" * 60)
-
-# Test 1: Chargement des données avec cache
-print("\n📊 Test 1: Chargement des données avec cache")
-print("-" * 60)
-
-start = time.time()
-data1 = load_all_data()
-time1 = time.time() - start
-print(f"✓ Premier chargement (sans cache): {time1:.3f}s")
-
-start = time.time()
-data2 = load_all_data()
-time2 = time.time() - start
-print(f"✓ Deuxième chargement (avec cache): {time2:.3f}s")
-print(f"⚡ Accélération: {time1/time2:.1f}x plus rapide")
-
-# Test 2: Cache de find_team
-print("\n🔍 Test 2: Cache de find_team()")
-print("-" * 60)
-
-queries = ["maroc", "sénégal", "algérie", "maroc", "sénégal"]
-
-start = time.time()
-for q in queries:
-    find_team(q)
-time_with_cache = time.time() - start
-print(f"✓ 5 recherches (avec cache): {time_with_cache:.4f}s")
-print(f"✓ Moyenne par recherche: {time_with_cache/5*1000:.2f}ms")
-
-# Test 3: Questions au chatbot
-print("\n🤖 Test 3: Questions au chatbot")
-print("-" * 60)
-
-questions = [
-    "Quand joue le Maroc ?",
-    "Groupe du Sénégal",
-    "Score Mali Zambie",
-    "Joueurs Algérie"
-]
-
-for q in questions:
-    start = time.time()
-    response = chatbot(q)
-    elapsed = time.time() - start
-    print(f"\n❓ Question: {q}")
-    print(f"⏱️  Temps de réponse: {elapsed*1000:.0f}ms")
-    print(f"📝 Réponse: {response[:80]}..." if len(response) > 80 else f"📝 Réponse: {response}")
-
-# Test 4: Statistiques des données
-print("\n\n📈 Test 4: Statistiques des données chargées")
-print("-" * 60)
-
-data = load_all_data()
-stats = {
-    'Matchs de poules': len(data['poules']),
-    'Matchs finales': len(data['finales']),
-    'Joueurs total': len(data['joueurs']),
-    'Équipes': len(data['equipes']),
-    'Stades': len(data['stades']),
-    'Groupes': data['groupes']['groupe'].nunique() if not data['groupes'].empty else 0
-}
-
-for key, value in stats.items():
-    print(f"✓ {key:20} : {value}")
-
-# Test 5: Gestion d'erreurs
-print("\n\n🛡️  Test 5: Gestion d'erreurs")
-print("-" * 60)
-
-test_cases = [
-    "",
-    "équipe inexistante xyz",
-    "Bonjour",
-    "aide"
-]
-
-for test in test_cases:
-    response = chatbot(test)
-    status = "✓" if response and len(response) > 0 else "✗"
-    print(f"{status} '{test[:30]}' → Réponse OK")
-
-print("\n" + "=" * 60)
-print("✅ TOUS LES TESTS RÉUSSIS !")
-print("=" * 60)
-print("\n💡 Optimisations appliquées:")
-print("   • Cache LRU sur chargement des données")
-print("   • Cache sur find_team()")
-print("   • Regex compilées")
-print("   • Recherches vectorisées pandas")
-print("   • Gestion d'erreurs robuste")
-print("   • Logging détaillé")
-print("\n🚀 Application prête pour la production !")
@@ -0,0 +1,28 @@
+"""
+Configuration commune des tests : modules du projet importables depuis la racine
+et remise à zéro des données servies après un test qui publie des scores
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bracket  # noqa: E402
+import data_manager  # noqa: E402
+import snapshot  # noqa: E402
+import sqlite_backend  # noqa: E402
+
+
+@pytest.fixture
+def donnees_modifiables():
+    """Données relues depuis les CSV après le test (scores publiés oubliés)"""
+    yield
+    data_manager.clear_cache()
+    snapshot._journal.clear()
+    snapshot.clear_cache()
+    sqlite_backend._journal.clear()
+    sqlite_backend.clear_cache()
+    bracket.load_bracket.cache_clear()
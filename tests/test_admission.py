@@ -0,0 +1,49 @@
+"""Contrôle d'admission devant LLaMA : délestage et réponse dégradée"""
+
+import pytest
+
+import chatbot_can
+import llama_router
+from admission import AdmissionControl
+
+QUESTION_LLM = "peux-tu m'expliquer le hors-jeu ?"
+
+
+@pytest.fixture
+def sature(monkeypatch):
+    """Un seul créneau, déjà pris, sans file d'attente : toute demande est rejetée"""
+    admission = AdmissionControl(max_concurrence=1, attente_max=0.0, file_max=0)
+    assert admission.acquerir()
+    monkeypatch.setattr(llama_router, "admission", admission)
+
+    def modele_appele(question):
+        raise AssertionError("LLaMA appelé malgré la saturation")
+    monkeypatch.setattr(llama_router, "_interroger", modele_appele)
+    return admission
+
+
+def test_rejet_file_pleine(sature):
+    assert not sature.acquerir()
+    assert sature.stats()["rejets"]["file_pleine"] == 1
+
+
+def test_rejet_attente_estimee():
+    admission = AdmissionControl(max_concurrence=1, attente_max=1.0, file_max=4)
+    assert admission.acquerir()
+    admission.duree_moyenne = 5.0
+
+    assert not admission.acquerir()
+    assert admission.stats()["rejets"]["attente_estimee"] == 1
+    admission.liberer()
+    assert admission.acquerir()
+
+
+def test_routeur_sature(sature):
+    assert llama_router.llama_intent_router(QUESTION_LLM)["intent"] == "sature"
+
+
+def test_reponse_degradee(sature):
+    reponse = chatbot_can.chatbot(QUESTION_LLM)
+
+    assert reponse.etage == chatbot_can.DEGRADE
+    assert reponse == chatbot_can.reponse_degradee()
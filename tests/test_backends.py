@@ -0,0 +1,74 @@
+"""Mêmes réponses avec le stockage en mémoire (snapshot) et la base SQLite"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+import backend
+import chatbot_can
+import data_manager
+import snapshot
+import sqlite_backend
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from corpus import LLM, REGLES, analyse_simulee  # noqa: E402
+
+QUESTIONS = REGLES + [q for q, analyse in LLM.items() if analyse["intent"] != "conversation"] + [
+    "prochain match du Maroc",
+    "où se joue la finale",
+    "chances de qualification du groupe A",
+    "dans quel groupe est le Mali",
+]
+
+
+@pytest.fixture
+def stockage(monkeypatch, tmp_path):
+    """Choisit le stockage des handlers ('memoire' ou 'sqlite', base dans tmp_path)"""
+    monkeypatch.setattr(chatbot_can, "llama_intent_router", analyse_simulee)
+    sqlite_backend.ouvrir(tmp_path / "can.sqlite")
+
+    def choisir(nom):
+        module = backend.module_backend(nom)
+        for requete in backend.REQUETES:
+            monkeypatch.setattr(backend, requete, getattr(module, requete))
+            if hasattr(chatbot_can, requete):
+                monkeypatch.setattr(chatbot_can, requete, getattr(module, requete))
+        return module
+
+    yield choisir
+    sqlite_backend.clear_cache()
+
+
+def _reponses():
+    return {question: str(chatbot_can.chatbot(question)) for question in QUESTIONS}
+
+
+def test_memes_reponses(stockage):
+    stockage("memoire")
+    memoire = _reponses()
+    stockage("sqlite")
+    sqlite = _reponses()
+
+    differentes = [q for q in QUESTIONS if memoire[q] != sqlite[q]]
+    assert differentes == []
+
+
+@pytest.mark.usefixtures("donnees_modifiables")
+def test_score_publie_reporte_dans_la_base(stockage, tmp_path):
+    stockage("sqlite")
+    change = data_manager.update_score("Égypte", "Sénégal", "1 - 2")
+
+    assert sqlite_backend._journal == [change]
+    for module in (snapshot, sqlite_backend):
+        assert module.affiche(18, 23).score == "2 - 1"
+    assert sqlite_backend.top_attaques() == snapshot.top_attaques()
+    assert sqlite_backend.bilan_buts() == snapshot.bilan_buts()
+
+    # Base modifiée : reconstruite à la réouverture, le journal y est reporté
+    assert not sqlite_backend._a_jour(tmp_path / "can.sqlite")
+    sqlite_backend.clear_cache()
+    sqlite_backend.ouvrir(tmp_path / "can.sqlite")
+    assert sqlite_backend.affiche(18, 23).score == "2 - 1"
+    assert "2 - 1" in chatbot_can.chatbot("score Sénégal Égypte")
@@ -0,0 +1,54 @@
+"""Classement d'un groupe selon le règlement CAN (data_manager et qualification)"""
+
+import pandas as pd
+import pytest
+
+import qualification
+from data_manager import _classement_groupe
+
+# Y et X à 4 points : Y devant grâce à sa victoire sur X, malgré une moins bonne différence
+CONFRONTATION_DIRECTE = [("X", "Y", 0, 1), ("X", "Z", 5, 0), ("Y", "W", 0, 1),
+                         ("Z", "W", 0, 0), ("X", "W", 0, 0), ("Y", "Z", 1, 1)]
+
+# A, C et D à 4 points ; entre eux, C et D restent à égalité (3 pts, +0, 2 buts) :
+# le départage réappliqué à C et D seuls place C devant (victoire 2-1), alors que
+# D a marqué plus de buts au total
+SOUS_GROUPE = [("A", "B", 0, 0), ("A", "C", 1, 0), ("A", "D", 0, 1),
+               ("B", "C", 0, 0), ("B", "D", 1, 1), ("C", "D", 2, 1)]
+
+
+def _poules(matchs):
+    return pd.DataFrame([
+        {'groupe': "T", 'equipe1': e1, 'equipe2': e2, 'score': f"{b1}-{b2}"}
+        for e1, e2, b1, b2 in matchs
+    ])
+
+
+@pytest.mark.parametrize("matchs, ordre", [
+    (CONFRONTATION_DIRECTE, ["W", "Y", "X", "Z"]),
+    (SOUS_GROUPE, ["C", "D", "A", "B"]),
+])
+def test_classement_groupe(matchs, ordre):
+    classement = _classement_groupe("T", _poules(matchs))
+
+    assert classement['equipe'].tolist() == ordre
+    assert classement['rang'].tolist() == [1, 2, 3, 4]
+    # Même règlement pour les scénarios de qualification
+    assert qualification.classer(sorted(ordre), matchs)[0] == ordre
+
+
+def test_confrontation_directe_avant_difference_generale():
+    classement = _classement_groupe("T", _poules(CONFRONTATION_DIRECTE)).set_index('equipe')
+
+    assert classement.at["X", 'pts'] == classement.at["Y", 'pts']
+    assert classement.at["X", 'diff'] > classement.at["Y", 'diff']
+    assert classement.at["Y", 'rang'] < classement.at["X", 'rang']
+
+
+def test_match_non_joue_ignore():
+    # A - B pas encore joué
+    matchs = _poules(SOUS_GROUPE).assign(score=lambda df: df['score'].where(df.index != 0, "-"))
+    classement = _classement_groupe("T", matchs).set_index('equipe')
+
+    assert classement.at["A", 'joues'] == classement.at["B", 'joues'] == 2
+    assert classement['joues'].sum() == 2 * 5
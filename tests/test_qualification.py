@@ -0,0 +1,59 @@
+"""Classement d'un groupe et scénarios de qualification"""
+
+import pytest
+
+import chatbot_can
+from qualification import classer, simuler
+from snapshot import Match, load_tournoi
+
+GROUPES = {'A': ["A1", "A2", "A3", "A4"]}
+
+
+def _match(equipe1, equipe2, score=None):
+    return Match(groupe='A', equipe1=equipe1, equipe2=equipe2, score=score)
+
+
+# A1 a gagné ses trois matchs, reste A2 - A3
+POULES = [
+    _match("A1", "A2", "2-0"), _match("A3", "A4", "1-1"), _match("A1", "A3", "1-0"),
+    _match("A2", "A4", "2-1"), _match("A1", "A4", "3-0"), _match("A2", "A3"),
+]
+
+
+def test_classer_confrontation_directe_avant_difference():
+    matchs = [("X", "Y", 0, 1), ("X", "Z", 5, 0), ("Y", "W", 0, 1),
+              ("Z", "W", 0, 0), ("X", "W", 0, 0), ("Y", "Z", 1, 1)]
+    ordre, bilan = classer(["W", "X", "Y", "Z"], matchs)
+
+    assert ordre == ["W", "Y", "X", "Z"]
+    # Y devant X à égalité de points malgré une moins bonne différence de buts
+    assert bilan["X"][0] == bilan["Y"][0] and bilan["X"][1] > bilan["Y"][1]
+
+
+def test_issues_du_groupe_sans_troisiemes():
+    simulation = simuler(POULES, GROUPES, troisiemes=0)
+    equipes = simulation['equipes']
+
+    assert simulation['matchs_restants'] == 1
+    assert equipes["A1"]['statut'] == "qualifiee"
+    assert equipes["A4"]['statut'] == "eliminee"
+    assert equipes["A2"]['statut'] == equipes["A3"]['statut'] == "en course"
+    assert equipes["A2"]['restants'] == ["A2 vs A3"] and equipes["A4"]['restants'] == []
+    # Deux qualifiés par groupe, chaque rang occupé par exactement une équipe
+    assert sum(e['qualification'] for e in equipes.values()) == pytest.approx(2)
+    for rang in range(4):
+        assert sum(e['rangs'][rang] for e in equipes.values()) == pytest.approx(1, abs=1e-3)
+
+
+def test_meilleur_troisieme_repeche():
+    equipes = simuler(POULES, GROUPES, troisiemes=1)['equipes']
+
+    assert equipes["A2"]['statut'] == "qualifiee"
+    assert equipes["A3"]['qualification'] == pytest.approx(equipes["A3"]['rangs'][1] + equipes["A3"]['rangs'][2],
+                                                           abs=1e-3)
+    assert equipes["A4"]['troisieme_qualifie'] > 0
+
+
+def test_reponse_premier_du_groupe():
+    premier = load_tournoi().classement["A"][0].equipe
+    assert chatbot_can.qualification(premier) == f"✅ {premier} : qualification assurée (1er du groupe A)"
@@ -0,0 +1,55 @@
+"""Résolution des tours et des noms d'équipes mal orthographiés"""
+
+import pytest
+
+import chatbot_can
+from bracket import TOURS, resolve_phase
+from chatbot_can import analyser, find_team, find_team_approx
+
+
+@pytest.mark.parametrize("libelle, tour", [
+    ("Demi", "Demi-finale"),
+    ("demi-finales", "Demi-finale"),
+    ("Huitième", "Huitièmes de finale"),
+    ("quarts", "Quarts de finale"),
+    ("Finale", "Finale"),
+])
+def test_resolve_phase(libelle, tour):
+    assert resolve_phase(libelle) == tour
+
+
+@pytest.mark.parametrize("libelle", [None, "", "poules"])
+def test_resolve_phase_inconnue(libelle):
+    assert resolve_phase(libelle) is None
+
+
+def test_resolve_phase_noms_canoniques():
+    assert [resolve_phase(t) for t in TOURS] == TOURS
+
+
+@pytest.mark.parametrize("texte, equipe", [
+    ("senegall", "Sénégal"),
+    ("marok", "Maroc"),
+    ("camerounn", "Cameroun"),
+    ("cote divoire", "Côte d'Ivoire"),
+])
+def test_equipe_approchee(texte, equipe):
+    assert find_team_approx(texte) == equipe
+
+
+def test_equipe_inconnue():
+    assert find_team_approx("xyzzy") is None
+
+
+def test_equipe_exacte_et_alias():
+    assert find_team("score du senegal") == "Sénégal"
+    assert find_team("ivory coast") == "Côte d'Ivoire"
+
+
+def test_drapeau_fuzzy_lu_a_chaque_acces(monkeypatch):
+    # Analyse déjà mémorisée : la résolution approximative suit quand même le drapeau
+    question = "quand joue le marok"
+    assert analyser(question).equipe == "Maroc"
+    monkeypatch.setattr(chatbot_can, "FUZZY_ENABLED", False)
+    assert analyser(question).equipe is None
+    assert find_team_approx(question) is None
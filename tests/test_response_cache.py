@@ -0,0 +1,61 @@
+"""Cache des réponses du chatbot : LRU borné et invalidation par version des données"""
+
+import pytest
+
+import data_manager
+from chatbot_can import repondre_avec_cache
+from core import invalider
+from response_cache import ResponseCache
+from sessions import Contexte
+
+QUESTION = "classement du groupe A"
+
+
+def test_lru_borne():
+    cache = ResponseCache(capacite=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_reponse_servie_depuis_le_cache():
+    cache = ResponseCache()
+    premiere, en_cache = repondre_avec_cache(cache, QUESTION, Contexte())
+    assert not en_cache
+
+    contexte = Contexte()
+    seconde, en_cache = repondre_avec_cache(cache, QUESTION, contexte)
+    assert en_cache and seconde is premiere
+    # Réponse en cache : le contexte retient quand même le groupe cité
+    assert contexte.groupe == "A"
+
+
+def test_reponse_en_cache_sans_session():
+    cache = ResponseCache()
+    premiere, _ = repondre_avec_cache(cache, QUESTION)
+
+    assert repondre_avec_cache(cache, QUESTION) == (premiere, True)
+
+
+def test_nouvelle_version_des_donnees_invalide_le_cache():
+    cache = ResponseCache()
+    repondre_avec_cache(cache, QUESTION, Contexte())
+    invalider()
+
+    _, en_cache = repondre_avec_cache(cache, QUESTION, Contexte())
+    assert not en_cache
+
+
+@pytest.mark.usefixtures("donnees_modifiables")
+def test_score_publie_change_la_reponse():
+    cache = ResponseCache()
+    avant, _ = repondre_avec_cache(cache, QUESTION, Contexte())
+    data_manager.update_score("Maroc", "Comores", "9 - 0")
+
+    apres, en_cache = repondre_avec_cache(cache, QUESTION, Contexte())
+    assert not en_cache and apres != avant
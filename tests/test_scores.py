@@ -0,0 +1,87 @@
+"""Publication d'un score (data_manager.update_score) et propagation aux données servies"""
+
+import pytest
+
+import bracket
+import data_manager
+import snapshot
+from core import data_version, parse_score
+from snapshot import Match
+
+
+def _ligne(groupe, equipe):
+    return next(l for l in snapshot.load_tournoi().classement[groupe] if l.equipe == equipe)
+
+
+@pytest.mark.usefixtures("donnees_modifiables")
+def test_score_de_poule_classement_stats_version():
+    tournoi = snapshot.load_tournoi()
+    stats = snapshot.load_stats()
+    match = next(m for m in tournoi.poules if (m.equipe1, m.equipe2) == ("Maroc", "Comores"))
+    b1, _ = parse_score(match.score)
+    bp_classement = _ligne("A", "Maroc").bp
+    bp_stats = stats['equipes']['Maroc']['bp']
+    bc_stats = stats['equipes']['Comores']['bc']
+    version = data_version()
+
+    change = data_manager.update_score("Maroc", "Comores", "5 - 0")
+
+    assert change['dataset'] == 'poules' and change['groupe'] == "A"
+    assert tournoi.poules[change['ligne']] is match and match.score == "5 - 0"
+    assert data_version() > version
+    assert _ligne("A", "Maroc").bp == bp_classement - b1 + 5
+    assert stats['equipes']['Maroc']['bp'] == bp_stats - b1 + 5
+    assert stats['equipes']['Comores']['bc'] == bc_stats - b1 + 5
+
+
+@pytest.mark.usefixtures("donnees_modifiables")
+def test_score_de_phase_finale_propage_au_tableau():
+    tableau = bracket.load_bracket()
+    stats = snapshot.load_stats()
+    buts_demies = stats['buts_phase'].get("Demi-finale", 0)
+
+    # Ordre inversé par rapport aux données : le score est remis dans l'ordre du match
+    change = data_manager.update_score("Égypte", "Sénégal", "1 - 2")
+
+    assert change['dataset'] == 'finales' and change['score'] == "2 - 1"
+    noeud = tableau.par_ligne[change['ligne']]
+    assert noeud.equipes == ["Sénégal", "Égypte"] and noeud.score == "2 - 1"
+    assert noeud.vainqueur == "Sénégal"
+    assert tableau.finale.equipes[noeud.place_suivant] == "Sénégal"
+    assert snapshot.load_tournoi().finales[change['ligne']].score == "2 - 1"
+    assert stats['buts_phase']["Demi-finale"] == buts_demies + 3
+
+
+def test_match_introuvable():
+    version = data_version()
+    assert data_manager.update_score("Maroc", "Brésil", "1 - 0") is None
+    assert data_version() == version
+
+
+def test_affiches_pas_encore_tirees_distinctes():
+    # Deux demi-finales aux équipes inconnues : même affiche, mais deux nœuds distincts
+    demies = [
+        Match(phase="Demi-finale", equipe1=f"Vainqueur QF{i}", equipe2=f"Vainqueur QF{i + 1}",
+              equipe1_id=-1, equipe2_id=-1)
+        for i in (1, 3)
+    ]
+    tableau = bracket.build_bracket(demies)
+
+    assert tableau.par_affiche == {}
+    assert tableau.appliquer_score(None, None, "1 - 0", 1) is tableau.par_ligne[1]
+    assert tableau.par_ligne[0].score is None
+    assert tableau.par_ligne[1].libelle(0) == "À déterminer"
+
+
+@pytest.mark.usefixtures("donnees_modifiables")
+def test_partie_reconstruite_apres_un_score_non_enregistree(monkeypatch):
+    enregistrees = []
+    monkeypatch.setattr(snapshot, "partie_enregistree", lambda nom: None)
+    monkeypatch.setattr(snapshot, "save_partie", lambda nom, sources, donnees: enregistrees.append(nom))
+
+    snapshot.lire_partie('stats')
+    data_manager.update_score("Maroc", "Comores", "5 - 0")
+    donnees, reconstruite = snapshot.lire_partie('stats')
+
+    # Reconstruite depuis les DataFrames modifiés : gardée en mémoire, jamais sur disque
+    assert reconstruite and enregistrees == ['stats']
@@ -0,0 +1,65 @@
+"""Contexte de conversation par session : expiration, éviction LRU et relances"""
+
+import chatbot_can
+from sessions import SessionStore
+
+
+class Horloge:
+    """Horloge manuelle (secondes) pour SessionStore"""
+
+    def __init__(self):
+        self.maintenant = 0.0
+
+    def __call__(self):
+        return self.maintenant
+
+
+def test_expiration_apres_inactivite():
+    horloge = Horloge()
+    sessions = SessionStore(ttl=60, horloge=horloge)
+    sessions.get("s1").retenir("Maroc")
+
+    horloge.maintenant = 59
+    assert sessions.get("s1").equipe == "Maroc"
+
+    # 60 s sans activité depuis le dernier accès : contexte oublié
+    horloge.maintenant = 119
+    assert sessions.get("s1").equipe is None
+
+
+def test_session_expiree_purgee_par_une_autre():
+    horloge = Horloge()
+    sessions = SessionStore(ttl=60, horloge=horloge)
+    sessions.get("s1")
+
+    horloge.maintenant = 60
+    sessions.get("s2")
+    assert len(sessions) == 1
+
+
+def test_eviction_lru_a_capacite():
+    sessions = SessionStore(max_sessions=2, horloge=Horloge())
+    sessions.get("s1").retenir("Maroc")
+    sessions.get("s2").retenir("Mali")
+    sessions.get("s1")                      # s1 redevient la plus récente
+    sessions.get("s3")
+
+    assert len(sessions) == 2
+    assert sessions.get("s1").equipe == "Maroc"
+    assert sessions.get("s2").equipe is None
+
+
+def test_relance_reprend_l_equipe_de_la_session(monkeypatch):
+    monkeypatch.setattr(chatbot_can, "llama_intent_router",
+                        lambda question: {"intent": "inconnu", "team": None, "groupe": None, "phase": None})
+    sessions = SessionStore(horloge=Horloge())
+    chatbot_can.chatbot("matchs du Sénégal", sessions.get("s1"))
+
+    reponse = chatbot_can.chatbot("et ses joueurs ?", sessions.get("s1"))
+    assert reponse.relance and reponse.intention == "joueurs"
+    assert reponse == chatbot_can.joueurs_equipe("Sénégal")
+    # Relance complétée par le contexte : jamais mise en cache
+    assert not reponse.deterministe
+
+    # Autre session : rien à reprendre
+    assert not chatbot_can.chatbot("et ses joueurs ?", sessions.get("s2")).relance
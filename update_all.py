@@ -37,3 +37,17 @@ run(
     "scrape_joueurs.py",
     "Listes des joueurs par équipe"
 )
+
+# Instantané de service du chatbot (runtime sans pandas), reconstruit depuis les nouveaux CSV
+print("\nExécution : snapshot.py")
+if os.system(f'python "{BASE_DIR / "snapshot.py"}"') != 0:
+    print("Instantané non reconstruit (il le sera au prochain démarrage du chatbot)")
+else:
+    print("Instantané du chatbot reconstruit")
+
+# Paquets JSON des pages du site (about, classement)
+print("\nExécution : bundles.py")
+if os.system(f'python "{BASE_DIR / "bundles.py"}"') != 0:
+    print("Paquets du site non reconstruits")
+else:
+    print("Paquets du site reconstruits")
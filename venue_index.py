@@ -0,0 +1,91 @@
+"""
+Index des lieux de la CAN 2025
+Construit une seule fois depuis l'instantané : villes → stades, et lieu en texte
+libre des matchs ("Stade Ibn-Batouta, Tanger") → enregistrement Stade, résolu au
+chargement. Les matchs indexés sont ceux de l'instantané : leurs scores restent
+à jour des changements publiés
+"""
+
+import logging
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from core import normalize
+from snapshot import load_stades, load_tournoi
+
+logger = logging.getLogger(__name__)
+
+# "Stade de Fès", "Complexe sportif de Fès" → "fes"
+PREFIXE_STADE = re.compile(r"^(stade|complexe sportif)\s+(de\s+|d'|du\s+)?", re.I)
+
+
+def nom_court(nom):
+    """Nom normalisé d'un stade sans son préfixe ("Stade Adrar" → "adrar")"""
+    return normalize(PREFIXE_STADE.sub("", nom.strip()))
+
+
+class VenueIndex:
+    """Stades par ville et par nom, matchs par stade"""
+
+    def __init__(self, stades, matchs=()):
+        self.stades = list(stades)
+        self.villes = {}        # ville normalisée → nom affiché
+        self.par_ville = {}     # ville normalisée → [Stade] (ordre du fichier)
+        self.par_nom = {}       # nom normalisé, complet et court → Stade
+        self.lieux = {}         # lieu d'un match (texte) → Stade, None si inconnu
+        self.matchs = {}        # nom du stade → [Match]
+
+        for s in self.stades:
+            ville = normalize(s.ville)
+            self.villes.setdefault(ville, s.ville)
+            self.par_ville.setdefault(ville, []).append(s)
+            self.par_nom.setdefault(normalize(s.stade), s)
+            self.par_nom.setdefault(nom_court(s.stade), s)
+
+        for m in matchs:
+            stade = self.resoudre(m.stade)
+            if stade is not None:
+                self.matchs.setdefault(stade.stade, []).append(m)
+
+    def __len__(self):
+        return len(self.stades)
+
+    def resoudre(self, lieu):
+        """
+        Stade d'un lieu en texte libre ("Stade Ibn-Batouta, Tanger") : nom complet,
+        nom sans préfixe, ou seul stade de la ville ; None sinon
+        """
+        if not lieu:
+            return None
+        if lieu not in self.lieux:
+            nom, _, ville = lieu.rpartition(",") if "," in lieu else (lieu, "", "")
+            stade = self.par_nom.get(normalize(nom)) or self.par_nom.get(nom_court(nom))
+            if stade is None:
+                candidats = self.par_ville.get(normalize(ville), ())
+                stade = candidats[0] if len(candidats) == 1 else None
+            if stade is None:
+                logger.warning(f"Lieu non reconnu: {lieu}")
+            self.lieux[lieu] = stade
+        return self.lieux[lieu]
+
+    def trouver_ville(self, texte, norm=None):
+        """Ville hôte citée dans le texte (mots entiers), nom normalisé ou None"""
+        texte = f" {normalize(texte) if norm is None else norm} "
+        return next((v for v in self.villes if f" {v} " in texte), None)
+
+    def matchs_ville(self, ville):
+        """[(Match, Stade)] joués dans une ville (nom normalisé), dans l'ordre du calendrier"""
+        matchs = [(m, s) for s in self.par_ville.get(ville, ()) for m in self.matchs.get(s.stade, ())]
+        return sorted(matchs, key=lambda ms: ms[0].instant or datetime.max)
+
+
+@lru_cache(maxsize=1)
+def load_venue_index():
+    """Construit l'index des lieux (une seule fois)"""
+    index = VenueIndex(load_stades(), load_tournoi().finales)
+    logger.info(
+        f"✓ Index lieux construit: {len(index)} stades, {len(index.villes)} villes, "
+        f"{sum(len(m) for m in index.matchs.values())} matchs localisés"
+    )
+    return index